@@ -0,0 +1,42 @@
+"""
+Benchmark of the "records" and "columnar" result formats of `execute_flux_query`.
+
+Converts synthetic TableLists to both formats and serializes them to JSON as
+the MCP transport does, reporting the time and the size of the response body.
+
+Usage: python benchmarks/bench_columnar_format.py [--rows 100000 1000000]
+"""
+
+import argparse
+import json
+import time
+
+from bench_execute_query_conversion import synthetic_tables
+
+from influxdb_mcp.results import tables_to_columnar, tables_to_records
+
+
+def measure(convert, rows: int):
+    tables = synthetic_tables(rows)
+    started = time.perf_counter()
+    body = json.dumps(convert(tables))
+    return len(body), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'records':>9} {'columnar':>9} {'records MiB':>12} {'columnar MiB':>13} {'bytes saved':>12}")
+    for rows in args.rows:
+        records_size, records_elapsed = measure(tables_to_records, rows)
+        columnar_size, columnar_elapsed = measure(tables_to_columnar, rows)
+        print(
+            f"{rows:>10} {records_elapsed:>8.3f}s {columnar_elapsed:>8.3f}s {records_size / 2**20:>12.1f}"
+            f" {columnar_size / 2**20:>13.1f} {1 - columnar_size / records_size:>11.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
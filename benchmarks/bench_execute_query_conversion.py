@@ -0,0 +1,82 @@
+"""
+Microbenchmark of the record conversion in `InfluxDBManager.execute_query`.
+
+Compares the previous `json.loads(TableList.to_json())` round trip with the
+direct single-pass conversion on synthetic TableLists, and checks that both
+produce identical results.
+
+Usage: python benchmarks/bench_execute_query_conversion.py [--rows 100000 1000000]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from influxdb_client.client.flux_table import FluxColumn, FluxRecord, FluxTable, TableList
+
+from influxdb_mcp.results import tables_to_records
+
+SERIES = 10
+COLUMNS = [
+    ("result", "string", False),
+    ("table", "long", False),
+    ("_start", "dateTime:RFC3339", True),
+    ("_stop", "dateTime:RFC3339", True),
+    ("_time", "dateTime:RFC3339", False),
+    ("_value", "double", False),
+    ("_field", "string", True),
+    ("_measurement", "string", True),
+    ("host", "string", True),
+]
+
+
+def synthetic_tables(rows: int) -> TableList:
+    """Build a TableList of `rows` records spread over `SERIES` tables."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    stop = start + timedelta(days=30)
+    tables = TableList()
+    per_table = rows // SERIES
+    for index in range(SERIES):
+        table = FluxTable()
+        table.columns = [FluxColumn(i, label, data_type, group) for i, (label, data_type, group) in enumerate(COLUMNS)]
+        for row in range(per_table):
+            values = {
+                "result": "_result",
+                "table": index,
+                "_start": start,
+                "_stop": stop,
+                "_time": start + timedelta(seconds=row * 10),
+                "_value": row * 0.5,
+                "_field": "usage",
+                "_measurement": "cpu",
+                "host": f"host-{index}",
+            }
+            table.records.append(FluxRecord(index, values=values))
+        tables.append(table)
+    return tables
+
+
+def measure(convert, rows: int):
+    tables = synthetic_tables(rows)
+    started = time.perf_counter()
+    result = convert(tables)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'to_json+loads':>14} {'direct':>9} {'speedup':>8}")
+    for rows in args.rows:
+        expected, json_elapsed = measure(lambda tables: json.loads(tables.to_json()), rows)
+        actual, direct_elapsed = measure(tables_to_records, rows)
+        assert actual == expected, "direct conversion differs from the JSON round trip"
+        del expected, actual
+        print(f"{rows:>10} {json_elapsed:>13.3f}s {direct_elapsed:>8.3f}s {json_elapsed / direct_elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
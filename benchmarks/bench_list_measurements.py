@@ -0,0 +1,85 @@
+"""
+Benchmark InfluxDB round trips made by `InfluxDBManager.list_measurements`.
+
+Runs schema discovery against an in-process stand-in for the query API that
+counts Flux queries and answers them with synthetic schema tables, comparing
+the single-query discovery with the concurrent per-measurement queries.
+
+Usage: python benchmarks/bench_list_measurements.py [--latency-ms 5]
+"""
+
+import argparse
+import re
+import time
+
+from influxdb_client.client.flux_table import FluxRecord, FluxTable, TableList
+
+from influxdb_mcp.config import InfluxDBConfig
+from influxdb_mcp.influxdb_client import InfluxDBManager
+from influxdb_mcp.schema import FIELD_KEYS_RESULT, TAG_KEYS_RESULT
+
+TAGS = ["_start", "_stop", "_field", "_measurement", "host", "region"]
+FIELDS = ["usage", "idle", "load"]
+
+
+def _table(rows):
+    table = FluxTable()
+    table.records = [FluxRecord(0, values=row) for row in rows]
+    return table
+
+
+class CountingQueryApi:
+    """Answers schema queries for a synthetic bucket and counts round trips."""
+
+    def __init__(self, measurements: int, latency: float):
+        self.names = [f"m{i:04d}" for i in range(measurements)]
+        self.latency = latency
+        self.calls = 0
+
+    def query(self, query, org=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        if "schema.measurements(" in query:
+            return TableList([_table([{"_value": name} for name in self.names])])
+        match = re.search(r'measurement: "([^"]+)"', query)
+        if "schema.measurementTagKeys(" in query:
+            return TableList([_table([{"_value": tag} for tag in TAGS])])
+        if "schema.measurementFieldKeys(" in query and match:
+            return TableList([_table([{"_value": field} for field in FIELDS])])
+        tables = TableList()
+        for name in self.names:
+            tables.append(_table([{"result": TAG_KEYS_RESULT, "_measurement": name, "_value": tag} for tag in TAGS]))
+            tables.append(
+                _table([{"result": FIELD_KEYS_RESULT, "_measurement": name, "_value": field} for field in FIELDS])
+            )
+        return tables
+
+
+def run(measurements: int, latency: float, legacy: bool):
+    mode = "per-measurement" if legacy else "single-query"
+    manager = InfluxDBManager(InfluxDBConfig(token="bench", org="bench", schema_discovery=mode))
+    query_api = CountingQueryApi(measurements, latency)
+    manager._query_api = query_api  # type: ignore
+    started = time.perf_counter()
+    result = manager.list_measurements("bench")
+    elapsed = time.perf_counter() - started
+    assert len(result) == measurements
+    return query_api.calls, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated round-trip latency per query")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 400])
+    args = parser.parse_args()
+
+    print(f"{'measurements':>12} {'mode':>16} {'round trips':>12} {'seconds':>9}")
+    for size in args.sizes:
+        for legacy in (True, False):
+            calls, elapsed = run(size, args.latency_ms / 1000, legacy)
+            mode = "per-measurement" if legacy else "single-query"
+            print(f"{size:>12} {mode:>16} {calls:>12} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Benchmark suite of the tool, resource and serialization hot paths, with JSON results for release comparisons.
+
+Runs against the fake InfluxDB server (`influxdb_mcp.fake_influxdb`), so no
+database is needed:
+
+- `conversion.<format>.<rows>`: conversion of Flux tables by `execute_query` at 10k, 100k and 1M rows
+- `execute_query.<rows>`: `InfluxDBManager.execute_query` including the HTTP transfer and CSV parsing
+- `list_measurements.<mode>.<measurements>`: uncached schema discovery of 10, 100 and 1000 measurements
+- `mcp.<tool>`: end-to-end tool call latency over streamable-http against a server subprocess
+
+Every case reports timing statistics of repeated runs and a peak memory in
+`peak_bytes`. For the in-process cases it is the peak allocated by one run,
+measured with tracemalloc in a separate pass. For the `mcp.<tool>` cases it is
+the peak resident memory of the server subprocess during the timed calls, read
+from VmHWM after resetting it through /proc, so it is only reported on Linux.
+Caches are disabled so every run does the full work.
+
+Usage:
+  python benchmarks/suite.py run [--output results.json] [--quick] [--filter conversion]
+  python benchmarks/suite.py compare baseline.json results.json [--threshold 0.1]
+
+`compare` exits with status 1 when a case got slower or allocates more than the threshold allows.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_execute_query_conversion import synthetic_tables
+
+from influxdb_mcp import __version__
+from influxdb_mcp.config import InfluxDBConfig
+from influxdb_mcp.fake_influxdb import Dataset, FakeInfluxDB, FakeInfluxDBServer
+from influxdb_mcp.influxdb_client import InfluxDBManager
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BUCKET = "bench"
+
+# Settings turning off every cache of the server, so repeated runs do the same work, and the slow query log
+SETTINGS = {
+    "query_cache_ttl": 0,
+    "query_cache_historical_ttl": 0,
+    "window_cache_ttl": 0,
+    "schema_cache_ttl": 0,
+    "slow_query_ms": 0,
+}
+
+# Name, function, extra result fields and an optional untimed setup whose result is passed to the function
+Case = Tuple[str, Callable[..., Any], Dict[str, Any], Optional[Callable[[], Any]]]
+
+
+def _label(count: int) -> str:
+    if count >= 1_000_000 and count % 1_000_000 == 0:
+        return f"{count // 1_000_000}M"
+    if count >= 1_000 and count % 1_000 == 0:
+        return f"{count // 1_000}k"
+    return str(count)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def summarize(timings: List[float]) -> Dict[str, Any]:
+    """Timing statistics in seconds of repeated runs."""
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def measure(fn: Callable[..., Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time `repeat` runs after a warm-up run, then measure the peak memory of one more run.
+
+    With a `setup`, each run is passed a fresh result of it, built outside of the measurement.
+    """
+
+    def run_once() -> float:
+        args = (setup(),) if setup else ()
+        started = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - started
+
+    run_once()
+    result = summarize([run_once() for _ in range(repeat)])
+    args = (setup(),) if setup else ()
+    tracemalloc.start()
+    try:
+        fn(*args)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def manager_for(server: FakeInfluxDBServer, **settings: Any) -> InfluxDBManager:
+    host, port = server.server_address[:2]
+    config = InfluxDBConfig(host=host, port=port, token="bench", org="bench", timeout=600_000, **SETTINGS)
+    manager = InfluxDBManager(config.model_copy(update={"max_rows": 0, "max_bytes": 0, **settings}))
+    manager.connect()
+    return manager
+
+
+def conversion_cases(sizes: List[int]) -> List[Case]:
+    manager = InfluxDBManager(InfluxDBConfig(token="bench", org="bench", **SETTINGS))
+    cases: List[Case] = []
+    for rows in sizes:
+        for result_format in ("records", "columnar"):
+            # Records are converted in place, so every run gets new tables
+            cases.append(
+                (
+                    f"conversion.{result_format}.{_label(rows)}",
+                    lambda tables, fmt=result_format: manager._tables_to_json(tables, fmt),
+                    {"rows": rows},
+                    lambda rows=rows: synthetic_tables(rows),
+                )
+            )
+    return cases
+
+
+def execute_query_cases(server: FakeInfluxDBServer, sizes: List[int]) -> List[Case]:
+    manager = manager_for(server)
+    dataset = server.influxdb.dataset
+    cases: List[Case] = []
+    for rows in sizes:
+        # One point per minute in each of the series x fields tables
+        minutes = max(1, rows // (dataset.series * dataset.fields))
+        query = (
+            f'from(bucket: "{BUCKET}") |> range(start: -{minutes}m) '
+            f'|> filter(fn: (r) => r._measurement == "measurement_0000")'
+        )
+        cases.append(
+            (f"execute_query.{_label(rows)}", lambda query=query: manager.execute_query(query), {"rows": rows}, None)
+        )
+    return cases
+
+
+def list_measurements_cases(
+    sizes: List[int], latency: float, selected: Callable[[str], bool]
+) -> Tuple[List[Case], List[FakeInfluxDBServer]]:
+    """Selected schema discovery cases, with a fake server started only for the sizes of those cases."""
+    cases: List[Case] = []
+    servers = []
+    for measurements in sizes:
+        modes = [
+            mode
+            for mode in ("single-query", "per-measurement")
+            if selected(f"list_measurements.{mode}.{_label(measurements)}")
+        ]
+        if not modes:
+            continue
+        dataset = Dataset(buckets=[BUCKET], measurements=measurements, series=2, fields=3)
+        server = FakeInfluxDBServer(FakeInfluxDB(dataset, latency, NOW)).start()
+        servers.append(server)
+        for mode in modes:
+            manager = manager_for(server, schema_discovery=mode)
+            cases.append(
+                (
+                    f"list_measurements.{mode}.{_label(measurements)}",
+                    lambda manager=manager: manager.list_measurements(BUCKET),
+                    {"measurements": measurements},
+                    None,
+                )
+            )
+    return cases, servers
+
+
+def start_mcp_server(influxdb: FakeInfluxDBServer) -> Tuple[subprocess.Popen, str]:
+    """Start the MCP server over streamable-http in a subprocess and wait until it is live."""
+    host, port = influxdb.server_address[:2]
+    listen_port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            [str(Path(__file__).resolve().parent.parent / "src"), os.getenv("PYTHONPATH", "")]
+        ),
+        "INFLUXDB_HOST": host,
+        "INFLUXDB_PORT": str(port),
+        "INFLUXDB_TOKEN": "bench",
+        "INFLUXDB_ORG": "bench",
+        "MCP_LISTEN_HOST": "127.0.0.1",
+        "MCP_LISTEN_PORT": str(listen_port),
+        "MCP_TRANSPORT": "streamable-http",
+        **{f"INFLUXDB_{name.upper()}": "0" for name in SETTINGS},
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "influxdb_mcp.server"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{listen_port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"MCP server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/livez", timeout=1):
+                return process, f"{url}/mcp/"
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("MCP server did not start within 30 seconds")
+
+
+def reset_peak_rss(pid: int) -> bool:
+    """Reset the peak resident memory of a process, returning whether it is supported (Linux only)."""
+    try:
+        Path(f"/proc/{pid}/clear_refs").write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss(pid: int) -> Optional[int]:
+    """Peak resident memory in bytes of a process since it was last reset, from VmHWM of /proc."""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+# Tool calls of the `mcp.<case>` cases, the tool name is the part of the case before the first dot
+MCP_CASES: Dict[str, Dict[str, Any]] = {
+    "test_connection": {},
+    "list_buckets": {},
+    "list_measurements": {"bucket": BUCKET},
+    "execute_flux_query.raw": {
+        "query": f'from(bucket: "{BUCKET}") |> range(start: -1h) '
+        '|> filter(fn: (r) => r._measurement == "measurement_0000" and r.host == "host-0000")'
+    },
+    "execute_flux_query.aggregate": {
+        "query": f'from(bucket: "{BUCKET}") |> range(start: -7d) '
+        '|> filter(fn: (r) => r._measurement == "measurement_0000") |> aggregateWindow(every: 1h, fn: mean)'
+    },
+}
+
+
+async def mcp_cases(url: str, pid: int, calls: int, tools: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Time sequential tool calls over one streamable-http session, with the peak memory of the server `pid`."""
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    results = {}
+    async with streamablehttp_client(url) as (read, write, _), ClientSession(read, write) as session:
+        await session.initialize()
+        for case, arguments in tools.items():
+            tool = case.split(".")[0]
+            await session.call_tool(tool, arguments)
+            measure_rss = reset_peak_rss(pid)
+            timings = []
+            for _ in range(calls):
+                started = time.perf_counter()
+                response = await session.call_tool(tool, arguments)
+                timings.append(time.perf_counter() - started)
+                if response.isError:
+                    raise RuntimeError(f"{tool} failed: {response.content}")
+            results[f"mcp.{case}"] = summarize(timings)
+            if measure_rss:
+                results[f"mcp.{case}"]["peak_bytes"] = peak_rss(pid)
+    return results
+
+
+def run(args: argparse.Namespace) -> None:
+    conversion_sizes = [10_000, 100_000] if args.quick else [10_000, 100_000, 1_000_000]
+    query_sizes = [10_000, 100_000]
+    measurement_sizes = [10, 100] if args.quick else [10, 100, 1000]
+    repeat = 3 if args.quick else args.repeat
+    latency = args.latency_ms / 1000
+
+    def selected(name: str) -> bool:
+        return not args.filter or any(part in name for part in args.filter)
+
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def record(name: str, fn: Callable[..., Any], extra: Dict[str, Any], setup: Optional[Callable[[], Any]]) -> None:
+        results[name] = {**measure(fn, repeat, setup), **extra}
+        print(
+            f"{name:<45} median {results[name]['median'] * 1000:>10.2f} ms"
+            f"  p95 {results[name]['p95'] * 1000:>10.2f} ms  peak {results[name]['peak_bytes'] / 2**20:>8.1f} MiB",
+            flush=True,
+        )
+
+    dataset = Dataset(buckets=[BUCKET], measurements=10, series=10, fields=3)
+    influxdb = FakeInfluxDBServer(FakeInfluxDB(dataset, latency, NOW)).start()
+    try:
+        # Every case is checked against the filter by its full name; only the setup of selected cases is run
+        for name, fn, extra, setup in conversion_cases(conversion_sizes):
+            if selected(name):
+                record(name, fn, extra, setup)
+        for name, fn, extra, setup in execute_query_cases(influxdb, query_sizes):
+            if selected(name):
+                record(name, fn, extra, setup)
+        cases, servers = list_measurements_cases(measurement_sizes, latency, selected)
+        try:
+            for name, fn, extra, setup in cases:
+                record(name, fn, extra, setup)
+        finally:
+            for server in servers:
+                server.stop()
+        tools = {case: arguments for case, arguments in MCP_CASES.items() if selected(f"mcp.{case}")}
+        if tools:
+            process, url = start_mcp_server(influxdb)
+            try:
+                for name, stats in asyncio.run(mcp_cases(url, process.pid, args.calls, tools)).items():
+                    results[name] = stats
+                    peak = f"  peak {stats['peak_bytes'] / 2**20:>8.1f} MiB" if stats.get("peak_bytes") else ""
+                    print(
+                        f"{name:<45} median {stats['median'] * 1000:>10.2f} ms  p95 {stats['p95'] * 1000:>10.2f} ms{peak}"
+                    )
+            finally:
+                process.terminate()
+                process.wait(10)
+    finally:
+        influxdb.stop()
+
+    report = {"meta": metadata(args), "benchmarks": results}
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": __version__,
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_ms": args.latency_ms,
+        "quick": args.quick,
+    }
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Print the change of every case present in both results and return 1 if any regressed."""
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    print(
+        f"baseline {baseline['meta'].get('version')} ({baseline['meta'].get('commit')}), "
+        f"current {current['meta'].get('version')} ({current['meta'].get('commit')})"
+    )
+    print(f"{'case':<45} {'baseline':>11} {'current':>11} {'change':>8} {'peak change':>12}")
+    regressions = []
+    for name, stats in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:<45} {'':>11} {stats['median'] * 1000:>9.2f}ms {'new':>8}")
+            continue
+        change = stats["median"] / base["median"] - 1
+        peak_change = None
+        if base.get("peak_bytes") and stats.get("peak_bytes") is not None:
+            peak_change = stats["peak_bytes"] / base["peak_bytes"] - 1
+        flag = ""
+        if change > args.threshold or (peak_change is not None and peak_change > args.threshold):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        peak = f"{peak_change:>+11.1%}" if peak_change is not None else f"{'':>11}"
+        print(
+            f"{name:<45} {base['median'] * 1000:>9.2f}ms {stats['median'] * 1000:>9.2f}ms {change:>+7.1%} {peak}{flag}"
+        )
+    for name in sorted(baseline["benchmarks"].keys() - current["benchmarks"].keys()):
+        print(f"{name:<45} {baseline['benchmarks'][name]['median'] * 1000:>9.2f}ms {'':>11} {'removed':>8}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write their results as JSON")
+    run_parser.add_argument("--output", default="benchmark-results.json", help="Path of the JSON results")
+    run_parser.add_argument("--quick", action="store_true", help="Smaller sizes and fewer runs, for a smoke test")
+    run_parser.add_argument("--filter", nargs="+", help="Only run cases whose name contains one of these strings")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per in-process case")
+    run_parser.add_argument("--calls", type=int, default=50, help="Timed calls per MCP tool")
+    run_parser.add_argument("--latency-ms", type=float, default=1.0, help="Latency of the fake InfluxDB per request")
+
+    compare_parser = commands.add_parser("compare", help="Compare two JSON results")
+    compare_parser.add_argument("baseline", help="Results of the reference release")
+    compare_parser.add_argument("current", help="Results to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown, 0.1 = 10%%")
+
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+In-process caches for InfluxDB schema and query results.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from .catalog import SchemaCatalog
+from .flux import find_ranges, normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory footprint of a JSON-like value by its serialized length."""
+    return len(json.dumps(value, default=str))
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its size and the time it was stored."""
+
+    value: Any
+    size: int
+    stored_at: float
+    ttl: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    @property
+    def expired(self) -> bool:
+        return self.age >= self.ttl
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the estimated memory size of its entries."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry for `key`, expired or not, and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        size: Optional[int] = None,
+        stored_at: Optional[float] = None,
+    ) -> Optional[CacheEntry]:
+        """Store a value, evicting least recently used entries to stay within the memory budget."""
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {key!r}: {size} bytes exceeds the cache budget of {self.max_bytes} bytes")
+            self.invalidate(key)
+            return None
+        if stored_at is None:
+            stored_at = time.monotonic()
+        entry = CacheEntry(value=value, size=size, stored_at=stored_at, ttl=ttl)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a single entry, returning whether it was cached."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._bytes -= entry.size
+            return entry is not None
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SchemaCache:
+    """Schema cache with TTL expiry and stale-while-revalidate background refresh.
+
+    Entries younger than `ttl` are served as fresh. Entries older than `ttl` but
+    younger than `ttl + stale_ttl` are served immediately while a background
+    thread (or asyncio task) reloads them; anything older is reloaded synchronously. With a
+    `store`, every loaded value is also written to the persistent catalog. Loaded values
+    rejected by `cacheable` are returned but neither cached nor persisted.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        max_bytes: int,
+        store: Optional[SchemaCatalog] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.store = store
+        self.cacheable = cacheable
+        self._cache = LRUCache(max_bytes)
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, Dict[str, Any]]:
+        """Return the cached value for `key`, loading it on a miss, along with cache status info."""
+        if not self.enabled:
+            return loader(), {"status": "disabled"}
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            age = entry.age
+            if age < self.ttl:
+                return entry.value, {"status": "hit", "age_s": round(age, 3)}
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background(key, loader)
+                return entry.value, {"status": "stale", "age_s": round(age, 3)}
+
+        value = loader()
+        self._store(key, value)
+        return value, {"status": "miss", "age_s": 0.0}
+
+    async def get_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, Dict[str, Any]]:
+        """Asyncio variant of `get`, refreshing stale entries in a background task."""
+        if not self.enabled:
+            return await loader(), {"status": "disabled"}
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            age = entry.age
+            if age < self.ttl:
+                return entry.value, {"status": "hit", "age_s": round(age, 3)}
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background_async(key, loader)
+                return entry.value, {"status": "stale", "age_s": round(age, 3)}
+
+        value = await loader()
+        self._store(key, value)
+        return value, {"status": "miss", "age_s": 0.0}
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, Dict[str, Any]]:
+        """Reload the value for `key` unconditionally and store it."""
+        value = loader()
+        if self.enabled:
+            self._store(key, value)
+        return value, {"status": "refreshed", "age_s": 0.0}
+
+    async def refresh_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, Dict[str, Any]]:
+        """Asyncio variant of `refresh`."""
+        value = await loader()
+        if self.enabled:
+            self._store(key, value)
+        return value, {"status": "refreshed", "age_s": 0.0}
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop the cached value for `key`."""
+        if self.store:
+            self.store.delete(key)  # type: ignore[arg-type]
+        return self._cache.invalidate(key)
+
+    def load_persisted(self, org: Optional[str] = None) -> int:
+        """Populate the cache from the persistent catalog, returning the number of loaded entries.
+
+        Loaded entries are marked stale, so they are served immediately and
+        revalidated in the background on first use. Entries saved longer than
+        `ttl + stale_ttl` ago would not be served and are dropped. With `org`,
+        only the entries of that organization are loaded and dropped, entries
+        of other organizations sharing the catalog are left alone.
+        """
+        if not self.store or not self.enabled:
+            return 0
+        now, monotonic = time.time(), time.monotonic()
+        loaded = 0
+        for key, value, saved_at in self.store.load(org):
+            age = max(now - saved_at, self.ttl)
+            if age >= self.ttl + self.stale_ttl:
+                self.store.delete(key)  # type: ignore[arg-type]
+                continue
+            if self._cache.put(key, value, self.ttl, stored_at=monotonic - age):
+                loaded += 1
+        return loaded
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        self._cache.clear()
+
+    def close(self) -> None:
+        """Close the persistent catalog, cached values are still served but no longer persisted."""
+        if self.store:
+            self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters and settings."""
+        return {**self._cache.stats(), "ttl_s": self.ttl, "stale_ttl_s": self.stale_ttl}
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        """Start a background reload of `key` unless one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, loader())
+                logger.debug(f"Refreshed stale schema cache entry {key!r}")
+            except Exception as e:
+                logger.warning(f"Background schema refresh of {key!r} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="influxdb-schema-refresh", daemon=True).start()
+
+    def _refresh_in_background_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Start a background reload task of `key` unless one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                self._store(key, await loader())
+                logger.debug(f"Refreshed stale schema cache entry {key!r}")
+            except Exception as e:
+                logger.warning(f"Background schema refresh of {key!r} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Keep a reference so the task is not garbage collected before it finishes
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Cache a freshly loaded value and write it through to the persistent catalog."""
+        if self.cacheable and not self.cacheable(value):
+            # A previously cached complete value is kept
+            logger.info(f"Not caching incomplete schema cache entry {key!r}")
+            return
+        self._cache.put(key, value, self.ttl)
+        if self.store:
+            try:
+                self.store.save(key, value)  # type: ignore[arg-type]
+            except Exception as e:
+                logger.warning(f"Failed to persist schema cache entry {key!r}: {e}")
+
+
+class QueryCache:
+    """Query result cache keyed by the normalized Flux text, with TTLs derived from the query time range.
+
+    Results of queries whose `range()` calls are all fixed in the past cannot
+    change and are kept for `historical_ttl` seconds. Anything relative to the
+    current time, like `range(start: -1h)`, is kept for `ttl` seconds only.
+    """
+
+    def __init__(self, ttl: float, historical_ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.historical_ttl = historical_ttl
+        self._cache = LRUCache(max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.max_bytes > 0
+
+    @staticmethod
+    def key(org: str, query: str, *params: Hashable) -> Tuple[Hashable, ...]:
+        """Cache key of a query, insensitive to comments and whitespace layout."""
+        return (org, normalize_query(query), *params)
+
+    def ttl_for(self, query: str) -> float:
+        """TTL of a query result: long for historical ranges, short for ranges relative to now."""
+        ranges = find_ranges(query)
+        now = datetime.now(timezone.utc)
+        if ranges and all(r.absolute and r.stop_time(now) <= now for r in ranges):  # type: ignore[operator]
+            return self.historical_ttl
+        return self.ttl
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached result for `key`, or None when it is missing or expired."""
+        if not self.enabled:
+            return None
+        entry = self._cache.get(key)
+        if entry is not None and entry.expired:
+            self._cache.invalidate(key)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, query: str, value: Any, size: Optional[int] = None) -> None:
+        """Cache a query result for the TTL derived from the query."""
+        if not self.enabled:
+            return
+        ttl = self.ttl_for(query)
+        if ttl > 0:
+            self._cache.put(key, value, ttl, size=size)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size, hit/miss counters and settings."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            **self._cache.stats(),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "ttl_s": self.ttl,
+            "historical_ttl_s": self.historical_ttl,
+        }
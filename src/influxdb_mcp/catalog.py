@@ -0,0 +1,88 @@
+"""
+Persistent on-disk schema catalog backed by SQLite.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the table or of the stored payloads changes,
+# catalogs written with another version are discarded on open.
+CATALOG_VERSION = 1
+
+CatalogKey = Tuple[str, str, str]
+
+
+class SchemaCatalog:
+    """Stores discovered schema keyed by (kind, org, bucket) so it survives server restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        """Create the catalog table, discarding catalogs written by another catalog version."""
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != CATALOG_VERSION:
+                if version:
+                    logger.info(f"Discarding schema catalog version {version}, expected {CATALOG_VERSION}")
+                self._conn.execute("DROP TABLE IF EXISTS schema_catalog")
+                self._conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_catalog (
+                    kind TEXT NOT NULL,
+                    org TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    saved_at REAL NOT NULL,
+                    PRIMARY KEY (kind, org, bucket)
+                )
+                """
+            )
+
+    def load(self, org: Optional[str] = None) -> List[Tuple[CatalogKey, Any, float]]:
+        """Return the stored entries, only those of `org` when given, as (key, value, saved_at) tuples."""
+        query = "SELECT kind, org, bucket, payload, saved_at FROM schema_catalog"
+        with self._lock:
+            if org is None:
+                rows = self._conn.execute(query).fetchall()
+            else:
+                rows = self._conn.execute(f"{query} WHERE org = ?", (org,)).fetchall()
+        entries = []
+        for kind, stored_org, bucket, payload, saved_at in rows:
+            try:
+                entries.append(((kind, stored_org, bucket), json.loads(payload), saved_at))
+            except ValueError as e:
+                logger.warning(f"Skipping unreadable schema catalog entry {(kind, stored_org, bucket)!r}: {e}")
+        return entries
+
+    def save(self, key: CatalogKey, value: Any) -> None:
+        """Insert or replace a single entry."""
+        payload = json.dumps(value, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO schema_catalog (kind, org, bucket, payload, saved_at) VALUES (?, ?, ?, ?, ?)",
+                (*key, payload, time.time()),
+            )
+
+    def delete(self, key: CatalogKey) -> None:
+        """Remove a single entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM schema_catalog WHERE kind = ? AND org = ? AND bucket = ?", key)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
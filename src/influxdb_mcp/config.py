@@ -2,9 +2,15 @@
 Configuration module for InfluxDB MCP server.
 """
 
+import os
+import tempfile
+from typing import Optional
+
 from pydantic import BaseModel, Field, field_validator
 from dotenv import load_dotenv
 
+from .flux import parse_duration
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -22,6 +28,91 @@ class InfluxDBConfig(BaseModel):
     use_ssl: bool = Field(default=False, description="Use SSL/TLS connection")
     verify_ssl: bool = Field(default=True, description="Verify SSL certificates")
     timeout: int = Field(default=10000, description="Request timeout in milliseconds")
+    connection_pool_size: Optional[int] = Field(
+        default=None, description="Maximum simultaneous HTTP connections, defaults to 5 per CPU"
+    )
+
+    # Streaming query settings
+    cursor_ttl: int = Field(default=300, description="Seconds an idle paged query cursor is kept open")
+    max_open_cursors: int = Field(default=32, description="Maximum number of open paged query cursors")
+    max_rows: int = Field(default=0, description="Maximum records per query response, 0 for no limit")
+    max_bytes: int = Field(default=0, description="Approximate maximum query response size in bytes, 0 for no limit")
+
+    # Query result cache settings
+    query_cache_ttl: int = Field(
+        default=30, description="Seconds results of queries relative to now are cached, 0 to not cache them"
+    )
+    query_cache_historical_ttl: int = Field(
+        default=3600, description="Seconds results of queries over fixed past time ranges are cached"
+    )
+    query_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="Query result cache memory budget in bytes, 0 disables the cache"
+    )
+    window_cache_ttl: int = Field(
+        default=900, description="Seconds aggregated windows of sliding queries are reused, 0 disables the cache"
+    )
+    window_cache_max_bytes: int = Field(
+        default=32 * 1024 * 1024, description="Memory budget in bytes of the aggregated window cache"
+    )
+
+    # Slow query log settings
+    slow_query_ms: int = Field(
+        default=1000, description="Queries taking longer than this many milliseconds are logged, 0 disables the log"
+    )
+    slow_query_profile: bool = Field(
+        default=False, description="Re-run slow queries with the Flux profiler and log the query and operator timings"
+    )
+
+    # Query rewriting settings
+    point_budget: int = Field(
+        default=0, description="Points per series above which raw queries are aggregated in InfluxDB, 0 to not rewrite"
+    )
+    sample_interval: str = Field(default="10s", description="Assumed interval between the points of a series")
+    downsample_fn: str = Field(default="mean", description="Aggregation of rewritten queries: 'mean' or 'minmax'")
+
+    # Query cost estimate settings
+    max_estimated_rows: int = Field(
+        default=0,
+        description="Rows a query may be estimated to return before it is aggregated or rejected, 0 to not estimate",
+    )
+    estimate_action: str = Field(
+        default="aggregate", description="Action on queries estimated above the limit: 'aggregate' or 'reject'"
+    )
+    estimate_sample_window: str = Field(
+        default="5m", description="Length of the end of the query range sampled to measure write rates"
+    )
+    estimate_cache_ttl: int = Field(
+        default=300, description="Seconds series cardinalities and write rates are cached, 0 disables the cache"
+    )
+
+    # Spool settings
+    spool_dir: str = Field(
+        default=os.path.join(tempfile.gettempdir(), "influxdb-mcp"),
+        description="Directory query exports and spooled results are written to",
+    )
+    spool_threshold: int = Field(
+        default=0,
+        description="Approximate size in bytes above which query results are spooled to disk, 0 to never spool",
+    )
+    spool_page_rows: int = Field(default=5000, description="Records per page of a spooled result")
+    spool_ttl: int = Field(default=3600, description="Seconds spooled results and exports are kept")
+    spool_max_bytes: int = Field(
+        default=1024 * 1024 * 1024, description="Disk quota of spooled results and exports in bytes, 0 for no limit"
+    )
+
+    # Schema discovery settings
+    schema_discovery: str = Field(
+        default="auto", description="Schema discovery mode: 'auto', 'single-query' or 'per-measurement'"
+    )
+    schema_concurrency: int = Field(default=8, description="Maximum concurrent per-measurement schema queries")
+    schema_cache_ttl: int = Field(default=300, description="Schema cache TTL in seconds, 0 disables the cache")
+    schema_cache_stale_ttl: int = Field(
+        default=3600, description="Seconds past the TTL during which stale schema is served while refreshing"
+    )
+    schema_cache_max_bytes: int = Field(default=16 * 1024 * 1024, description="Schema cache memory budget in bytes")
+    schema_catalog_path: Optional[str] = Field(
+        default=None, description="SQLite file persisting the schema cache across restarts"
+    )
 
     class Config:
         env_prefix = "INFLUXDB_"
@@ -41,6 +132,57 @@ class InfluxDBConfig(BaseModel):
             raise ValueError("InfluxDB token cannot be empty")
         return v
 
+    @field_validator("schema_discovery")
+    @classmethod
+    def schema_discovery_must_be_known(cls, v):
+        if v not in ("auto", "single-query", "per-measurement"):
+            raise ValueError("Schema discovery mode must be 'auto', 'single-query' or 'per-measurement'")
+        return v
+
+    @field_validator("schema_concurrency")
+    @classmethod
+    def schema_concurrency_must_be_positive(cls, v):
+        if v < 1:
+            raise ValueError("Schema concurrency must be at least 1")
+        return v
+
+    @field_validator("sample_interval")
+    @classmethod
+    def sample_interval_must_be_a_duration(cls, v):
+        seconds = parse_duration(v)
+        if seconds is None or seconds <= 0:
+            raise ValueError("Sample interval must be a positive Flux duration such as '10s'")
+        return v
+
+    @field_validator("downsample_fn")
+    @classmethod
+    def downsample_fn_must_be_known(cls, v):
+        if v not in ("mean", "minmax"):
+            raise ValueError("Downsample function must be 'mean' or 'minmax'")
+        return v
+
+    @field_validator("estimate_action")
+    @classmethod
+    def estimate_action_must_be_known(cls, v):
+        if v not in ("aggregate", "reject"):
+            raise ValueError("Estimate action must be 'aggregate' or 'reject'")
+        return v
+
+    @field_validator("estimate_sample_window")
+    @classmethod
+    def estimate_sample_window_must_be_a_duration(cls, v):
+        seconds = parse_duration(v)
+        if seconds is None or seconds <= 0:
+            raise ValueError("Estimate sample window must be a positive Flux duration such as '5m'")
+        return v
+
+    @field_validator("spool_page_rows")
+    @classmethod
+    def spool_page_rows_must_be_positive(cls, v):
+        if v < 1:
+            raise ValueError("Spool page rows must be at least 1")
+        return v
+
     @field_validator("org")
     @classmethod
     def org_must_not_be_empty(cls, v):
@@ -51,8 +193,6 @@ class InfluxDBConfig(BaseModel):
 
 def get_config() -> InfluxDBConfig:
     """Get InfluxDB configuration from environment variables."""
-    import os
-
     # Get required values from environment
     token = os.getenv("INFLUXDB_TOKEN", "")
     org = os.getenv("INFLUXDB_ORG", "")
@@ -67,6 +207,36 @@ def get_config() -> InfluxDBConfig:
         "yes",
     )
     timeout = int(os.getenv("INFLUXDB_TIMEOUT", "5000"))  # Default timeout in milliseconds
+    connection_pool_size = int(os.getenv("INFLUXDB_CONNECTION_POOL_SIZE", "0")) or None
+    cursor_ttl = int(os.getenv("INFLUXDB_CURSOR_TTL", "300"))
+    max_open_cursors = int(os.getenv("INFLUXDB_MAX_OPEN_CURSORS", "32"))
+    max_rows = int(os.getenv("INFLUXDB_MAX_ROWS", "0"))
+    max_bytes = int(os.getenv("INFLUXDB_MAX_BYTES", "0"))
+    query_cache_ttl = int(os.getenv("INFLUXDB_QUERY_CACHE_TTL", "30"))
+    query_cache_historical_ttl = int(os.getenv("INFLUXDB_QUERY_CACHE_HISTORICAL_TTL", "3600"))
+    query_cache_max_bytes = int(os.getenv("INFLUXDB_QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    window_cache_ttl = int(os.getenv("INFLUXDB_WINDOW_CACHE_TTL", "900"))
+    window_cache_max_bytes = int(os.getenv("INFLUXDB_WINDOW_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    slow_query_ms = int(os.getenv("INFLUXDB_SLOW_QUERY_MS", "1000"))
+    slow_query_profile = os.getenv("INFLUXDB_SLOW_QUERY_PROFILE", "false").lower() in ("true", "1", "yes")
+    point_budget = int(os.getenv("INFLUXDB_POINT_BUDGET", "0"))
+    sample_interval = os.getenv("INFLUXDB_SAMPLE_INTERVAL", "10s")
+    downsample_fn = os.getenv("INFLUXDB_DOWNSAMPLE_FN", "mean").lower()
+    max_estimated_rows = int(os.getenv("INFLUXDB_MAX_ESTIMATED_ROWS", "0"))
+    estimate_action = os.getenv("INFLUXDB_ESTIMATE_ACTION", "aggregate").lower()
+    estimate_sample_window = os.getenv("INFLUXDB_ESTIMATE_SAMPLE_WINDOW", "5m")
+    estimate_cache_ttl = int(os.getenv("INFLUXDB_ESTIMATE_CACHE_TTL", "300"))
+    spool_dir = os.getenv("INFLUXDB_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "influxdb-mcp")
+    spool_threshold = int(os.getenv("INFLUXDB_SPOOL_THRESHOLD", "0"))
+    spool_page_rows = int(os.getenv("INFLUXDB_SPOOL_PAGE_ROWS", "5000"))
+    spool_ttl = int(os.getenv("INFLUXDB_SPOOL_TTL", "3600"))
+    spool_max_bytes = int(os.getenv("INFLUXDB_SPOOL_MAX_BYTES", str(1024 * 1024 * 1024)))
+    schema_discovery = os.getenv("INFLUXDB_SCHEMA_DISCOVERY", "auto").lower()
+    schema_concurrency = int(os.getenv("INFLUXDB_SCHEMA_CONCURRENCY", "8"))
+    schema_cache_ttl = int(os.getenv("INFLUXDB_SCHEMA_CACHE_TTL", "300"))
+    schema_cache_stale_ttl = int(os.getenv("INFLUXDB_SCHEMA_CACHE_STALE_TTL", "3600"))
+    schema_cache_max_bytes = int(os.getenv("INFLUXDB_SCHEMA_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    schema_catalog_path = os.getenv("INFLUXDB_SCHEMA_CATALOG") or None
 
     return InfluxDBConfig(
         host=host,
@@ -76,4 +246,34 @@ def get_config() -> InfluxDBConfig:
         use_ssl=use_ssl,
         verify_ssl=verify_ssl,
         timeout=timeout,
+        connection_pool_size=connection_pool_size,
+        cursor_ttl=cursor_ttl,
+        max_open_cursors=max_open_cursors,
+        max_rows=max_rows,
+        max_bytes=max_bytes,
+        query_cache_ttl=query_cache_ttl,
+        query_cache_historical_ttl=query_cache_historical_ttl,
+        query_cache_max_bytes=query_cache_max_bytes,
+        window_cache_ttl=window_cache_ttl,
+        window_cache_max_bytes=window_cache_max_bytes,
+        slow_query_ms=slow_query_ms,
+        slow_query_profile=slow_query_profile,
+        point_budget=point_budget,
+        sample_interval=sample_interval,
+        downsample_fn=downsample_fn,
+        max_estimated_rows=max_estimated_rows,
+        estimate_action=estimate_action,
+        estimate_sample_window=estimate_sample_window,
+        estimate_cache_ttl=estimate_cache_ttl,
+        spool_dir=spool_dir,
+        spool_threshold=spool_threshold,
+        spool_page_rows=spool_page_rows,
+        spool_ttl=spool_ttl,
+        spool_max_bytes=spool_max_bytes,
+        schema_discovery=schema_discovery,
+        schema_concurrency=schema_concurrency,
+        schema_cache_ttl=schema_cache_ttl,
+        schema_cache_stale_ttl=schema_cache_stale_ttl,
+        schema_cache_max_bytes=schema_cache_max_bytes,
+        schema_catalog_path=schema_catalog_path,
     )
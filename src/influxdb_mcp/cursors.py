@@ -0,0 +1,113 @@
+"""
+Registry of open streaming query cursors used for paged query results.
+"""
+
+import asyncio
+import logging
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+# Marks a cursor without a row read ahead of the current page
+NO_ROW = object()
+
+
+@dataclass
+class QueryCursor:
+    """An open query result stream positioned after the last returned page."""
+
+    id: str
+    query: str
+    rows: Any  # Iterator or AsyncIterator of result rows
+    page_size: int
+    result_format: str = "records"
+    last_used: float = field(default_factory=time.monotonic)
+    pages: int = 0
+    records: int = 0
+    lookahead: Any = NO_ROW
+
+
+class CursorRegistry:
+    """Keeps open result streams between page requests, closing idle ones after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_open: int):
+        self.ttl = ttl
+        self.max_open = max_open
+        self._cursors: Dict[str, QueryCursor] = {}
+        self._lock = threading.Lock()
+        # Closing async result streams, referenced until done so they are not garbage collected
+        self._closing: Set["asyncio.Task[None]"] = set()
+
+    def open(self, query: str, rows: Any, page_size: int, result_format: str = "records") -> QueryCursor:
+        """Register a new result stream, closing the least recently used one when too many are open."""
+        cursor = QueryCursor(
+            id=secrets.token_urlsafe(16), query=query, rows=rows, page_size=page_size, result_format=result_format
+        )
+        closing: List[QueryCursor] = self._expired()
+        with self._lock:
+            while len(self._cursors) >= self.max_open:
+                oldest = min(self._cursors.values(), key=lambda c: c.last_used)
+                closing.append(self._cursors.pop(oldest.id))
+            self._cursors[cursor.id] = cursor
+        for expired in closing:
+            self.close(expired)
+        return cursor
+
+    def take(self, cursor_id: str) -> QueryCursor:
+        """Remove a cursor from the registry for exclusive use while its next page is read."""
+        for expired in self._expired():
+            self.close(expired)
+        with self._lock:
+            cursor = self._cursors.pop(cursor_id, None)
+        if cursor is None:
+            raise RuntimeError(f"Unknown or expired cursor '{cursor_id}', re-run the query")
+        return cursor
+
+    def keep(self, cursor: QueryCursor) -> None:
+        """Return a cursor to the registry after a page has been read from it."""
+        cursor.last_used = time.monotonic()
+        with self._lock:
+            self._cursors[cursor.id] = cursor
+
+    def close(self, cursor: QueryCursor) -> None:
+        """Close the result stream of a cursor, releasing its HTTP response."""
+        with self._lock:
+            self._cursors.pop(cursor.id, None)
+        rows = cursor.rows
+        try:
+            if hasattr(rows, "aclose"):
+                try:
+                    task = asyncio.get_running_loop().create_task(rows.aclose())
+                except RuntimeError:
+                    logger.debug(f"No event loop to close cursor {cursor.id}")
+                else:
+                    self._closing.add(task)
+                    task.add_done_callback(lambda task: self._closed(cursor.id, task))
+            elif hasattr(rows, "close"):
+                rows.close()
+        except Exception as e:
+            logger.warning(f"Failed to close cursor {cursor.id}: {e}")
+
+    def _closed(self, cursor_id: str, task: "asyncio.Task[None]") -> None:
+        """Release a finished close task of an async result stream, logging its failure."""
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to close cursor {cursor_id}: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of open cursors and settings."""
+        with self._lock:
+            return {"open": len(self._cursors), "max_open": self.max_open, "ttl_s": self.ttl}
+
+    def _expired(self) -> List[QueryCursor]:
+        """Remove and return cursors idle for longer than the TTL."""
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [cursor for cursor in self._cursors.values() if cursor.last_used < deadline]
+            for cursor in expired:
+                del self._cursors[cursor.id]
+        return expired
@@ -0,0 +1,195 @@
+"""
+Downsampling of query results with Largest-Triangle-Three-Buckets (LTTB).
+
+LTTB keeps the first and last point of a series and, from each of the
+buckets in between, the point forming the largest triangle with the point
+kept from the previous bucket and the average of the next bucket. It keeps
+the peaks and the visual shape of a series with a small fraction of its
+points. Every Flux table is downsampled on its own, along `_time` and
+`_value`; tables whose values are not numbers are sampled at even intervals.
+
+Uses NumPy when installed (the `downsampling` extra), plain Python otherwise.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - downsampling extra not installed
+    np = None  # type: ignore[assignment]
+
+from .results import TABLE_COLUMNS
+
+# LTTB keeps the first and last point and at least one point in between
+MIN_POINTS = 3
+
+
+def check_max_points(max_points: int) -> None:
+    """Reject point budgets too small for LTTB."""
+    if max_points < MIN_POINTS:
+        raise ValueError(f"max_points_per_series must be at least {MIN_POINTS}")
+
+
+def _bounds(length: int, threshold: int) -> List[Tuple[int, int]]:
+    """Index ranges of the buckets between the first and the last point."""
+    every = (length - 2) / (threshold - 2)
+    return [(int(i * every) + 1, int((i + 1) * every) + 1) for i in range(threshold - 2)]
+
+
+def _lttb_numpy(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+    xs = xs - xs[0]
+    length = len(xs)
+    bounds = _bounds(length, threshold) + [(length - 1, length)]
+    starts = np.array([start for start, _ in bounds])
+    ends = np.array([end for _, end in bounds])
+    # Averages of all buckets at once from cumulative sums, the last bucket is the last point
+    x_sums = np.concatenate(([0.0], np.cumsum(xs)))
+    y_sums = np.concatenate(([0.0], np.cumsum(ys)))
+    x_averages = (x_sums[ends] - x_sums[starts]) / (ends - starts)
+    y_averages = (y_sums[ends] - y_sums[starts]) / (ends - starts)
+    # The doubled triangle area of a, point j and the next average is |xa * p + ya * q + r|,
+    # with p, q and r independent of the point a kept from the previous bucket
+    sizes = ends[:-1] - starts[:-1]
+    x_next = np.repeat(x_averages[1:], sizes)
+    y_next = np.repeat(y_averages[1:], sizes)
+    points = slice(1, length - 1)
+    p = ys[points] - y_next
+    q = x_next - xs[points]
+    r = xs[points] * y_next - x_next * ys[points]
+    selected = [0]
+    a = 0
+    for start, end in bounds[:-1]:
+        areas = np.abs(xs[a] * p[start - 1 : end - 1] + ys[a] * q[start - 1 : end - 1] + r[start - 1 : end - 1])
+        a = start + int(np.argmax(areas))
+        selected.append(a)
+    selected.append(length - 1)
+    return selected
+
+
+def _lttb_python(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    length = len(x)
+    bounds = _bounds(length, threshold) + [(length - 1, length)]
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i]
+        next_start, next_end = bounds[i + 1]
+        count = next_end - next_start
+        x_average = sum(x[next_start:next_end]) / count
+        y_average = sum(y[next_start:next_end]) / count
+        x_a, y_a = x[a], y[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x_a - x_average) * (y[j] - y_a) - (x_a - x[j]) * (y_average - y_a))
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        selected.append(a)
+    selected.append(length - 1)
+    return selected
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """Indices of the points of a series kept by LTTB, all of them when it has at most `threshold` points."""
+    if len(x) <= threshold:
+        return list(range(len(x)))
+    if np is not None:
+        return _lttb_numpy(x, y, threshold)
+    return _lttb_python(x, y, threshold)
+
+
+def _seconds(value: Any) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def series_indices(times: List[Any], values: List[Any], threshold: int) -> List[int]:
+    """Indices of the points of a series to keep, by LTTB for numeric values and at even intervals otherwise."""
+    length = len(values)
+    if length <= threshold:
+        return list(range(length))
+    y = [_number(value) for value in values]
+    if any(value is None for value in y):
+        return sorted({round(i * (length - 1) / (threshold - 1)) for i in range(threshold)})
+    x = [_seconds(value) for value in times]
+    if any(value is None for value in x):
+        x = list(range(length))
+    return lttb_indices(x, y, threshold)  # type: ignore[arg-type]
+
+
+@dataclass
+class Reduction:
+    """Counts of points and series before and after downsampling a result."""
+
+    max_points: int
+    series: int = 0
+    downsampled_series: int = 0
+    points_before: int = 0
+    points_after: int = 0
+
+    def add(self, before: int, after: int) -> None:
+        self.series += 1
+        self.downsampled_series += after < before
+        self.points_before += before
+        self.points_after += after
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "max_points_per_series": self.max_points,
+            "series": self.series,
+            "downsampled_series": self.downsampled_series,
+            "points_before": self.points_before,
+            "points_after": self.points_after,
+            "reduction_ratio": round(self.points_before / self.points_after, 2) if self.points_after else 1.0,
+        }
+
+
+def downsample_tables(tables: Iterable[Any], max_points: int) -> Dict[str, Any]:
+    """Downsample the records of Flux tables in place, before they are converted."""
+    reduction = Reduction(max_points)
+    for table in tables:
+        records = table.records
+        if len(records) > max_points:
+            keep = series_indices(
+                [record.values.get("_time") for record in records],
+                [record.values.get("_value") for record in records],
+                max_points,
+            )
+            table.records = [records[i] for i in keep]
+        reduction.add(len(records), len(table.records))
+    return reduction.as_dict()
+
+
+def downsample_rows(rows: List[Dict[str, Any]], max_points: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Downsample converted rows, every run of rows of the same result and table being a series."""
+    reduction = Reduction(max_points)
+    kept: List[Dict[str, Any]] = []
+    start = 0
+    while start < len(rows):
+        first = rows[start]
+        end = start + 1
+        while end < len(rows) and all(rows[end].get(label) == first.get(label) for label in TABLE_COLUMNS):
+            end += 1
+        series = rows[start:end]
+        if len(series) > max_points:
+            keep = series_indices(
+                [row.get("_time") for row in series], [row.get("_value") for row in series], max_points
+            )
+            series = [series[i] for i in keep]
+        kept.extend(series)
+        reduction.add(end - start, len(series))
+        start = end
+    return kept, reduction.as_dict()
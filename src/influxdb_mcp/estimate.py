@@ -0,0 +1,268 @@
+"""
+Cost estimates of Flux queries before they are executed.
+
+The bucket, `range()` and `filter()` predicates of a single `from()` pipeline
+are read from the query text. The number of series the query reads is asked
+from InfluxDB with `influxdb.cardinality()` and their write rate is sampled
+by counting the points of the last minutes of the range; both statistics are
+cached. Rows are predicted from the stages of the pipeline: every point for
+row filters, one row per window for `aggregateWindow()`, one per series for
+selectors and aggregates and at most `n` per series for `limit()`.
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .flux import (
+    TimeRange,
+    format_time,
+    normalize_query,
+    parse_duration,
+    parse_time,
+    split_conjunction,
+    split_pipeline,
+    stage_call,
+)
+from .schema import flux_string
+from .windows import ROW_STAGES
+
+# Memory budget of the cached cardinalities and write rate samples
+STATISTICS_CACHE_BYTES = 4 * 1024 * 1024
+
+# Size of a row in the records format when no rows were sampled
+DEFAULT_ROW_BYTES = 160
+
+# Stages returning as many rows as they read, at most
+ROW_PRESERVING_STAGES = (
+    *ROW_STAGES,
+    "group",
+    "sort",
+    "map",
+    "rename",
+    "set",
+    "duplicate",
+    "fill",
+    "timeShift",
+    "toBool",
+    "toFloat",
+    "toInt",
+    "toString",
+    "toUInt",
+    "yield",
+)
+
+# Selectors and aggregates returning one row per table
+SINGLE_ROW_STAGES = ("first", "last", "min", "max", "count", "sum", "mean", "median", "spread", "stddev", "integral")
+
+IMPORTS_RE = re.compile(r'^(?:import "[^"]*" ?)*$')
+
+PREDICATE_RE = re.compile(r"^\(r\)=>(.+)$")
+
+# Columns of points rather than of series, the cardinality predicate only accepts series columns
+POINT_COLUMNS_RE = re.compile(r'r(?:\.|\[")_(?:value|time|start|stop)\b')
+
+
+@dataclass
+class QueryScope:
+    """What a single `from() |> range()` pipeline reads and the stages transforming it."""
+
+    bucket: str
+    time_range: TimeRange
+    predicates: List[str] = field(default_factory=list)
+    stages: List[Tuple[str, Dict[str, str]]] = field(default_factory=list)
+
+    @property
+    def series_predicate(self) -> Optional[str]:
+        """Predicate of `influxdb.cardinality()` from the filters on series columns, None to count all series."""
+        series = [
+            condition
+            for predicate in self.predicates
+            for condition in split_conjunction(predicate)
+            if not POINT_COLUMNS_RE.search(condition)
+        ]
+        if not series:
+            return None
+        return "(r)=>" + " and ".join(f"({predicate})" for predicate in series)
+
+
+def parse_scope(query: str) -> QueryScope:
+    """Read the bucket, range, leading filters and later stages of a query.
+
+    Raises ValueError for queries that cannot be estimated.
+    """
+    text = normalize_query(query)
+    start = text.find("from(")
+    if start < 0 or not IMPORTS_RE.match(text[:start]):
+        raise ValueError("Only a single from() |> range() pipeline can be estimated")
+    stages = split_pipeline(text[start:])
+    calls = [stage_call(stage) for stage in stages]
+    if len(calls) < 2 or any(call is None for call in calls):
+        raise ValueError("Only a single from() |> range() pipeline can be estimated")
+    (source, source_arguments), (bounds, range_arguments) = calls[0], calls[1]  # type: ignore[misc]
+    bucket = source_arguments.get("bucket", "")
+    if source != "from" or not bucket.startswith('"'):
+        raise ValueError("Only queries of from() with a bucket name can be estimated")
+    if bounds != "range" or "start" not in range_arguments:
+        raise ValueError("Only queries bounded by range() right after from() can be estimated")
+
+    scope = QueryScope(
+        bucket=json.loads(bucket), time_range=TimeRange(range_arguments["start"], range_arguments.get("stop"))
+    )
+    position = 2
+    # Filters read by the storage engine, up to the first stage transforming the rows
+    while position < len(calls) and calls[position][0] in ROW_STAGES:  # type: ignore[index]
+        name, arguments = calls[position]  # type: ignore[misc]
+        match = PREDICATE_RE.match(arguments.get("fn", ""))
+        if name == "filter" and match:
+            scope.predicates.append(match.group(1))
+        position += 1
+    scope.stages = calls[position:]  # type: ignore[assignment]
+    return scope
+
+
+def cardinality_query(scope: QueryScope) -> str:
+    """Build a Flux query counting the series the query reads."""
+    arguments = [f"bucket: {flux_string(scope.bucket)}", f"start: {scope.time_range.start}"]
+    if scope.time_range.stop is not None:
+        arguments.append(f"stop: {scope.time_range.stop}")
+    if scope.series_predicate:
+        arguments.append(f"predicate: {scope.series_predicate}")
+    return f"""
+import "influxdata/influxdb"
+influxdb.cardinality({", ".join(arguments)})
+"""
+
+
+def sample_range(scope: QueryScope, seconds: float, now: datetime) -> TimeRange:
+    """The last `seconds` of the range of the query, written relative to now when the range is."""
+    duration = scope.time_range.duration(now)
+    if duration is None or duration <= seconds:
+        return scope.time_range
+    stop = scope.time_range.stop
+    if stop is None or stop == "now()":
+        return TimeRange(f"-{math.ceil(seconds)}s")
+    offset = parse_duration(stop)
+    if offset is not None:
+        return TimeRange(f"{math.floor(offset - seconds)}s", stop)
+    stop_time = parse_time(stop)
+    if stop_time is None:
+        return scope.time_range
+    return TimeRange(format_time(stop_time - timedelta(seconds=seconds)), stop)
+
+
+def sample_query(scope: QueryScope, time_range: TimeRange, seconds: float) -> str:
+    """Build a Flux query counting the points of every series over the sample range."""
+    bounds = f"start: {time_range.start}" + ("" if time_range.stop is None else f", stop: {time_range.stop}")
+    filters = "".join(f"\n  |> filter(fn: (r) => {predicate})" for predicate in scope.predicates)
+    return f"""
+from(bucket: {flux_string(scope.bucket)})
+  |> range({bounds}){filters}
+  |> aggregateWindow(every: {math.ceil(seconds)}s, fn: count, createEmpty: false)
+"""
+
+
+def rows_per_series(
+    stages: List[Tuple[str, Dict[str, str]]], duration: float, points: float
+) -> Tuple[float, List[str]]:
+    """Rows per series returned by the stages after the filters and the stages whose effect is not modeled.
+
+    Modeling stops at the first stage it does not know, the rows read by that
+    stage are then returned.
+    """
+    rows = points
+    unmodeled: List[str] = []
+    for position, (name, arguments) in enumerate(stages):
+        if name in ROW_PRESERVING_STAGES:
+            continue
+        every = parse_duration(arguments.get("every", "")) if name == "aggregateWindow" else None
+        count = arguments.get("n", "")
+        if every and every > 0:
+            windows = math.ceil(duration / every)
+            rows = min(rows, windows) if arguments.get("createEmpty") == "false" else windows
+        elif name in SINGLE_ROW_STAGES:
+            rows = min(rows, 1)
+        elif name in ("limit", "tail") and count.isdigit():
+            rows = min(rows, int(count))
+        else:
+            unmodeled = [name for name, _ in stages[position:]]
+            break
+    return rows, unmodeled
+
+
+@dataclass
+class Estimate:
+    """Predicted size of the result of a query and the statistics it was derived from."""
+
+    bucket: str
+    duration: float
+    series: int
+    series_source: str
+    points_per_second: float
+    rate_source: str
+    row_bytes: float
+    points: int
+    rows: int
+    unmodeled_stages: List[str]
+
+    @property
+    def bytes(self) -> int:
+        return int(self.rows * self.row_bytes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket": self.bucket,
+            "range_s": self.duration,
+            "series": self.series,
+            "series_source": self.series_source,
+            "points_per_series_per_second": self.points_per_second,
+            "rate_source": self.rate_source,
+            "scanned_points": self.points,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "unmodeled_stages": self.unmodeled_stages,
+        }
+
+
+def estimate_cost(
+    scope: QueryScope,
+    cardinality: Dict[str, Any],
+    sample: Dict[str, Any],
+    sample_interval: float,
+    now: datetime,
+) -> Estimate:
+    """Predict the points scanned and the rows and bytes returned by a query from its statistics.
+
+    `cardinality` holds the series counted by `influxdb.cardinality()`, None
+    when the server could not count them; the series seen in the sample are
+    used then. Without points in the sample, every series is assumed to
+    have a point every `sample_interval` seconds.
+    """
+    duration = scope.time_range.duration(now)
+    if duration is None or duration <= 0:
+        raise ValueError("Only queries with a range() of literal times or durations can be estimated")
+    if cardinality.get("series") is not None:
+        series, series_source = cardinality["series"], "cardinality"
+    else:
+        series, series_source = sample["series"], "sample"
+    if sample["points"]:
+        rate, rate_source = sample["points"] / sample["series"] / sample["seconds"], "sample"
+    else:
+        rate, rate_source = 1 / sample_interval, "sample_interval"
+    points = series * rate * duration
+    rows, unmodeled = rows_per_series(scope.stages, duration, rate * duration)
+    return Estimate(
+        bucket=scope.bucket,
+        duration=duration,
+        series=series,
+        series_source=series_source,
+        points_per_second=rate,
+        rate_source=rate_source,
+        row_bytes=sample.get("row_bytes") or DEFAULT_ROW_BYTES,
+        points=math.ceil(points),
+        rows=math.ceil(series * rows),
+        unmodeled_stages=unmodeled,
+    )
@@ -0,0 +1,301 @@
+"""
+Export of query results to Parquet files through Apache Arrow.
+
+The annotated CSV response is read in chunks. Annotation and header lines
+are parsed with the csv module, while the runs of data rows between them are
+handed as raw bytes to the multithreaded Arrow CSV reader, with column types
+taken from the `#datatype` annotations and string group key columns (tags,
+`_measurement`, `_field`) dictionary encoded. Tables are appended to one
+Parquet file per distinct schema as they arrive, so memory use is bounded by
+the batch size regardless of the size of the result.
+
+Requires the `arrow` extra (pyarrow).
+"""
+
+import csv
+import io
+import json
+import logging
+import math
+import os
+import re
+import secrets
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - arrow extra not installed
+    pa = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COMPRESSIONS = ("zstd", "snappy", "gzip", "none")
+
+# Rows buffered before they are written as a Parquet row group
+BATCH_ROWS = 256 * 1024
+
+# Bytes of the HTTP response read at a time
+CHUNK_SIZE = 1024 * 1024
+
+MANIFEST = "manifest.json"
+
+EXPORT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Data rows start with the empty annotation column, any other line ends a block of tables
+BLOCK_END_RE = re.compile(rb"\n[^,]")
+
+
+def _arrow_types() -> Dict[str, Any]:
+    """Arrow types of the annotated CSV datatypes, others are kept as strings."""
+    timestamp = pa.timestamp("ns", tz="UTC")
+    return {
+        "long": pa.int64(),
+        "unsignedLong": pa.uint64(),
+        "double": pa.float64(),
+        "boolean": pa.bool_(),
+        "dateTime:RFC3339": timestamp,
+        "dateTime:RFC3339Nano": timestamp,
+    }
+
+
+class ParquetExport:
+    """Writes an annotated CSV query response to Parquet files in a directory, one file per table schema."""
+
+    def __init__(self, directory: str, compression: str = "zstd", batch_rows: int = BATCH_ROWS):
+        if pa is None:
+            raise RuntimeError(
+                "Parquet export requires pyarrow, install the 'arrow' extra: pip install influxdb-mcp[arrow]"
+            )
+        if compression not in EXPORT_COMPRESSIONS:
+            raise ValueError(f"Invalid compression '{compression}', expected one of: {', '.join(EXPORT_COMPRESSIONS)}")
+        self.directory = directory
+        self.compression = None if compression == "none" else compression
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self.tables = 0
+        self._types = _arrow_types()
+        self._pending = b""
+        # Annotations and header of the current block of tables
+        self._datatypes: List[str] = []
+        self._groups: List[bool] = []
+        self._defaults: List[str] = []
+        self._columns: Optional[List[str]] = None
+        self._read_options: Any = None
+        self._convert_options: Any = None
+        self._defaulted: Dict[str, Tuple[str, Any]] = {}
+        # Converted tables of the current block not written yet
+        self._buffer: List[Any] = []
+        self._buffered_rows = 0
+        # Id of the table of the last converted row, None at the start of a block
+        self._last_table: Optional[int] = None
+        self._files: Dict[Tuple[Tuple[str, str], ...], Dict[str, Any]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def feed(self, data: bytes) -> None:
+        """Convert the complete rows of the next chunk of the response."""
+        self._pending += data
+        self._consume(final=False)
+
+    def close(self) -> Dict[str, Any]:
+        """Write the remaining rows, close the files and return the export summary."""
+        self._consume(final=True)
+        self._end_block()
+        files = []
+        for file in self._files.values():
+            file["writer"].close()
+            files.append(
+                {
+                    "name": file["name"],
+                    "rows": file["rows"],
+                    "bytes": os.path.getsize(os.path.join(self.directory, file["name"])),
+                    "columns": [{"name": field.name, "type": str(field.type)} for field in file["schema"]],
+                }
+            )
+        return {
+            "rows": self.rows,
+            "tables": self.tables,
+            "bytes": sum(file["bytes"] for file in files),
+            "files": files,
+        }
+
+    def abort(self) -> None:
+        """Close the files and remove the incomplete export."""
+        for file in self._files.values():
+            try:
+                file["writer"].close()
+            except Exception as e:
+                logger.warning(f"Failed to close {file['name']} of export {self.directory}: {e}")
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _consume(self, final: bool) -> None:
+        buffer = self._pending
+        position = 0
+        while position < len(buffer):
+            if self._columns is None:
+                end = buffer.find(b"\n", position)
+                if end < 0:
+                    if not final:
+                        break
+                    end = len(buffer) - 1
+                self._annotation_line(buffer[position : end + 1].decode())
+                position = end + 1
+                continue
+            end, block_end = self._data_end(buffer, position, final)
+            if end > position:
+                self._read_rows(buffer[position:end])
+            position = end
+            if not block_end:
+                break
+            self._end_block()
+        self._pending = buffer[position:]
+
+    def _data_end(self, buffer: bytes, position: int, final: bool) -> Tuple[int, bool]:
+        """End of the data rows starting at `position` and whether the block of tables ends there.
+
+        Without the end of the block in the buffer, the rows end after the last
+        complete line. Newlines inside quoted values are skipped.
+        """
+        if buffer[position : position + 1] != b",":
+            return position, True
+        match = BLOCK_END_RE.search(buffer, position)
+        while match and buffer.count(b'"', position, match.start()) % 2:
+            match = BLOCK_END_RE.search(buffer, match.start() + 1)
+        if match:
+            return match.start() + 1, True
+        if final:
+            return len(buffer), False
+        cut = buffer.rfind(b"\n", position) + 1
+        while cut > position and buffer.count(b'"', position, cut) % 2:
+            cut = buffer.rfind(b"\n", position, cut - 1) + 1
+        return max(cut, position), False
+
+    def _annotation_line(self, line: str) -> None:
+        """Parse an annotation, header or empty line between blocks of tables."""
+        record = next(csv.reader([line]), [])
+        if not any(record):
+            self._end_block()
+            return
+        if record[0] == "#datatype":
+            self._datatypes = record[1:]
+        elif record[0] == "#group":
+            self._groups = [value == "true" for value in record[1:]]
+        elif record[0] == "#default":
+            self._defaults = record[1:]
+        elif not record[0].startswith("#"):
+            self._start_block(record[1:])
+
+    def _start_block(self, columns: List[str]) -> None:
+        """Prepare the Arrow CSV reader for the rows of a block from its header and annotations."""
+        self._columns = columns
+        types = {}
+        self._defaulted = {}
+        for index, name in enumerate(columns):
+            datatype = self._datatypes[index] if index < len(self._datatypes) else "string"
+            arrow_type = self._types.get(datatype)
+            if arrow_type is None:
+                group = name == "result" or (index < len(self._groups) and self._groups[index])
+                arrow_type = pa.dictionary(pa.int32(), pa.string()) if group else pa.string()
+            default = self._defaults[index] if index < len(self._defaults) else ""
+            if default:
+                # Read as strings, empty values are replaced by the default before the conversion
+                self._defaulted[name] = (default, arrow_type)
+                arrow_type = pa.string()
+            types[name] = arrow_type
+        self._read_options = pa_csv.ReadOptions(column_names=["", *columns])
+        self._convert_options = pa_csv.ConvertOptions(
+            column_types=types, include_columns=columns, null_values=[""], strings_can_be_null=True
+        )
+
+    def _read_rows(self, data: bytes) -> None:
+        """Convert a run of data rows of the current block."""
+        if self._columns and "error" in self._columns and "reference" in self._columns:
+            # Flux reports errors after the response started as a table with an error column
+            record = next(csv.reader(io.StringIO(data.decode())))
+            raise RuntimeError(f"Query failed: {record[1 + self._columns.index('error')]}")
+        table = pa_csv.read_csv(
+            io.BytesIO(data), read_options=self._read_options, convert_options=self._convert_options
+        )
+        for name, (default, arrow_type) in self._defaulted.items():
+            column = pc.fill_null(table.column(name), default)
+            if pa.types.is_dictionary(arrow_type):
+                column = column.dictionary_encode()
+            else:
+                column = column.cast(arrow_type)
+            table = table.set_column(table.schema.get_field_index(name), name, column)
+        if self._columns and "table" in self._columns and table.num_rows:
+            self._count_tables(table.column("table"))
+        self._buffer.append(table)
+        self._buffered_rows += table.num_rows
+        if self._buffered_rows >= self.batch_rows:
+            self._flush()
+
+    def _count_tables(self, table: Any) -> None:
+        """Count the tables of converted rows; rows of a table are contiguous and each result starts a new block."""
+        changes = pc.sum(pc.not_equal(table.slice(1), table.slice(0, len(table) - 1))).as_py() or 0
+        self.tables += changes + (0 if table[0].as_py() == self._last_table else 1)
+        self._last_table = table[-1].as_py()
+
+    def _end_block(self) -> None:
+        self._flush()
+        self._columns = None
+        self._last_table = None
+
+    def _flush(self) -> None:
+        """Append the buffered rows to the file of their schema."""
+        if not self._buffer:
+            return
+        table = pa.concat_tables(self._buffer)
+        self._buffer = []
+        self._buffered_rows = 0
+        key = tuple((field.name, str(field.type)) for field in table.schema)
+        file = self._files.get(key)
+        if file is None:
+            name = f"part-{len(self._files):04d}.parquet"
+            writer = pq.ParquetWriter(os.path.join(self.directory, name), table.schema, compression=self.compression)
+            file = self._files[key] = {"name": name, "schema": table.schema, "writer": writer, "rows": 0}
+        file["writer"].write_table(table)
+        file["rows"] += table.num_rows
+        self.rows += table.num_rows
+
+
+def new_export_id() -> str:
+    return secrets.token_hex(16)
+
+
+def export_directory(spool_dir: str, export_id: str) -> str:
+    """Directory of an export, rejecting ids that are not export ids."""
+    if not EXPORT_ID_RE.match(export_id):
+        raise ValueError(f"Invalid export id '{export_id}'")
+    return os.path.join(spool_dir, "exports", export_id)
+
+
+def write_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_manifest(spool_dir: str, export_id: str) -> Dict[str, Any]:
+    """Manifest of a completed export."""
+    path = os.path.join(export_directory(spool_dir, export_id), MANIFEST)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest: Optional[Dict[str, Any]] = json.load(f)
+    except FileNotFoundError:
+        manifest = None
+    if manifest is None or manifest.get("expires", math.inf) < time.time():
+        raise ValueError(f"Export '{export_id}' not found or expired, re-run the export")
+    return manifest
+
+
+def read_export_file(spool_dir: str, export_id: str, name: str) -> bytes:
+    """Content of a Parquet file of a completed export."""
+    manifest = read_manifest(spool_dir, export_id)
+    if name not in {file["name"] for file in manifest["files"]}:
+        raise ValueError(f"Export '{export_id}' has no file '{name}'")
+    with open(os.path.join(export_directory(spool_dir, export_id), name), "rb") as f:
+        return f.read()
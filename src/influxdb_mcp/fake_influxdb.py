@@ -0,0 +1,629 @@
+"""
+Local stand-in for an InfluxDB v2 server, for benchmarks and offline tests.
+
+Serves deterministic synthetic series over the InfluxDB v2 HTTP API:
+annotated CSV from `/api/v2/query`, `/api/v2/buckets`, `/health` and `/ping`.
+
+Usage: python -m influxdb_mcp.fake_influxdb [--port 8086] [--measurements 10] [--series 10] [--latency-ms 5]
+
+Every bucket holds the same measurements, each with `series` tag combinations
+(`host`, `region`) and `fields` float fields sampled every `interval` seconds.
+Values are sine waves whose parameters are derived from the series key, so a
+query returns the same data on every run for the same time range; `--now` pins
+the clock to make relative ranges reproducible too.
+
+Supported queries are the schema discovery queries of this server,
+`influxdb.cardinality()` with a predicate on series columns and single
+pipelines of `from() |> range()` followed by `filter()` with comparisons of
+columns to literals, `aggregateWindow()` with mean, sum, count, min, max, first
+or last, `limit()` and `yield()`. Other stages are ignored.
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+import socket
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, cast
+from urllib.parse import parse_qs, urlparse
+
+from typing_extensions import Self
+
+from .flux import TimeRange, call_arguments, normalize_query, parse_duration, parse_time, split_pipeline, stage_call
+
+logger = logging.getLogger(__name__)
+
+VERSION = "v2.7.11"
+BUILD = "OSS"
+
+# Tag keys of every series; region takes REGIONS distinct values
+TAG_KEYS = ("host", "region")
+REGIONS = 4
+
+# Periods (s) of the synthetic sine waves
+PERIODS = (600.0, 3600.0, 86400.0)
+
+AGGREGATES = ("mean", "sum", "count", "min", "max", "first", "last")
+
+# Rows are sent in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+DATA_HEADER = (
+    "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,{value_type},string,string,string,string\n"
+    "#group,false,false,true,true,false,false,true,true,true,true\n"
+    "#default,{result},,,,,,,,,\n"
+    ",result,table,_start,_stop,_time,_value,_field,_measurement,host,region\n"
+)
+
+CARDINALITY_HEADER = "#datatype,string,long,long\n#group,false,false,false\n#default,_result,,\n,result,table,_value\n"
+
+VALUES_HEADER = "#datatype,string,long,string\n#group,false,false,false\n#default,{result},,\n,result,table,_value\n"
+
+MEASUREMENT_VALUES_HEADER = (
+    "#datatype,string,long,string,string\n"
+    "#group,false,false,true,false\n"
+    "#default,{result},,,\n"
+    ",result,table,_measurement,_value\n"
+)
+
+FILTER_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*")'
+    r'|(?P<column>r\.(?P<attr>\w+)|r\["(?P<key>[^"]+)"\])'
+    r"|(?P<number>\d+(?:\.\d+)?)"
+    r"|(?P<op>==|!=|<=|>=|<|>|\(|\)|-)"
+    r"|(?P<word>and|or|not|exists|true|false))"
+)
+
+
+class QueryError(Exception):
+    """A query the fake server rejects, answered like InfluxDB with a status code and JSON error."""
+
+    def __init__(self, message: str, status: int = 400, code: str = "invalid"):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+@dataclass
+class Dataset:
+    """Shape of the synthetic data served by the fake server."""
+
+    buckets: List[str] = field(default_factory=lambda: ["telegraf"])
+    measurements: int = 10
+    series: int = 10
+    fields: int = 3
+    interval: float = 60.0
+    seed: int = 0
+
+    def measurement_names(self) -> List[str]:
+        return [f"measurement_{i:04d}" for i in range(self.measurements)]
+
+    def field_names(self) -> List[str]:
+        return [f"field_{i}" for i in range(self.fields)]
+
+    def series_tags(self) -> List[Dict[str, str]]:
+        return [{"host": f"host-{i:04d}", "region": f"region-{i % REGIONS}"} for i in range(self.series)]
+
+
+@dataclass
+class Series:
+    """One field of one tag combination, with the parameters of its sine wave."""
+
+    measurement: str
+    field: str
+    tags: Dict[str, str]
+    base: float
+    amplitude: float
+    period: float
+    phase: float
+
+    def value(self, t: float) -> float:
+        return self.base + self.amplitude * math.sin(2 * math.pi * t / self.period + self.phase)
+
+    def total(self, first: float, count: int, interval: float) -> float:
+        """Sum of `count` values from time `first` every `interval` seconds, in closed form."""
+        angle = 2 * math.pi * first / self.period + self.phase
+        step = 2 * math.pi * interval / self.period
+        half = math.sin(step / 2)
+        if abs(half) < 1e-12:
+            waves = count * math.sin(angle)
+        else:
+            waves = math.sin(count * step / 2) / half * math.sin(angle + (count - 1) * step / 2)
+        return count * self.base + self.amplitude * waves
+
+
+def make_series(dataset: Dataset, measurement: str, field: str, tags: Dict[str, str]) -> Series:
+    """Derive the deterministic sine wave of a series from its key."""
+    key = f"{dataset.seed}:{measurement}:{field}:{tags['host']}"
+    h = zlib.crc32(key.encode())
+    return Series(
+        measurement=measurement,
+        field=field,
+        tags=tags,
+        base=float(h % 100),
+        amplitude=float(1 + (h >> 8) % 20),
+        period=PERIODS[(h >> 16) % len(PERIODS)],
+        phase=((h >> 20) % 360) * math.pi / 180,
+    )
+
+
+def rfc3339(timestamp: float) -> str:
+    """Format epoch seconds as an RFC3339 UTC time."""
+    value = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    if timestamp == int(timestamp):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def compile_filter(predicate: str) -> Tuple[Callable[[Dict[str, Any]], bool], set]:
+    """Compile a `(r) => ...` filter predicate into a function of a row and the set of columns it reads.
+
+    Only comparisons of columns with string, number and boolean literals
+    combined with `and`, `or`, `not`, `exists` and parentheses are supported.
+    """
+    body = re.sub(r"^\(r\)=>", "", predicate.strip())
+    parts: List[str] = []
+    columns = set()
+    position = 0
+    pending_exists = False
+    while position < len(body):
+        match = FILTER_TOKEN_RE.match(body, position)
+        if not match or match.end() == position:
+            raise QueryError(f"unsupported filter predicate: {predicate}")
+        position = match.end()
+        if match.group("string"):
+            parts.append(repr(json.loads(match.group("string"))))
+        elif match.group("column"):
+            column = match.group("attr") or match.group("key")
+            columns.add(column)
+            lookup = f"row.get({column!r})"
+            parts.append(f"({lookup} is not None)" if pending_exists else lookup)
+            pending_exists = False
+        elif match.group("number"):
+            parts.append(match.group("number"))
+        elif match.group("op"):
+            parts.append(match.group("op"))
+        else:
+            word = match.group("word")
+            if word == "exists":
+                pending_exists = True
+            else:
+                parts.append({"true": "True", "false": "False"}.get(word, word))
+    code = compile(" ".join(parts), "<filter>", "eval")
+
+    def evaluate(row: Dict[str, Any]) -> bool:
+        try:
+            return bool(eval(code, {"__builtins__": {}}, {"row": row}))
+        except TypeError:
+            # Comparisons with missing columns do not match, like null in Flux
+            return False
+
+    return evaluate, columns
+
+
+@dataclass
+class DataQuery:
+    """A parsed `from() |> range() |> ...` pipeline."""
+
+    bucket: str
+    start: float
+    stop: float
+    filters: List[Tuple[Callable[[Dict[str, Any]], bool], set]] = field(default_factory=list)
+    every: Optional[float] = None
+    aggregate: str = "mean"
+    create_empty: bool = True
+    limit: Optional[int] = None
+    result: str = "_result"
+
+
+def _string_argument(value: str) -> str:
+    if not (value.startswith('"') and value.endswith('"')):
+        raise QueryError(f"expected a string literal, got {value}")
+    text: str = json.loads(value)
+    return text
+
+
+class FakeInfluxDB:
+    """Answers InfluxDB v2 API requests from a synthetic dataset."""
+
+    def __init__(self, dataset: Dataset, latency: float = 0.0, now: Optional[datetime] = None):
+        self.dataset = dataset
+        self.latency = latency
+        self.now = now
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._series = [
+            make_series(dataset, measurement, field_name, tags)
+            for measurement in dataset.measurement_names()
+            for field_name in dataset.field_names()
+            for tags in dataset.series_tags()
+        ]
+
+    def current_time(self) -> datetime:
+        return self.now or datetime.now(timezone.utc)
+
+    def bucket_info(self, index: int, name: str) -> Dict[str, Any]:
+        return {
+            "id": f"{index + 1:016x}",
+            "orgID": "0000000000000001",
+            "name": name,
+            "type": "user",
+            "retentionRules": [{"type": "expire", "everySeconds": 0}],
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+            "labels": [],
+            "links": {},
+        }
+
+    def buckets(self, after: Optional[str], limit: int, base_url: str) -> Dict[str, Any]:
+        """One page of the bucket listing, linking to the next page when more buckets remain."""
+        infos = [self.bucket_info(index, name) for index, name in enumerate(self.dataset.buckets)]
+        if after:
+            infos = [info for info in infos if info["id"] > after]
+        page = infos[:limit]
+        links: Dict[str, Any] = {"self": "/api/v2/buckets"}
+        if len(infos) > limit:
+            links["next"] = f"{base_url}?after={page[-1]['id']}&limit={limit}"
+        return {"buckets": page, "links": links}
+
+    def query(self, query: str) -> Iterator[str]:
+        """Answer a Flux query with annotated CSV chunks."""
+        with self._lock:
+            self.queries += 1
+        text = normalize_query(query)
+        if "schema.measurements(" in text:
+            self._check_bucket(self._call_bucket(text, "schema.measurements"))
+            return self._values("_result", self.dataset.measurement_names())
+        if "schema.measurementTagKeys(" in text:
+            self._check_bucket(self._call_bucket(text, "schema.measurementTagKeys"))
+            return self._values("_result", ["_field", "_measurement", "_start", "_stop", *TAG_KEYS])
+        if "schema.measurementFieldKeys(" in text:
+            self._check_bucket(self._call_bucket(text, "schema.measurementFieldKeys"))
+            return self._values("_result", self.dataset.field_names())
+        if "influxdb.cardinality(" in text:
+            self._check_bucket(self._call_bucket(text, "influxdb.cardinality"))
+            return self._cardinality(call_arguments(text, "influxdb.cardinality")[0].get("predicate"))
+        if 'yield(name:"tag_keys")' in text and 'yield(name:"field_keys")' in text:
+            self._check_bucket(self._call_bucket(text, "from"))
+            return self._bucket_schema()
+        return self._data(self._parse_data_query(text))
+
+    def _check_bucket(self, bucket: str) -> None:
+        if bucket not in self.dataset.buckets:
+            raise QueryError(f'failed to initialize execute state: could not find bucket "{bucket}"', 404, "not found")
+
+    @staticmethod
+    def _call_bucket(text: str, function: str) -> str:
+        match = re.search(rf'{re.escape(function)}\(bucket:("(?:[^"\\]|\\.)*")', text)
+        if not match:
+            raise QueryError(f"{function}() requires a bucket")
+        bucket: str = json.loads(match.group(1))
+        return bucket
+
+    @staticmethod
+    def _values(result: str, values: List[str]) -> Iterator[str]:
+        yield VALUES_HEADER.format(result=result) + "".join(f",,0,{value}\n" for value in values) + "\n"
+
+    def _cardinality(self, predicate: Optional[str]) -> Iterator[str]:
+        """Count the series matching a predicate; every series has points in any range."""
+        matches = compile_filter(predicate)[0] if predicate else lambda key: True
+        count = sum(
+            1
+            for series in self._series
+            if matches({"_measurement": series.measurement, "_field": series.field, **series.tags})
+        )
+        yield CARDINALITY_HEADER + f",,0,{count}\n\n"
+
+    def _bucket_schema(self) -> Iterator[str]:
+        names = self.dataset.measurement_names()
+        tags = ["_field", "_measurement", "_start", "_stop", *TAG_KEYS]
+        for result, keys in (("tag_keys", tags), ("field_keys", self.dataset.field_names())):
+            rows = [f",,{table},{name},{key}\n" for table, name in enumerate(names) for key in keys]
+            yield MEASUREMENT_VALUES_HEADER.format(result=result) + "".join(rows) + "\n"
+
+    def _parse_data_query(self, text: str) -> DataQuery:
+        start_index = text.find("from(")
+        if start_index < 0:
+            raise QueryError("the fake InfluxDB server only supports from() |> range() pipelines and schema queries")
+        stages = split_pipeline(text[start_index:])
+        calls = [stage_call(stage) for stage in stages]
+        if calls[0] is None or calls[0][0] != "from" or "bucket" not in calls[0][1]:
+            raise QueryError("expected from(bucket: ...)")
+        bucket = _string_argument(calls[0][1]["bucket"])
+        self._check_bucket(bucket)
+        if len(calls) < 2 or calls[1] is None or calls[1][0] != "range":
+            raise QueryError(
+                'cannot submit unbounded read to "' + bucket + "\"; try bounding 'from' with a call to 'range'"
+            )
+
+        now = self.current_time()
+        bounds = TimeRange(start=calls[1][1].get("start", ""), stop=calls[1][1].get("stop"))
+        start, stop = bounds.start_time(now), bounds.stop_time(now)
+        if start is None or stop is None:
+            raise QueryError(f"unsupported range bounds: {stages[1]}")
+        parsed = DataQuery(bucket=bucket, start=start.timestamp(), stop=stop.timestamp())
+
+        for call in calls[2:]:
+            if call is None:
+                continue
+            name, arguments = call
+            if name == "filter" and "fn" in arguments:
+                parsed.filters.append(compile_filter(arguments["fn"]))
+            elif name == "aggregateWindow":
+                parsed.every = parse_duration(arguments.get("every", ""))
+                if not parsed.every or parsed.every <= 0:
+                    raise QueryError(f"unsupported aggregateWindow every: {arguments.get('every')}")
+                parsed.aggregate = arguments.get("fn", "mean")
+                if parsed.aggregate not in AGGREGATES:
+                    raise QueryError(f"unsupported aggregate function: {parsed.aggregate}")
+                parsed.create_empty = arguments.get("createEmpty", "true") != "false"
+            elif name == "limit":
+                parsed.limit = int(arguments.get("n", "0"))
+            elif name == "yield":
+                parsed.result = _string_argument(arguments.get("name", '"_result"'))
+        return parsed
+
+    def _data(self, query: DataQuery) -> Iterator[str]:
+        """Generate one table per matching series."""
+        row_filters: List[Callable[[Dict[str, Any]], bool]] = []
+        series_filters: List[Callable[[Dict[str, Any]], bool]] = []
+        for predicate, columns in query.filters:
+            (row_filters if "_value" in columns or "_time" in columns else series_filters).append(predicate)
+
+        value_type = "long" if query.every and query.aggregate == "count" else "double"
+        start, stop = rfc3339(query.start), rfc3339(query.stop)
+        chunk: List[str] = [DATA_HEADER.format(value_type=value_type, result=query.result)]
+        size = 0
+        table = 0
+        # Every series has points at the same times, format each of them once
+        stamps: Dict[float, str] = {}
+        for series in self._series:
+            key = {"_measurement": series.measurement, "_field": series.field, **series.tags}
+            if not all(predicate(key) for predicate in series_filters):
+                continue
+            prefix = f",,{table},{start},{stop},"
+            suffix = f",{series.field},{series.measurement},{series.tags['host']},{series.tags['region']}\n"
+            points = self._points(series, query)
+            if row_filters:
+                points = ((t, v) for t, v in points if all(p({**key, "_value": v, "_time": t}) for p in row_filters))
+            written = 0
+            for t, value in points:
+                if query.limit and written >= query.limit:
+                    break
+                stamp = stamps.get(t)
+                if stamp is None:
+                    stamp = stamps[t] = rfc3339(t)
+                line = prefix + stamp + "," + ("" if value is None else repr(value)) + suffix
+                chunk.append(line)
+                size += len(line)
+                written += 1
+                if size >= CHUNK_SIZE:
+                    yield "".join(chunk)
+                    chunk, size = [], 0
+            if written:
+                table += 1
+        chunk.append("\n")
+        yield "".join(chunk)
+
+    def _points(self, series: Series, query: DataQuery) -> Iterator[Tuple[float, Any]]:
+        """Raw points of a series in the range, or its aggregated windows."""
+        interval = self.dataset.interval
+        first = math.ceil(query.start / interval) * interval
+        if query.every is None:
+            t = first
+            while t < query.stop:
+                yield t, series.value(t)
+                t += interval
+            return
+
+        window = math.floor(query.start / query.every) * query.every
+        while window < query.stop:
+            window_start, window_stop = max(window, query.start), min(window + query.every, query.stop)
+            begin = math.ceil(window_start / interval) * interval
+            count = max(0, math.ceil((window_stop - begin) / interval))
+            window += query.every
+            if count == 0:
+                if query.create_empty:
+                    yield window_stop, 0 if query.aggregate == "count" else None
+                continue
+            if query.aggregate == "count":
+                value: Any = count
+            elif query.aggregate in ("mean", "sum"):
+                total = series.total(begin, count, interval)
+                value = total / count if query.aggregate == "mean" else total
+            elif query.aggregate == "first":
+                value = series.value(begin)
+            elif query.aggregate == "last":
+                value = series.value(begin + (count - 1) * interval)
+            else:
+                values = [series.value(begin + i * interval) for i in range(count)]
+                value = min(values) if query.aggregate == "min" else max(values)
+            yield window_stop, value
+
+
+class FakeInfluxDBHandler(BaseHTTPRequestHandler):
+    """HTTP handler of the fake InfluxDB v2 API."""
+
+    protocol_version = "HTTP/1.1"
+    server: "FakeInfluxDBServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body are written separately, don't let Nagle hold back the body
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Influxdb-Version", VERSION)
+        self.send_header("X-Influxdb-Build", BUILD)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay(self) -> None:
+        if self.server.influxdb.latency:
+            time.sleep(self.server.influxdb.latency)
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        self._delay()
+        if url.path == "/ping":
+            self.send_response(204)
+            self.send_header("X-Influxdb-Version", VERSION)
+            self.send_header("X-Influxdb-Build", BUILD)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif url.path == "/health":
+            self._send_json(
+                200,
+                {
+                    "name": "influxdb",
+                    "message": "ready for queries and writes",
+                    "status": "pass",
+                    "checks": [],
+                    "version": VERSION,
+                    "commit": "fake",
+                },
+            )
+        elif url.path == "/api/v2/buckets":
+            params = parse_qs(url.query)
+            limit = min(int(params.get("limit", ["20"])[0]), 100)
+            after = params.get("after", [None])[0]
+            self._send_json(200, self.server.influxdb.buckets(after, limit, url.path))
+        else:
+            self._send_json(404, {"code": "not found", "message": "path not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+        if url.path != "/api/v2/query":
+            self._send_json(404, {"code": "not found", "message": "path not found"})
+            return
+        self._delay()
+        try:
+            chunks = self.server.influxdb.query(json.loads(body)["query"])
+            first = next(chunks)
+        except QueryError as e:
+            self._send_json(e.status, {"code": e.code, "message": str(e)})
+            return
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"code": "invalid", "message": f"invalid query request: {e}"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in _prepend(first, chunks):
+                data = chunk.encode()
+                if data:
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed a streamed response early
+            self.close_connection = True
+
+
+def _prepend(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+class FakeInfluxDBServer(ThreadingHTTPServer):
+    """Threaded HTTP server of the fake InfluxDB, runnable in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, influxdb: FakeInfluxDB, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), FakeInfluxDBHandler)
+        self.influxdb = influxdb
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = cast(Tuple[str, int], self.server_address[:2])
+        return f"http://{host}:{port}"
+
+    def start(self) -> Self:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-influxdb", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients reset idle keep-alive connections when they close them
+        if not isinstance(sys.exc_info()[1], ConnectionResetError):
+            super().handle_error(request, client_address)
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake InfluxDB v2 server serving deterministic synthetic series")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8086, help="Port to listen on")
+    parser.add_argument("--buckets", nargs="+", default=["telegraf"], help="Bucket names")
+    parser.add_argument("--measurements", type=int, default=10, help="Measurements per bucket")
+    parser.add_argument("--series", type=int, default=10, help="Tag combinations (host, region) per measurement")
+    parser.add_argument("--fields", type=int, default=3, help="Fields per measurement")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between points of a series")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every request")
+    parser.add_argument("--now", help="Fixed RFC3339 time relative ranges are resolved against")
+    parser.add_argument("--seed", type=int, default=0, help="Changes the generated values")
+    args = parser.parse_args()
+
+    now = parse_time(args.now) if args.now else None
+    if args.now and now is None:
+        parser.error(f"invalid --now time: {args.now}")
+    dataset = Dataset(
+        buckets=args.buckets,
+        measurements=args.measurements,
+        series=args.series,
+        fields=args.fields,
+        interval=args.interval,
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO)
+    server = FakeInfluxDBServer(FakeInfluxDB(dataset, args.latency_ms / 1000, now), args.host, args.port)
+    logger.info(
+        f"Fake InfluxDB listening on {server.url}: buckets {', '.join(dataset.buckets)}, "
+        f"{dataset.measurements} measurements x {dataset.series} series x {dataset.fields} fields "
+        f"every {dataset.interval:g}s"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Lightweight analysis of Flux query text: normalization and time range extraction.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Seconds per Flux duration unit, calendar units approximated
+DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "ms": 1e-3,
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+    "d": 86400.0,
+    "w": 7 * 86400.0,
+    "mo": 30 * 86400.0,
+    "y": 365 * 86400.0,
+}
+
+DURATION_RE = re.compile(r"^(-?)((?:\d+(?:ns|us|µs|ms|mo|s|m|h|d|w|y))+)$")
+DURATION_PART_RE = re.compile(r"(\d+)(ns|us|µs|ms|mo|s|m|h|d|w|y)")
+TIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2}))?$")
+
+# Keywords after which a `/` starts a regular expression literal rather than a division
+REGEX_KEYWORDS = ("and", "or", "not", "return", "if", "then", "else")
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char in "_."
+
+
+def _starts_regex(before: str) -> bool:
+    """Whether a `/` following the normalized text `before` opens a regex literal rather than dividing."""
+    if not before:
+        return True
+    last = before[-1]
+    if last in ')]}"':
+        return False
+    if _is_word(last):
+        return re.search(r"[\w.]*$", before).group() in REGEX_KEYWORDS  # type: ignore[union-attr]
+    return True
+
+
+def _regex_end(text: str, start: int) -> int:
+    """Index of the `/` closing the regex literal opened at `start`, skipping escaped characters."""
+    end = start + 1
+    while end < len(text) and text[end] not in "/\n":
+        end += 2 if text[end] == "\\" else 1
+    return end
+
+
+def normalize_query(query: str) -> str:
+    """Strip comments and insignificant whitespace from a Flux query.
+
+    String and regex literals are kept verbatim. Whitespace outside of them is
+    dropped, except for a single space between two words or a literal and a
+    word, so queries differing only in layout or comments normalize to the
+    same text, which is still valid Flux.
+    """
+    out: List[str] = []
+    pending_space = False
+    i = 0
+    length = len(query)
+    while i < length:
+        char = query[i]
+        if char == '"':
+            end = i + 1
+            while end < length and query[end] != '"':
+                end += 2 if query[end] == "\\" else 1
+            if pending_space and out and _is_word(out[-1][-1]):
+                out.append(" ")
+            out.append(query[i : end + 1])
+            pending_space = False
+            i = end + 1
+        elif char == "/" and not query.startswith("//", i) and _starts_regex("".join(out[-8:])):
+            end = _regex_end(query, i)
+            if pending_space and out and _is_word(out[-1][-1]):
+                out.append(" ")
+            out.append(query[i : end + 1])
+            pending_space = False
+            i = end + 1
+        elif char == "/" and query.startswith("//", i):
+            end = query.find("\n", i)
+            i = length if end < 0 else end
+            pending_space = True
+        elif char.isspace():
+            pending_space = True
+            i += 1
+        else:
+            # Regex literals are appended whole, a lone "/" is a division
+            literal = out and (out[-1][-1] == '"' or (len(out[-1]) > 1 and out[-1][0] == "/"))
+            if pending_space and out and _is_word(char) and (_is_word(out[-1][-1]) or literal):
+                out.append(" ")
+            out.append(char)
+            pending_space = False
+            i += 1
+    return "".join(out)
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Parse a Flux duration literal such as `-1h30m` into signed seconds."""
+    match = DURATION_RE.match(text)
+    if not match:
+        return None
+    seconds = sum(int(amount) * DURATION_UNITS[unit] for amount, unit in DURATION_PART_RE.findall(match.group(2)))
+    return -seconds if match.group(1) else seconds
+
+
+def parse_time(text: str) -> Optional[datetime]:
+    """Parse a Flux RFC3339 date or time literal."""
+    if not TIME_RE.match(text):
+        return None
+    value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class TimeRange:
+    """Bounds of a `range()` call as written in the query; `stop` defaults to now."""
+
+    start: str
+    stop: Optional[str] = None
+
+    def start_time(self, now: datetime) -> Optional[datetime]:
+        """Resolve the start bound against `now`, or None when it is not a literal."""
+        return _resolve_bound(self.start, now)
+
+    def stop_time(self, now: datetime) -> Optional[datetime]:
+        """Resolve the stop bound against `now`, or None when it is not a literal."""
+        return now if self.stop is None else _resolve_bound(self.stop, now)
+
+    @property
+    def absolute(self) -> bool:
+        """Whether both bounds are fixed points in time, independent of when the query runs."""
+        return parse_time(self.start) is not None and self.stop is not None and parse_time(self.stop) is not None
+
+    def duration(self, now: datetime) -> Optional[float]:
+        """Length of the range in seconds, or None when a bound is not a literal."""
+        start, stop = self.start_time(now), self.stop_time(now)
+        if start is None or stop is None:
+            return None
+        return (stop - start).total_seconds()
+
+
+def _resolve_bound(text: str, now: datetime) -> Optional[datetime]:
+    """Resolve a duration, time or `now()` bound against `now`."""
+    if text == "now()":
+        return now
+    seconds = parse_duration(text)
+    if seconds is not None:
+        return now + timedelta(seconds=seconds)
+    return parse_time(text)
+
+
+def format_time(value: datetime) -> str:
+    """Format a timezone-aware datetime as a Flux RFC3339 time literal."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Whether `text[start:end]` is not part of a longer name."""
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not _is_word(before) and not _is_word(after)
+
+
+def _split_top_level(text: str, separator: str, word: bool = False) -> List[str]:
+    """Split Flux on a separator outside of strings, regexes, comments and brackets.
+
+    A `word` separator, such as an operator keyword, only matches when not
+    part of a longer name.
+    """
+    parts: List[str] = []
+    depth = 0
+    start = 0
+    in_string = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if char == "\\":
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = len(text) if end < 0 else end
+            continue
+        elif char == "/" and _starts_regex(text[:i].rstrip()[-8:]):
+            i = _regex_end(text, i)
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif depth == 0 and text.startswith(separator, i) and (not word or _is_whole_word(text, i, i + len(separator))):
+            parts.append(text[start:i])
+            start = i + len(separator)
+            i = start
+            continue
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def split_pipeline(query: str) -> List[str]:
+    """Split a single-expression query into its `|>` pipeline stages, normalized or as written."""
+    return _split_top_level(query, "|>")
+
+
+def split_conjunction(predicate: str) -> List[str]:
+    """Split a normalized predicate body into the conditions it requires with top-level `and`s.
+
+    A predicate with a top-level `or` is returned whole, as `and` binds tighter.
+    """
+    if len(_split_top_level(predicate, "or", word=True)) > 1:
+        return [predicate]
+    return [condition.strip() for condition in _split_top_level(predicate, "and", word=True)]
+
+
+def stage_call(stage: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Return the function name and named arguments of a stage consisting of exactly one call."""
+    match = re.match(r"^([A-Za-z_][\w.]*)\(", stage)
+    if not match:
+        return None
+    end = _closing_paren(stage, match.end())
+    if end != len(stage) - 1:
+        return None
+    return match.group(1), _parse_arguments(stage[match.end() : end])
+
+
+def _closing_paren(text: str, start: int) -> int:
+    """Index of the parenthesis closing the one just before `start`, skipping strings and regexes."""
+    depth = 1
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            i += 1
+            while i < len(text) and text[i] != '"':
+                i += 2 if text[i] == "\\" else 1
+        elif char == "/" and _starts_regex(text[:i].rstrip()[-8:]):
+            i = _regex_end(text, i)
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text)
+
+
+def _parse_arguments(text: str) -> Dict[str, str]:
+    """Parse normalized call arguments into a dict of argument name to expression text."""
+    arguments: Dict[str, str] = {}
+    for part in _split_top_level(text, ","):
+        name, sep, value = part.partition(":")
+        if sep:
+            arguments[name.strip()] = value.strip()
+    return arguments
+
+
+def call_arguments(query: str, function: str) -> List[Dict[str, str]]:
+    """Return the named arguments of every call of `function` in a normalized query."""
+    calls = []
+    for match in re.finditer(rf"(?<![\w.]){re.escape(function)}\(", query):
+        end = _closing_paren(query, match.end())
+        calls.append(_parse_arguments(query[match.end() : end]))
+    return calls
+
+
+def find_ranges(query: str) -> List[TimeRange]:
+    """Extract the bounds of every `range()` call of a query."""
+    return [
+        TimeRange(start=arguments["start"], stop=arguments.get("stop"))
+        for arguments in call_arguments(normalize_query(query), "range")
+        if "start" in arguments
+    ]
@@ -0,0 +1,96 @@
+"""
+Background InfluxDB health prober backing the health endpoints.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    """Probes InfluxDB on a fixed interval and caches the outcome.
+
+    Health endpoints read the cached state in constant time, so however often
+    they are polled, InfluxDB sees at most one probe per `interval` seconds.
+    The probe runs as a task of the server event loop, started with the server
+    or, when the endpoints are served by another application, on first use.
+    """
+
+    def __init__(self, probe: Callable[[], Awaitable[Dict[str, Any]]], interval: float, timeout: float):
+        self.probe = probe
+        self.interval = interval
+        self.timeout = timeout
+        self.status: Optional[Dict[str, Any]] = None
+        self.checked_at: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+        self.failures = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def ensure_started(self) -> None:
+        """Start the probe task in the running event loop unless it is already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the probe task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def probe_once(self) -> Dict[str, Any]:
+        """Run a single probe and record its outcome."""
+        started = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(self.probe(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            status = {"status": "error", "message": f"Health probe timed out after {self.timeout}s"}
+        except Exception as e:
+            status = {"status": "error", "message": str(e)}
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.checked_at = time.time()
+        if status.get("status") == "connected":
+            self.failures = 0
+        else:
+            self.failures += 1
+            logger.warning(f"InfluxDB health probe failed: {status.get('message', 'unknown error')}")
+        self.status = status
+        return status
+
+    @property
+    def connected(self) -> bool:
+        return self.status is not None and self.status.get("status") == "connected"
+
+    @property
+    def ready(self) -> bool:
+        """Whether the last probe succeeded and is recent enough to be trusted."""
+        if not self.connected or self.checked_at is None:
+            return False
+        return time.time() - self.checked_at <= 3 * self.interval + self.timeout
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cached probe outcome."""
+        if self.status is None:
+            return {"influxdb_status": "unknown"}
+        snapshot: Dict[str, Any] = {
+            "influxdb_status": self.status.get("status", "unknown"),
+            "checked_at": self.checked_at,
+            "age_s": round(time.time() - self.checked_at, 3) if self.checked_at else None,
+            "probe_latency_ms": self.latency_ms,
+            "consecutive_failures": self.failures,
+        }
+        if not self.connected:
+            snapshot["influxdb_error"] = self.status.get("message")
+        return snapshot
+
+    async def _run(self) -> None:
+        """Probe forever, sleeping `interval` seconds between probes."""
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
@@ -2,28 +2,557 @@
 InfluxDB client and operations module.
 """
 
-import json
+import contextvars
+import itertools
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
 from influxdb_client.client.influxdb_client import InfluxDBClient
-from influxdb_client.client.query_api import QueryApi
-from influxdb_client.client.flux_table import TableList
+from influxdb_client.client.query_api import QueryApi, QueryOptions
 from influxdb_client.rest import ApiException
+from .cache import QueryCache, SchemaCache
+from .catalog import SchemaCatalog
 from .config import InfluxDBConfig
+from .cursors import NO_ROW, CursorRegistry, QueryCursor
+from .downsample import check_max_points, downsample_rows, downsample_tables
+from .export import (
+    CHUNK_SIZE as EXPORT_CHUNK_SIZE,
+    ParquetExport,
+    export_directory,
+    new_export_id,
+    read_export_file,
+    read_manifest,
+    write_manifest,
+)
+from .estimate import (
+    STATISTICS_CACHE_BYTES,
+    QueryScope,
+    cardinality_query,
+    estimate_cost,
+    parse_scope,
+    sample_query,
+    sample_range,
+)
+from .flux import normalize_query, parse_duration
+from .metrics import CONVERSION_LATENCY, RESULT_BYTES, RESULT_ROWS, upstream
+from .tracing import span
+from .results import (
+    RESULT_FORMATS,
+    columnar_size,
+    columnar_to_rows,
+    record_to_row,
+    row_size,
+    rows_to_columnar,
+    tables_to_columnar,
+    tables_to_records,
+)
+from .rewrite import downsample_query
+from .schema import (
+    assemble_bucket_schema,
+    bucket_schema_query,
+    measurement_field_keys_query,
+    measurement_tag_keys_query,
+    measurements_query,
+    table_values,
+    tag_keys,
+)
+from .singleflight import SingleFlight
+from .spool import RESULT_URI, ResultSpool, SpooledResult, result_uri
+from .slowlog import PROFILERS, SlowQueryLog
+from .windows import WindowCache, WindowPlan
 
 logger = logging.getLogger(__name__)
 
 
-class InfluxDBManager:
-    """Manages InfluxDB connections and operations."""
+# Outcome of a single schema key query: (values, elapsed seconds) or the raised exception
+KeysOutcome = Union[Tuple[List[Any], float], BaseException]
+
+
+def complete_schema(value: Any) -> bool:
+    """Whether a schema cache value was discovered without failed queries, partial discoveries are not cached."""
+    return not (isinstance(value, dict) and value.get("stats", {}).get("failed_queries"))
+
+
+class BaseInfluxDBManager:
+    """State and result handling shared by the blocking and asyncio InfluxDB managers."""
 
     def __init__(self, config: InfluxDBConfig):
         """Initialize InfluxDB manager with configuration."""
         self.config = config
+        self.schema_cache = SchemaCache(
+            ttl=config.schema_cache_ttl,
+            stale_ttl=config.schema_cache_stale_ttl,
+            max_bytes=config.schema_cache_max_bytes,
+            store=SchemaCatalog(config.schema_catalog_path) if config.schema_catalog_path else None,
+            cacheable=complete_schema,
+        )
+        self.cursors = CursorRegistry(ttl=config.cursor_ttl, max_open=config.max_open_cursors)
+        self.query_cache = QueryCache(
+            ttl=config.query_cache_ttl,
+            historical_ttl=config.query_cache_historical_ttl,
+            max_bytes=config.query_cache_max_bytes,
+        )
+        self.window_cache = WindowCache(ttl=config.window_cache_ttl, max_bytes=config.window_cache_max_bytes)
+        self.slow_queries = SlowQueryLog(threshold_ms=config.slow_query_ms, profile=config.slow_query_profile)
+        self.result_spool = ResultSpool(
+            os.path.join(config.spool_dir, "results"),
+            ttl=config.spool_ttl,
+            max_bytes=config.spool_max_bytes,
+            page_rows=config.spool_page_rows,
+            exports_directory=os.path.join(config.spool_dir, "exports"),
+        )
+        # Series cardinalities and write rate samples of query cost estimates
+        self.statistics = SchemaCache(
+            ttl=config.estimate_cache_ttl, stale_ttl=config.estimate_cache_ttl, max_bytes=STATISTICS_CACHE_BYTES
+        )
+        # Version and build of the server, read once by health checks
+        self._server_info: Optional[Dict[str, Any]] = None
+
+    @property
+    def connection_pool_size(self) -> int:
+        """HTTP connection pool size, leaving room for concurrent schema queries."""
+        pool_size = self.config.connection_pool_size or (os.cpu_count() or 1) * 5
+        return max(pool_size, self.config.schema_concurrency)
+
+    def _connected_status(self, health: Any) -> Dict[str, Any]:
+        """Status of a successful connection check, with the server version and build."""
+        return {
+            "status": "connected",
+            "health": health.status if health else "unknown",
+            "message": (health.message if health and health.message else "Connection successful"),
+            "url": self.config.url,
+            "org": self.config.org,
+            **(self._server_info or {}),
+        }
+
+    def _error_status(self, error: Exception) -> Dict[str, Any]:
+        """Status of a failed connection check."""
+        return {
+            "status": "error",
+            "message": str(error),
+            "url": self.config.url,
+            "org": self.config.org,
+        }
+
+    @property
+    def spool_enabled(self) -> bool:
+        """Whether large query results are spooled to disk instead of being truncated."""
+        return self.config.spool_threshold > 0
+
+    def rewrite_query(self, query: str, max_points: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Rewrite a raw query to aggregate windows in InfluxDB when it is estimated to exceed the point budget.
+
+        The budget is `max_points` when given, else the configured point budget.
+        Returns the rewritten query and how it was derived, or None when the
+        query is run as is.
+        """
+        budget = max_points or self.config.point_budget
+        rewrite = downsample_query(
+            query, budget, parse_duration(self.config.sample_interval) or 10.0, self.config.downsample_fn
+        )
+        if rewrite is None:
+            return None
+        logger.info(f"Rewrote query estimated at {rewrite.estimated_points} points per series: {rewrite.query}")
+        return rewrite.as_dict()
+
+    def _plan_estimate(self, query: str) -> Tuple[QueryScope, str, str, float]:
+        """Scope of a query, the Flux queries of its series cardinality and write rate and the seconds sampled."""
+        scope = parse_scope(query)
+        now = datetime.now(timezone.utc)
+        duration = scope.time_range.duration(now)
+        if duration is None or duration <= 0:
+            raise ValueError("Only queries with a range() of literal times or durations can be estimated")
+        seconds = min(parse_duration(self.config.estimate_sample_window) or 300.0, duration)
+        sample = sample_query(scope, sample_range(scope, seconds, now), seconds)
+        return scope, cardinality_query(scope), sample, seconds
+
+    def _statistics_key(self, kind: str, query: str) -> Tuple[str, str, str]:
+        """Statistics cache key of a cardinality or write rate query."""
+        return (kind, self.config.org, normalize_query(query))
+
+    @staticmethod
+    def _cardinality_statistics(tables: Any) -> Dict[str, Any]:
+        """Series count of an `influxdb.cardinality()` result."""
+        return {"series": int(sum(value or 0 for value in table_values(tables)))}
+
+    @staticmethod
+    def _sample_statistics(tables: Any, seconds: float) -> Dict[str, Any]:
+        """Points, active series and average row size of a write rate sample counting the points of every series."""
+        points = 0
+        series = 0
+        rows = 0
+        size = 0
+        for table in tables:
+            counted = sum(record.get_value() or 0 for record in table.records)
+            if counted:
+                points += counted
+                series += 1
+            for record in table.records:
+                rows += 1
+                size += row_size(record_to_row(record))
+        return {"points": points, "series": series, "seconds": seconds, "row_bytes": size / rows if rows else None}
+
+    def _estimate(
+        self, scope: QueryScope, cardinality: Dict[str, Any], sample: Dict[str, Any], cache: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Estimate of a query from its statistics, with the row limit it is checked against."""
+        estimate = estimate_cost(
+            scope, cardinality, sample, parse_duration(self.config.sample_interval) or 10.0, datetime.now(timezone.utc)
+        )
+        limit = self.config.max_estimated_rows
+        return {
+            **estimate.as_dict(),
+            "max_estimated_rows": limit,
+            "exceeds_limit": bool(limit) and estimate.rows > limit,
+            "cache": cache,
+        }
+
+    def enforce_estimate(self, query: str, estimate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Aggregate or reject a query estimated to return more rows than the configured limit.
+
+        Returns None when the query is within the limit, else the query rewritten
+        to aggregate windows in InfluxDB so that it returns at most the limit.
+        Raises ValueError when it cannot be rewritten, or when the estimate
+        action is 'reject'.
+        """
+        limit = self.config.max_estimated_rows
+        if not estimate["exceeds_limit"]:
+            return None
+        series = estimate["series"]
+        if self.config.estimate_action == "aggregate" and 0 < series <= limit:
+            rewrite = downsample_query(
+                query, limit // series, 1 / estimate["points_per_series_per_second"], self.config.downsample_fn
+            )
+            if rewrite is not None:
+                logger.info(f"Rewrote query estimated at {estimate['rows']} rows to: {rewrite.query}")
+                return rewrite.as_dict()
+        raise ValueError(
+            f"Query is estimated to return {estimate['rows']} rows ({estimate['bytes']} bytes) from {series} series, "
+            f"above the limit of {limit} rows; narrow its range or filters, aggregate it with aggregateWindow() "
+            "or use export_flux_query"
+        )
+
+    @property
+    def response_limited(self) -> bool:
+        """Whether query responses are bounded by a row or byte limit."""
+        return self.config.max_rows > 0 or self.config.max_bytes > 0
+
+    def load_schema_catalog(self) -> int:
+        """Warm the schema cache from the persistent catalog, returning the number of loaded entries."""
+        try:
+            loaded = self.schema_cache.load_persisted(self.config.org)
+            if loaded:
+                logger.info(f"Loaded {loaded} schema entries from catalog {self.config.schema_catalog_path}")
+            return loaded
+        except Exception as e:
+            logger.warning(f"Failed to load schema catalog {self.config.schema_catalog_path}: {e}")
+            return 0
+
+    def _schema_key(self, kind: str, bucket: str = "") -> Tuple[str, str, str]:
+        """Schema cache key of a bucket listing or of the measurements in a bucket."""
+        return (kind, self.config.org, bucket)
+
+    @staticmethod
+    def _check_result_format(result_format: str) -> None:
+        """Reject unknown result formats before the query is sent."""
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"Invalid result format '{result_format}', expected one of: {', '.join(RESULT_FORMATS)}")
+
+    @staticmethod
+    def _tables_to_json(result: Any, result_format: str = "records") -> List:
+        """Convert query results to JSON-compatible records or per-table column arrays."""
+        if not result:
+            logger.warning("Query returned no results")
+            return []
+        # TableList or a plain list of FluxTables
+        started = time.perf_counter()
+        with span("convert results", {"result.format": result_format}):
+            data = tables_to_columnar(result) if result_format == "columnar" else tables_to_records(result)
+        CONVERSION_LATENCY.observe(time.perf_counter() - started, result_format)
+        return data
+
+    @staticmethod
+    def _rows_to_json(rows: List[Dict[str, Any]], result_format: str = "records") -> List:
+        """Return converted rows in the requested result format."""
+        return rows_to_columnar(rows) if result_format == "columnar" else rows
+
+    def _cache_result(self, key: Any, query: str, value: Any, rows: List[Dict[str, Any]]) -> int:
+        """Store a complete query result in the query cache, returning its estimated size or 0 if not cached."""
+        if not self.query_cache.enabled:
+            return 0
+        size = sum(row_size(row) for row in rows)
+        self.query_cache.put(key, query, value, size=size)
+        return size
+
+    def _finish_result(self, key: Any, query: str, mode: str, started: float, data: List, result_format: str) -> bool:
+        """Cache and count a converted query result and log it when slow; return whether it should be profiled."""
+        size = self._cache_result(key, query, data, data)
+        rows = self._count_result("query", data, result_format, size)
+        return self._log_slow_query(query, mode, started, data, rows, size, result_format)
+
+    @staticmethod
+    def _count_result(operation: str, data: List, result_format: str, size: int) -> int:
+        """Record the rows and, when already estimated, the bytes of a result returned to a client."""
+        rows = sum(table["record_count"] for table in data) if result_format == "columnar" else len(data)
+        RESULT_ROWS.inc(operation, amount=rows)
+        if size:
+            RESULT_BYTES.inc(operation, amount=size)
+        return rows
+
+    def _log_slow_query(
+        self, query: str, mode: str, started: float, data: List, rows: int, size: int, result_format: str
+    ) -> bool:
+        """Log the query if it exceeded the slow query threshold; return whether it should be profiled."""
+        duration_ms = (time.perf_counter() - started) * 1000
+        if not self.slow_queries.is_slow(duration_ms):
+            return False
+        # Only slow results are sized here when neither the cache nor the byte limit did already
+        size = size or sum(row_size(row) for row in data)
+        return self.slow_queries.record(query, mode, duration_ms, rows, size, result_format)
+
+    def _page_size(self, page_size: Optional[int]) -> int:
+        """Rows per page of a streaming query, capped by the response row limit; 0 for no limit."""
+        if page_size is not None and page_size < 1:
+            raise ValueError("Page size must be at least 1")
+        limits = [limit for limit in (page_size, self.config.max_rows) if limit]
+        return min(limits) if limits else 0
+
+    def _page_full(self, cursor: QueryCursor, rows: int, size: int) -> bool:
+        """Whether a page has reached the page size or the response byte limit."""
+        if cursor.page_size and rows >= cursor.page_size:
+            return True
+        return self.config.max_bytes > 0 and size >= self.config.max_bytes
+
+    def _page_result(self, cursor: QueryCursor, page: List[Dict[str, Any]], size: int = 0) -> Dict[str, Any]:
+        """Describe a page read from a cursor, keeping the cursor open only while rows remain."""
+        cursor.pages += 1
+        cursor.records += len(page)
+        self._count_result("page", page, "records", size)
+        more = cursor.lookahead is not NO_ROW
+        if more:
+            self.cursors.keep(cursor)
+        else:
+            self.cursors.close(cursor)
+        return {
+            "data": self._rows_to_json(page, cursor.result_format),
+            "record_count": len(page),
+            "page": cursor.pages,
+            "total_records": cursor.records,
+            "truncated": more,
+            "next_cursor": cursor.id if more else None,
+        }
+
+    def _inline_result(
+        self, key: Any, query: str, rows: List[Dict[str, Any]], size: int, result_format: str
+    ) -> Dict[str, Any]:
+        """Response of a result below the spool threshold, returned and cached in full."""
+        data = self._rows_to_json(rows, result_format)
+        result: Dict[str, Any] = {"data": data, "record_count": len(rows), "truncated": False, "spooled": False}
+        if result_format == "columnar":
+            result["table_count"] = len(data)
+        if self.query_cache.enabled:
+            self.query_cache.put(key, query, result, size=size)
+        self._count_result("query", data, result_format, size)
+        return result
+
+    def _downsampled_size(self, data: List, result_format: str) -> Tuple[int, int, bool]:
+        """Records and estimated size of a converted downsampled result and whether it is spooled, like the results
+        of other queries.
+
+        Without spooling, results above the response limits raise ValueError
+        as the downsampled result cannot be truncated.
+        """
+        if result_format == "columnar":
+            records, size = sum(table["record_count"] for table in data), columnar_size(data)
+        else:
+            records, size = len(data), sum(row_size(row) for row in data)
+        if self.spool_enabled:
+            return records, size, size > self.config.spool_threshold
+        max_rows, max_bytes = self.config.max_rows, self.config.max_bytes
+        if (max_rows and records > max_rows) or (max_bytes and size > max_bytes):
+            raise ValueError(
+                f"Downsampled result of {records} rows ({size} bytes) exceeds the response limit of "
+                f"{max_rows or 'unlimited'} rows and {max_bytes or 'unlimited'} bytes; lower max_points_per_series "
+                "or narrow the query"
+            )
+        return records, size, False
+
+    def _downsampled_result(
+        self, key: Any, query: str, data: List, reduction: Dict[str, Any], result_format: str, size: int
+    ) -> Dict[str, Any]:
+        """Response of a downsampled result with its reduction, cached like a complete result."""
+        result: Dict[str, Any] = {"data": data, "downsampling": reduction, "spooled": False}
+        if self.query_cache.enabled:
+            self.query_cache.put(key, query, result, size=size)
+        result["record_count"] = self._count_result("query", data, result_format, size)
+        return result
+
+    def _spool_result(self, query: str, data: List, result_format: str) -> Dict[str, Any]:
+        """Write a result already read and converted to the spool, returning the manifest of the spooled result."""
+        spooled = self.result_spool.create(query, result_format)
+        try:
+            for row in columnar_to_rows(data) if result_format == "columnar" else data:
+                if spooled.append(row):
+                    spooled.write_page()
+            return spooled.close()
+        except Exception:
+            spooled.abort()
+            raise
+
+    @staticmethod
+    def _spooled_result(manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Summary of a spooled result pointing to the resources of its pages."""
+        RESULT_ROWS.inc("spool", amount=manifest["record_count"])
+        return {
+            "spooled": True,
+            "truncated": False,
+            "result_id": manifest["result_id"],
+            "record_count": manifest["record_count"],
+            "pages": manifest["pages"],
+            "page_rows": manifest["page_rows"],
+            "columns": manifest["columns"],
+            "bytes": manifest["bytes"],
+            "stored_bytes": manifest["stored_bytes"],
+            "expires_at": datetime.fromtimestamp(manifest["expires"], timezone.utc).isoformat(),
+            "uri_template": RESULT_URI,
+            "first_page": result_uri(manifest["result_id"], 1),
+        }
+
+    def spooled_page(self, result_id: str, page: int) -> str:
+        """JSON document of a page of a spooled result."""
+        return self.result_spool.read_page(result_id, page)
+
+    def _start_export(self, compression: str) -> Tuple[str, ParquetExport]:
+        """Create a new export in the spool directory, protected from collection until it is finished."""
+        export_id = new_export_id()
+        self.result_spool.begin_export(export_id)
+        try:
+            return export_id, ParquetExport(export_directory(self.config.spool_dir, export_id), compression)
+        except Exception:
+            self.result_spool.finish(export_id)
+            raise
+
+    def _abort_export(self, export_id: str, export: ParquetExport) -> None:
+        """Remove an incomplete export."""
+        export.abort()
+        self.result_spool.finish(export_id)
+
+    def _finish_export(
+        self, export_id: str, export: ParquetExport, query: str, compression: str, started: float
+    ) -> Dict[str, Any]:
+        """Close the files of an export and write and return its manifest.
+
+        Older results and exports are evicted for the export to fit the spool disk quota.
+        """
+        summary = export.close()
+        RESULT_ROWS.inc("export", amount=summary["rows"])
+        expires = time.time() + self.config.spool_ttl
+        manifest = {
+            "export_id": export_id,
+            "query": query,
+            "format": "parquet",
+            "compression": compression,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "directory": export.directory,
+            "expires": expires,
+            "expires_at": datetime.fromtimestamp(expires, timezone.utc).isoformat(),
+            **summary,
+        }
+        write_manifest(export.directory, manifest)
+        self.result_spool.commit_export(export_id)
+        logger.info(f"Exported {summary['rows']} rows in {len(summary['files'])} Parquet files to {export.directory}")
+        return manifest
+
+    def export_manifest(self, export_id: str) -> Dict[str, Any]:
+        """Manifest of a completed export."""
+        return read_manifest(self.config.spool_dir, export_id)
+
+    def export_file(self, export_id: str, name: str) -> bytes:
+        """Content of a Parquet file of a completed export."""
+        return read_export_file(self.config.spool_dir, export_id, name)
+
+    @staticmethod
+    def _bucket_info(bucket: Any) -> Dict[str, Any]:
+        """Describe a bucket returned by the buckets API."""
+        return {
+            "name": bucket.name,
+            "type": bucket.type if hasattr(bucket, "type") else None,
+            "created_at": (bucket.created_at.isoformat() if bucket.created_at else None),
+            "updated_at": (bucket.updated_at.isoformat() if bucket.updated_at else None),
+        }
+
+    @staticmethod
+    def _single_query_discovery(tables: Any, started: float) -> Dict[str, Any]:
+        """Build the discovery result of the single-query schema discovery."""
+        return {
+            "measurements": assemble_bucket_schema(tables),
+            "stats": {
+                "mode": "single-query",
+                "queries": 1,
+                "failed_queries": 0,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            },
+        }
+
+    def _per_measurement_discovery(
+        self, bucket: str, names: List[str], outcomes: List[Tuple[KeysOutcome, KeysOutcome]], started: float
+    ) -> Dict[str, Any]:
+        """Build the discovery result from per-measurement tag and field key query outcomes."""
+        measurements = []
+        failed = 0
+        query_time = 0.0
+        slowest = 0.0
+        # Outcomes are in submission order so the listing keeps the order of schema.measurements()
+        for name, (tags_outcome, fields_outcome) in zip(names, outcomes):
+            entry: Dict[str, Any] = {"measurement": name, "tags": [], "fields": []}
+            errors = []
+            for key, outcome in (("tags", tags_outcome), ("fields", fields_outcome)):
+                if isinstance(outcome, BaseException):
+                    # One failing measurement must not abort the whole listing
+                    failed += 1
+                    errors.append(f"{key}: {outcome}")
+                    logger.warning(f"Failed to get {key} of measurement '{name}' in bucket '{bucket}': {outcome}")
+                    continue
+                values, elapsed = outcome
+                entry[key] = tag_keys(values) if key == "tags" else values
+                query_time += elapsed
+                slowest = max(slowest, elapsed)
+            if errors:
+                entry["error"] = "; ".join(errors)
+            measurements.append(entry)
+
+        return {
+            "measurements": measurements,
+            "stats": {
+                "mode": "per-measurement",
+                "queries": 1 + 2 * len(names),
+                "failed_queries": failed,
+                "concurrency": self.config.schema_concurrency,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                "query_time_ms": round(query_time * 1000, 3),
+                "slowest_query_ms": round(slowest * 1000, 3),
+            },
+        }
+
+
+class InfluxDBManager(BaseInfluxDBManager):
+    """Manages InfluxDB connections and operations."""
+
+    def __init__(self, config: InfluxDBConfig):
+        """Initialize InfluxDB manager with configuration."""
+        super().__init__(config)
         self._client: Optional[InfluxDBClient] = None
         self._query_api: Optional[QueryApi] = None
         self._organizations_api: Optional[Any] = None
         self._buckets_api: Optional[Any] = None
+        self._schema_executor: Optional[ThreadPoolExecutor] = None
+        self._schema_executor_lock = threading.Lock()
+        self.flights = SingleFlight()
 
     def __enter__(self):
         """Context manager entry."""
@@ -32,7 +561,7 @@ class InfluxDBManager:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.disconnect()
+        self.close()
 
     def connect(self) -> None:
         """Establish connection to InfluxDB."""
@@ -43,6 +572,7 @@ class InfluxDBManager:
                 org=self.config.org,
                 timeout=self.config.timeout,
                 verify_ssl=self.config.verify_ssl,
+                connection_pool_maxsize=self.connection_pool_size,
             )
             self._query_api = self._client.query_api()
             self._organizations_api = self._client.organizations_api()
@@ -54,110 +584,507 @@ class InfluxDBManager:
 
     def disconnect(self) -> None:
         """Close InfluxDB connection."""
+        with self._schema_executor_lock:
+            if self._schema_executor:
+                self._schema_executor.shutdown(wait=False, cancel_futures=True)
+                self._schema_executor = None
         if self._client:
             self._client.close()
             self._client = None
             self._query_api = None
             logger.info("Disconnected from InfluxDB")
 
+    def close(self) -> None:
+        """Close the InfluxDB connection and the persistent schema catalog."""
+        self.disconnect()
+        self.schema_cache.close()
+
     def test_connection(self) -> Dict[str, Any]:
         """Test the InfluxDB connection and return status."""
+        return self._check_connection(server_info=True)
+
+    def check_health(self) -> Dict[str, Any]:
+        """Check the InfluxDB health with a single request, reporting the server version and build read once."""
+        return self._check_connection(server_info=self._server_info is None)
+
+    def _check_connection(self, server_info: bool) -> Dict[str, Any]:
+        """Check the InfluxDB health, reading the server version and build when `server_info` is set."""
         try:
             if not self._client:
                 self.connect()
 
             # Simple health check - try a basic query
             if self._client:
-                health = self._client.health()
-
-                return {
-                    "status": "connected",
-                    "health": health.status if health else "unknown",
-                    "message": (health.message if health and health.message else "Connection successful"),
-                    "url": self.config.url,
-                    "org": self.config.org,
-                    "version": self._client.version(),
-                    "build": self._client.build(),
-                }
+                with upstream("health"):
+                    health = self._client.health()
+                    if server_info:
+                        self._server_info = {"version": self._client.version(), "build": self._client.build()}
+                return self._connected_status(health)
             else:
                 raise RuntimeError("Failed to establish connection")
 
         except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e),
-                "url": self.config.url,
-                "org": self.config.org,
-            }
-
-    def execute_query(self, query: str) -> List:
-        """Execute a Flux query and return results."""
+            return self._error_status(e)
+
+    def execute_query(self, query: str, result_format: str = "records") -> List:
+        """Execute a Flux query and return results.
+
+        Concurrent identical queries share a single execution.
+        """
+        if not self._query_api:
+            raise RuntimeError("Not connected to InfluxDB")
+        self._check_result_format(result_format)
+        key = self.query_cache.key(self.config.org, query, result_format)
+        cached: Optional[List[Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        data, _ = self.flights.do(("query", *key), lambda: self._run_query(query, result_format, key))
+        return data
+
+    def _run_query(self, query: str, result_format: str, key: Any) -> List:
+        """Run a Flux query, convert and cache its result."""
+        started = time.perf_counter()
+        try:
+            plan = self.window_cache.plan(self.config.org, query)
+            if plan:
+                data = self._rows_to_json(self._window_rows(plan), result_format)
+            else:
+                logger.info(f"Executing query: {query}")
+                with upstream("query", query):
+                    result = self._query_api.query(query, org=self.config.org)  # type: ignore
+                data = self._tables_to_json(result, result_format)
+            if self._finish_result(key, query, "window" if plan else "query", started, data, result_format):
+                self._profile_slow_query(query)
+            return data
+
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            raise
+
+    def execute_query_paged(
+        self, query: str, page_size: Optional[int] = None, result_format: str = "records"
+    ) -> Dict[str, Any]:
+        """Execute a Flux query as a stream and return its first page with a cursor to the next one.
+
+        Rows are converted as the annotated CSV response is read and reading
+        stops as soon as the page is full, so memory use is bounded by the page
+        size and the configured response limits regardless of the size of the result.
+        """
+        if not self._query_api:
+            raise RuntimeError("Not connected to InfluxDB")
+        page_size = self._page_size(page_size)
+        self._check_result_format(result_format)
+        key = self.query_cache.key(self.config.org, query, result_format, page_size)
+        cached: Optional[Dict[str, Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        # Not collapsed with concurrent identical queries: the cursor of a truncated page can only be read by the
+        # caller that opened it, and whether the page is truncated is only known once it has been read
+        return self._open_page(query, page_size, result_format, key)
+
+    def _open_page(self, query: str, page_size: int, result_format: str, key: Any) -> Dict[str, Any]:
+        """Open a streaming query cursor and read its first page, caching complete results."""
+        started = time.perf_counter()
+        plan = self.window_cache.plan(self.config.org, query)
+        if plan:
+            rows: Iterator[Dict[str, Any]] = iter(self._window_rows(plan))
+        else:
+            logger.info(f"Executing streaming query: {query}")
+            rows = self._stream_rows(query)
+        cursor = self.cursors.open(query, rows, page_size, result_format)
+        page = self._read_page(cursor)
+        size = 0
+        if not page["truncated"]:
+            # Only complete results are cached, a truncated one holds a live cursor
+            size = self._cache_result(key, query, page, page["data"])
+        mode = "window" if plan else "stream"
+        if self._log_slow_query(query, mode, started, page["data"], page["record_count"], size, result_format):
+            self._profile_slow_query(query)
+        return page
+
+    def execute_query_downsampled(self, query: str, max_points: int, result_format: str = "records") -> Dict[str, Any]:
+        """Execute a Flux query and reduce every table to at most `max_points` points with LTTB.
+
+        Tables are downsampled before their records are converted, so only
+        the kept points are converted. Concurrent identical queries share a
+        single execution.
+        """
+        if not self._query_api:
+            raise RuntimeError("Not connected to InfluxDB")
+        self._check_result_format(result_format)
+        check_max_points(max_points)
+        key = self.query_cache.key(self.config.org, query, result_format, "lttb", max_points)
+        cached: Optional[Dict[str, Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        result, _ = self.flights.do(
+            ("lttb", *key), lambda: self._run_downsampled(query, max_points, result_format, key)
+        )
+        return result
+
+    def _run_downsampled(self, query: str, max_points: int, result_format: str, key: Any) -> Dict[str, Any]:
+        """Run a Flux query, downsample, convert and cache or spool its result."""
+        started = time.perf_counter()
+        try:
+            plan = self.window_cache.plan(self.config.org, query)
+            if plan:
+                rows, reduction = downsample_rows(self._window_rows(plan), max_points)
+                data = self._rows_to_json(rows, result_format)
+            else:
+                logger.info(f"Executing query: {query}")
+                with upstream("query", query):
+                    tables = self._query_api.query(query, org=self.config.org)  # type: ignore
+                reduction = downsample_tables(tables, max_points)
+                # Converted once, columnar tables keep their group keys
+                data = self._tables_to_json(tables, result_format)
+            records, size, spool = self._downsampled_size(data, result_format)
+            if spool:
+                manifest = self._spool_result(query, data, result_format)
+                result = {**self._spooled_result(manifest), "downsampling": reduction}
+                mode = "spool"
+            else:
+                result = self._downsampled_result(key, query, data, reduction, result_format, size)
+                mode = "window" if plan else "query"
+            if self._log_slow_query(query, mode, started, [], records, size, result_format):
+                self._profile_slow_query(query)
+            return result
+
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            raise
+
+    def execute_query_spooled(self, query: str, result_format: str = "records") -> Dict[str, Any]:
+        """Execute a Flux query as a stream, returning small results inline and spooling large ones to disk.
+
+        Rows are read until their estimated size exceeds the spool threshold;
+        the complete result is then written to the spool in compressed pages
+        and only its summary is returned, so memory use is bounded by the
+        threshold and the page size. Concurrent identical queries share a single
+        execution and spooled result.
+        """
         if not self._query_api:
             raise RuntimeError("Not connected to InfluxDB")
+        self._check_result_format(result_format)
+        key = self.query_cache.key(self.config.org, query, result_format, "spool")
+        cached: Optional[Dict[str, Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
 
+        result, _ = self.flights.do(("spool", *key), lambda: self._spool_query(query, result_format, key))
+        return result
+
+    def _spool_query(self, query: str, result_format: str, key: Any) -> Dict[str, Any]:
+        """Read a query result up to the spool threshold, spooling the whole result when it is exceeded."""
+        started = time.perf_counter()
+        plan = self.window_cache.plan(self.config.org, query)
+        if plan:
+            rows: Iterator[Dict[str, Any]] = iter(self._window_rows(plan))
+        else:
+            logger.info(f"Executing streaming query: {query}")
+            rows = self._stream_rows(query)
+        head: List[Dict[str, Any]] = []
+        size = 0
+        spooled: Optional[SpooledResult] = None
         try:
-            logger.info(f"Executing query: {query}")
-            result = self._query_api.query(query, org=self.config.org)
-            if not result:
-                logger.warning("Query returned no results")
-                return []
-            if isinstance(result, TableList):
-                # Convert TableList to JSON
-                result = json.loads(result.to_json())
-            elif isinstance(result, list):
-                # Convert list of records to JSON
-                result = json.loads(TableList(result).to_json())
+            for row in rows:
+                head.append(row)
+                size += row_size(row)
+                if size > self.config.spool_threshold:
+                    break
+            else:
+                result = self._inline_result(key, query, head, size, result_format)
+                if self._log_slow_query(
+                    query, "window" if plan else "stream", started, [], len(head), size, result_format
+                ):
+                    self._profile_slow_query(query)
+                return result
 
+            spooled = self.result_spool.create(query, result_format)
+            for row in itertools.chain(head, rows):
+                if spooled.append(row):
+                    spooled.write_page()
+            result = self._spooled_result(spooled.close())
+            if self._log_slow_query(query, "spool", started, [], spooled.records, spooled.bytes, result_format):
+                self._profile_slow_query(query)
             return result
 
         except ApiException as e:
+            if spooled:
+                spooled.abort()
             logger.error(f"InfluxDB API error: {e}")
             raise RuntimeError(f"Query failed: {e}")
         except Exception as e:
+            if spooled:
+                spooled.abort()
             logger.error(f"Query execution error: {e}")
             raise
+        finally:
+            if hasattr(rows, "close"):
+                rows.close()
 
-    def list_measurements(self, bucket: str) -> List[Dict[str, Any]]:
-        """Get list of available measurements in the bucket."""
+    def estimate_query(self, query: str) -> Dict[str, Any]:
+        """Predict the rows and bytes a Flux query returns from its series cardinality and write rate, before it runs.
 
+        Both statistics are read with small queries whose results are cached,
+        so repeated estimates of queries over the same series are free.
+        """
+        if not self._query_api:
+            raise RuntimeError("Not connected to InfluxDB")
+        scope, cardinality_flux, sample_flux, seconds = self._plan_estimate(query)
+        cardinality_key = self._statistics_key("cardinality", cardinality_flux)
+        sample_key = self._statistics_key("write_rate", sample_flux)
+
+        def load_cardinality() -> Dict[str, Any]:
+            return self.flights.do(cardinality_key, lambda: self._query_cardinality(cardinality_flux))[0]
+
+        def load_sample() -> Dict[str, Any]:
+            return self.flights.do(sample_key, lambda: self._sample_write_rate(sample_flux, seconds))[0]
+
+        cardinality, cardinality_cache = self.statistics.get(cardinality_key, load_cardinality)
+        sample, sample_cache = self.statistics.get(sample_key, load_sample)
+        cache = {"cardinality": cardinality_cache["status"], "write_rate": sample_cache["status"]}
+        return self._estimate(scope, cardinality, sample, cache)
+
+    def _query_cardinality(self, query: str) -> Dict[str, Any]:
+        """Count the series a query reads, None when the server cannot count them."""
         try:
-            # List all measurements in a bucket using flux query
-            measurements = self._query_api.query(  # type: ignore
-                f"""
-                import "influxdata/influxdb/schema"
-                schema.measurements(bucket: "{bucket}")
-            """,
-                org=self.config.org,
+            with upstream("estimate", query):
+                tables = self._query_api.query(query, org=self.config.org)  # type: ignore
+            return self._cardinality_statistics(tables)
+        except ApiException as e:
+            # influxdb.cardinality() is not available on older servers, the sampled series are used instead
+            logger.warning(f"Series cardinality query failed, estimating from the sampled series: {e}")
+            return {"series": None}
+
+    def _sample_write_rate(self, query: str, seconds: float) -> Dict[str, Any]:
+        """Count the points written to the series of a query over the sample range."""
+        try:
+            with upstream("estimate", query):
+                tables = self._query_api.query(query, org=self.config.org)  # type: ignore
+            return self._sample_statistics(tables, seconds)
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+
+    def export_query(self, query: str, compression: str = "zstd") -> Dict[str, Any]:
+        """Stream the result of a Flux query into Parquet files in the spool directory and return their manifest.
+
+        The annotated CSV response is converted in batches as it is read, so
+        memory use does not depend on the size of the result. Response limits
+        and the query cache do not apply.
+        """
+        if not self._query_api:
+            raise RuntimeError("Not connected to InfluxDB")
+        started = time.perf_counter()
+        export_id, export = self._start_export(compression)
+        try:
+            logger.info(f"Exporting query: {query}")
+            with upstream("export", query):
+                response = self._query_api.query_raw(query, org=self.config.org)
+            try:
+                for chunk in response.stream(EXPORT_CHUNK_SIZE):
+                    export.feed(chunk)
+            finally:
+                response.release_conn()
+            return self._finish_export(export_id, export, query, compression, started)
+
+        except ApiException as e:
+            self._abort_export(export_id, export)
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            self._abort_export(export_id, export)
+            logger.error(f"Query export error: {e}")
+            raise
+
+    def _profile_slow_query(self, query: str) -> None:
+        """Re-run a slow query with the Flux profiler in a background thread."""
+        threading.Thread(target=self._profile_query, args=(query,), name="influxdb-profile", daemon=True).start()
+
+    def _profile_query(self, query: str) -> None:
+        """Run a query with the query and operator profilers enabled and log their timings."""
+        records: List[Any] = []
+        started = time.perf_counter()
+        try:
+            query_api = self._client.query_api(  # type: ignore
+                query_options=QueryOptions(profilers=PROFILERS, profiler_callback=records.append)
             )
-            result = []
-            for measurement in measurements:
-                for record in measurement.records:
-                    result.append({"measurement": record.get_value(), "tags": [], "fields": []})
-                    schema_query = self._query_api.query(  # type: ignore
-                        f"""
-                        import "influxdata/influxdb/schema"
-                        schema.measurementTagKeys(bucket: "{bucket}", measurement: "{record.get_value()}")
-                    """,
-                        org=self.config.org,
-                    )
-                    for tag_record in schema_query[0].records:
-                        result[-1]["tags"].append(tag_record.get_value())
-                    schema_query = self._query_api.query(  # type: ignore
-                        f"""
-                        import "influxdata/influxdb/schema"
-                        schema.measurementFieldKeys(bucket: "{bucket}", measurement: "{record.get_value()}")
-                    """,
-                        org=self.config.org,
-                    )
-                    for field_record in schema_query[0].records:
-                        result[-1]["fields"].append(field_record.get_value())
-            return result
+            # Result rows are discarded as they are read, only the profiler records are kept
+            for _ in query_api.query_stream(query, org=self.config.org):
+                pass
+            self.slow_queries.log_profile(query, records, (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            self.slow_queries.log_profile(query, [], (time.perf_counter() - started) * 1000, error=str(e))
+
+    def fetch_page(self, cursor_id: str) -> Dict[str, Any]:
+        """Return the next page of a streaming query."""
+        return self._read_page(self.cursors.take(cursor_id))
+
+    def _window_rows(self, plan: WindowPlan) -> List[Dict[str, Any]]:
+        """Run the sub-queries of a sliding window query and stitch them with the cached windows."""
+        try:
+            results = []
+            for query in plan.queries:
+                logger.info(f"Executing window query: {query}")
+                with upstream("window", query):
+                    results.append(self._query_api.query(query, org=self.config.org))  # type: ignore
+            return self.window_cache.complete(plan, results)
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+
+    def _stream_rows(self, query: str) -> Iterator[Dict[str, Any]]:
+        """Stream converted result rows, closing the HTTP response when the stream is closed."""
+        # Times the response headers; reading and converting rows overlaps with the transfer
+        with upstream("stream", query):
+            records = self._query_api.query_stream(query, org=self.config.org)  # type: ignore
+        try:
+            for record in records:
+                yield record_to_row(record)
+        finally:
+            records.close()
+
+    def _read_page(self, cursor: QueryCursor) -> Dict[str, Any]:
+        """Read rows from a cursor until the page is full, reading one row ahead to detect the end."""
+        page: List[Dict[str, Any]] = []
+        size = 0
+        measure = self.config.max_bytes > 0
+        if cursor.lookahead is not NO_ROW:
+            page.append(cursor.lookahead)
+            size = row_size(cursor.lookahead) if measure else 0
+            cursor.lookahead = NO_ROW
+        try:
+            for row in cursor.rows:
+                if self._page_full(cursor, len(page), size):
+                    cursor.lookahead = row
+                    break
+                page.append(row)
+                if measure:
+                    size += row_size(row)
+        except ApiException as e:
+            self.cursors.close(cursor)
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            self.cursors.close(cursor)
+            logger.error(f"Query execution error: {e}")
+            raise
+        return self._page_result(cursor, page, size)
+
+    def list_measurements(self, bucket: str) -> List[Dict[str, Any]]:
+        """Get list of available measurements in the bucket along with their tags and fields."""
+        measurements: List[Dict[str, Any]] = self.discover_measurements(bucket)["measurements"]
+        return measurements
+
+    def discover_measurements(self, bucket: str, refresh: bool = False) -> Dict[str, Any]:
+        """Discover measurements, tags and fields in the bucket, served from the schema cache when possible."""
+        key = self._schema_key("measurements", bucket)
+
+        def load() -> Dict[str, Any]:
+            return self.flights.do(key, lambda: self._discover_measurements(bucket))[0]
 
+        if refresh:
+            discovery, cache_info = self.schema_cache.refresh(key, load)
+        else:
+            discovery, cache_info = self.schema_cache.get(key, load)
+        return {**discovery, "cache": cache_info}
+
+    def _discover_measurements(self, bucket: str) -> Dict[str, Any]:
+        """Discover measurements, tags and fields in the bucket and report discovery timing stats."""
+        if not self._query_api:
+            raise RuntimeError("Not connected to InfluxDB")
+
+        started = time.perf_counter()
+        if self.config.schema_discovery != "per-measurement":
+            try:
+                query = bucket_schema_query(bucket)
+                with upstream("schema", query):
+                    tables = self._query_api.query(query, org=self.config.org)
+                return self._single_query_discovery(tables, started)
+            except ApiException as e:
+                if self.config.schema_discovery == "single-query":
+                    logger.error(f"Failed to get measurements: {e}")
+                    raise RuntimeError(f"Failed to get measurements: {e}")
+                # Older servers may reject the combined query, fall back to per-measurement queries
+                logger.warning(f"Single-query schema discovery failed, falling back to per-measurement queries: {e}")
+
+        try:
+            return self._discover_measurements_per_measurement(bucket, started)
         except Exception as e:
             logger.error(f"Failed to get measurements: {e}")
             raise RuntimeError(f"Failed to get measurements: {e}")
 
-    def list_buckets(self) -> List[Dict[str, Any]]:
+    def _discover_measurements_per_measurement(self, bucket: str, started: float) -> Dict[str, Any]:
+        """Discover the bucket schema with per-measurement queries run through a bounded worker pool."""
+        query_api: QueryApi = self._query_api  # type: ignore
+        query = measurements_query(bucket)
+        with upstream("schema", query):
+            names = table_values(query_api.query(query, org=self.config.org))
+
+        def query_keys(query: str) -> Tuple[List[Any], float]:
+            query_started = time.perf_counter()
+            with upstream("schema", query):
+                values = table_values(query_api.query(query, org=self.config.org))
+            return values, time.perf_counter() - query_started
+
+        executor = self._get_schema_executor()
+
+        def submit(query: str) -> "Future[Tuple[List[Any], float]]":
+            # Run in a copy of the caller's context so the query spans stay children of the current span
+            return executor.submit(contextvars.copy_context().run, query_keys, query)
+
+        futures = [
+            (submit(measurement_tag_keys_query(bucket, name)), submit(measurement_field_keys_query(bucket, name)))
+            for name in names
+        ]
+        outcomes = [(self._future_outcome(tags), self._future_outcome(fields)) for tags, fields in futures]
+        return self._per_measurement_discovery(bucket, names, outcomes, started)
+
+    @staticmethod
+    def _future_outcome(future: "Future[Tuple[List[Any], float]]") -> KeysOutcome:
+        """Wait for a schema key query, returning its raised exception instead of propagating it."""
+        try:
+            return future.result()
+        except Exception as e:
+            return e
+
+    def _get_schema_executor(self) -> ThreadPoolExecutor:
+        """Get or create the worker pool bounding concurrent schema queries."""
+        with self._schema_executor_lock:
+            if self._schema_executor is None:
+                self._schema_executor = ThreadPoolExecutor(
+                    max_workers=self.config.schema_concurrency, thread_name_prefix="influxdb-schema"
+                )
+            return self._schema_executor
+
+    def list_buckets(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Get list of buckets in the organization, served from the schema cache when possible."""
+        key = self._schema_key("buckets")
+
+        def load() -> List[Dict[str, Any]]:
+            return self.flights.do(key, self._list_buckets)[0]
+
+        buckets: List[Dict[str, Any]]
+        if refresh:
+            buckets, _ = self.schema_cache.refresh(key, load)
+        else:
+            buckets, _ = self.schema_cache.get(key, load)
+        return buckets
+
+    def _list_buckets(self) -> List[Dict[str, Any]]:
         """Get list of buckets, optionally filtered by organization."""
         try:
             if not self._buckets_api:
@@ -170,15 +1097,10 @@ class InfluxDBManager:
             buckets = self._buckets_api.find_buckets_iter(org=self.config.org)
             bucket_list = []
 
-            for bucket in buckets:
-                bucket_info = {
-                    "name": bucket.name,
-                    "type": bucket.type if hasattr(bucket, "type") else None,
-                    "created_at": (bucket.created_at.isoformat() if bucket.created_at else None),
-                    "updated_at": (bucket.updated_at.isoformat() if bucket.updated_at else None),
-                }
-
-                bucket_list.append(bucket_info)
+            # The iterator requests further pages as it is consumed
+            with upstream("buckets"):
+                for bucket in buckets:
+                    bucket_list.append(self._bucket_info(bucket))
 
             logger.info(f"Found {len(bucket_list)} buckets in organization '{self.config.org}'")
             return bucket_list
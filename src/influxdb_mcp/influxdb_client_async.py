@@ -0,0 +1,643 @@
+"""
+Asyncio InfluxDB client and operations module.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+
+from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+from influxdb_client.client.query_api import QueryOptions
+from influxdb_client.client.query_api_async import QueryApiAsync
+from influxdb_client.domain.query import Query
+from influxdb_client.rest import ApiException
+from influxdb_client.service.buckets_service import BucketsService
+from influxdb_client.service.health_service import HealthService
+from influxdb_client.service.query_service import QueryService
+
+from .config import InfluxDBConfig
+from .cursors import NO_ROW, QueryCursor
+from .downsample import check_max_points, downsample_rows, downsample_tables
+from .export import CHUNK_SIZE as EXPORT_CHUNK_SIZE
+from .influxdb_client import BaseInfluxDBManager, KeysOutcome
+from .metrics import upstream
+from .results import record_to_row, row_size
+from .schema import (
+    bucket_schema_query,
+    measurement_field_keys_query,
+    measurement_tag_keys_query,
+    measurements_query,
+    table_values,
+)
+from .singleflight import AsyncSingleFlight
+from .slowlog import PROFILERS
+from .spool import SpooledResult
+from .windows import WindowPlan
+
+logger = logging.getLogger(__name__)
+
+# Page size used when listing buckets
+BUCKETS_PAGE_SIZE = 100
+
+
+class AsyncInfluxDBManager(BaseInfluxDBManager):
+    """Manages InfluxDB connections and operations using the asyncio (aiohttp) client.
+
+    The underlying client must be created inside a running event loop, so the
+    connection is established lazily by the first operation.
+    """
+
+    def __init__(self, config: InfluxDBConfig):
+        """Initialize InfluxDB manager with configuration."""
+        super().__init__(config)
+        self._client: Optional[InfluxDBClientAsync] = None
+        self._query_api: Optional[QueryApiAsync] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self.flights = AsyncSingleFlight()
+        # Every open cursor holds a pooled connection until it is read to the end, so half of the pool is left to
+        # other queries rather than waiting on abandoned cursors
+        self.cursors.max_open = min(config.max_open_cursors, max(1, self.connection_pool_size // 2))
+        # Running slow query profiles, referenced until done so they are not garbage collected
+        self._profiles: Set["asyncio.Task[None]"] = set()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+
+    async def connect(self) -> None:
+        """Establish connection to InfluxDB."""
+        try:
+            self._client = InfluxDBClientAsync(
+                url=self.config.url,
+                token=self.config.token,
+                org=self.config.org,
+                timeout=self.config.timeout,
+                verify_ssl=self.config.verify_ssl,
+                connection_pool_maxsize=self.connection_pool_size,
+            )
+            self._query_api = self._client.query_api()
+            logger.info(f"Connected to InfluxDB at {self.config.url} (asyncio)")
+        except Exception as e:
+            logger.error(f"Failed to connect to InfluxDB: {e}")
+            raise
+
+    async def disconnect(self) -> None:
+        """Close InfluxDB connection."""
+        if self._client:
+            await self._client.close()
+            self._client = None
+            self._query_api = None
+            logger.info("Disconnected from InfluxDB")
+
+    async def close(self) -> None:
+        """Close the InfluxDB connection and the persistent schema catalog."""
+        await self.disconnect()
+        self.schema_cache.close()
+
+    async def _ensure_connected(self) -> InfluxDBClientAsync:
+        """Connect on first use from within the running event loop."""
+        if self._client is None:
+            if self._connect_lock is None:
+                self._connect_lock = asyncio.Lock()
+            async with self._connect_lock:
+                if self._client is None:
+                    await self.connect()
+        if self._client is None:
+            raise RuntimeError("Failed to establish connection")
+        return self._client
+
+    async def test_connection(self) -> Dict[str, Any]:
+        """Test the InfluxDB connection and return status."""
+        return await self._check_connection(server_info=True)
+
+    async def check_health(self) -> Dict[str, Any]:
+        """Check the InfluxDB health with a single request, reporting the server version and build read once."""
+        return await self._check_connection(server_info=self._server_info is None)
+
+    async def _check_connection(self, server_info: bool) -> Dict[str, Any]:
+        """Check the InfluxDB health, reading the server version and build when `server_info` is set."""
+        try:
+            client = await self._ensure_connected()
+            with upstream("health"):
+                if server_info:
+                    health, version, build = await asyncio.gather(
+                        HealthService(client.api_client).get_health_async(), client.version(), client.build()
+                    )
+                    self._server_info = {"version": version, "build": build}
+                else:
+                    health = await HealthService(client.api_client).get_health_async()
+            return self._connected_status(health)
+
+        except Exception as e:
+            return self._error_status(e)
+
+    async def execute_query(self, query: str, result_format: str = "records") -> List:
+        """Execute a Flux query and return results.
+
+        Concurrent identical queries share a single execution.
+        """
+        self._check_result_format(result_format)
+        key = self.query_cache.key(self.config.org, query, result_format)
+        cached: Optional[List[Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        data, _ = await self.flights.do(("query", *key), lambda: self._run_query(query, result_format, key))
+        return data
+
+    async def _run_query(self, query: str, result_format: str, key: Any) -> List:
+        """Run a Flux query, convert and cache its result."""
+        started = time.perf_counter()
+        await self._ensure_connected()
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+
+        try:
+            plan = self.window_cache.plan(self.config.org, query)
+            # Results are converted and sized in a thread, a large one would otherwise stall every other session
+            if plan:
+                data = await asyncio.to_thread(self._rows_to_json, await self._window_rows(plan), result_format)
+            else:
+                logger.info(f"Executing query: {query}")
+                with upstream("query", query):
+                    result = await query_api.query(query, org=self.config.org)
+                data = await asyncio.to_thread(self._tables_to_json, result, result_format)
+            mode = "window" if plan else "query"
+            if await asyncio.to_thread(self._finish_result, key, query, mode, started, data, result_format):
+                self._profile_slow_query(query)
+            return data
+
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            raise
+
+    async def execute_query_paged(
+        self, query: str, page_size: Optional[int] = None, result_format: str = "records"
+    ) -> Dict[str, Any]:
+        """Execute a Flux query as a stream and return its first page with a cursor to the next one.
+
+        Rows are converted as the annotated CSV response is read and reading
+        stops as soon as the page is full, so memory use is bounded by the page
+        size and the configured response limits regardless of the size of the result.
+        """
+        await self._ensure_connected()
+        page_size = self._page_size(page_size)
+        self._check_result_format(result_format)
+        key = self.query_cache.key(self.config.org, query, result_format, page_size)
+        cached: Optional[Dict[str, Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        # Not collapsed with concurrent identical queries: the cursor of a truncated page can only be read by the
+        # caller that opened it, and whether the page is truncated is only known once it has been read
+        return await self._open_page(query, page_size, result_format, key)
+
+    async def _open_page(self, query: str, page_size: int, result_format: str, key: Any) -> Dict[str, Any]:
+        """Open a streaming query cursor and read its first page, caching complete results."""
+        started = time.perf_counter()
+        plan = self.window_cache.plan(self.config.org, query)
+        if plan:
+            rows: AsyncGenerator[Dict[str, Any], None] = self._iterate_rows(await self._window_rows(plan))
+        else:
+            logger.info(f"Executing streaming query: {query}")
+            rows = self._stream_rows(query)
+        cursor = self.cursors.open(query, rows, page_size, result_format)
+        page = await self._read_page(cursor)
+        size = 0
+        if not page["truncated"]:
+            # Only complete results are cached, a truncated one holds a live cursor
+            size = self._cache_result(key, query, page, page["data"])
+        mode = "window" if plan else "stream"
+        if self._log_slow_query(query, mode, started, page["data"], page["record_count"], size, result_format):
+            self._profile_slow_query(query)
+        return page
+
+    async def execute_query_downsampled(
+        self, query: str, max_points: int, result_format: str = "records"
+    ) -> Dict[str, Any]:
+        """Execute a Flux query and reduce every table to at most `max_points` points with LTTB.
+
+        Tables are downsampled and converted in a thread, downsampled before
+        their records are converted so only the kept points are converted.
+        Concurrent identical queries share a single execution.
+        """
+        await self._ensure_connected()
+        self._check_result_format(result_format)
+        check_max_points(max_points)
+        key = self.query_cache.key(self.config.org, query, result_format, "lttb", max_points)
+        cached: Optional[Dict[str, Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        result, _ = await self.flights.do(
+            ("lttb", *key), lambda: self._run_downsampled(query, max_points, result_format, key)
+        )
+        return result
+
+    async def _run_downsampled(self, query: str, max_points: int, result_format: str, key: Any) -> Dict[str, Any]:
+        """Run a Flux query, downsample, convert and cache or spool its result."""
+        started = time.perf_counter()
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+
+        try:
+            plan = self.window_cache.plan(self.config.org, query)
+            if plan:
+                rows, reduction = await asyncio.to_thread(downsample_rows, await self._window_rows(plan), max_points)
+                data = await asyncio.to_thread(self._rows_to_json, rows, result_format)
+            else:
+                logger.info(f"Executing query: {query}")
+                with upstream("query", query):
+                    tables = await query_api.query(query, org=self.config.org)
+                reduction = await asyncio.to_thread(downsample_tables, tables, max_points)
+                # Converted once, columnar tables keep their group keys
+                data = await asyncio.to_thread(self._tables_to_json, tables, result_format)
+            records, size, spool = await asyncio.to_thread(self._downsampled_size, data, result_format)
+            if spool:
+                manifest = await asyncio.to_thread(self._spool_result, query, data, result_format)
+                result = {**self._spooled_result(manifest), "downsampling": reduction}
+                mode = "spool"
+            else:
+                result = self._downsampled_result(key, query, data, reduction, result_format, size)
+                mode = "window" if plan else "query"
+            if self._log_slow_query(query, mode, started, [], records, size, result_format):
+                self._profile_slow_query(query)
+            return result
+
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            raise
+
+    async def execute_query_spooled(self, query: str, result_format: str = "records") -> Dict[str, Any]:
+        """Execute a Flux query as a stream, returning small results inline and spooling large ones to disk.
+
+        Rows are read until their estimated size exceeds the spool threshold;
+        the complete result is then written to the spool in compressed pages
+        and only its summary is returned. Pages are compressed and written in a
+        thread to keep the event loop responsive.
+        """
+        await self._ensure_connected()
+        self._check_result_format(result_format)
+        key = self.query_cache.key(self.config.org, query, result_format, "spool")
+        cached: Optional[Dict[str, Any]] = self.query_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of query: {query}")
+            return cached
+
+        result, _ = await self.flights.do(("spool", *key), lambda: self._spool_query(query, result_format, key))
+        return result
+
+    async def _spool_query(self, query: str, result_format: str, key: Any) -> Dict[str, Any]:
+        """Read a query result up to the spool threshold, spooling the whole result when it is exceeded."""
+        started = time.perf_counter()
+        plan = self.window_cache.plan(self.config.org, query)
+        if plan:
+            rows: AsyncGenerator[Dict[str, Any], None] = self._iterate_rows(await self._window_rows(plan))
+        else:
+            logger.info(f"Executing streaming query: {query}")
+            rows = self._stream_rows(query)
+        head: List[Dict[str, Any]] = []
+        size = 0
+        spooled: Optional[SpooledResult] = None
+        try:
+            async for row in rows:
+                head.append(row)
+                size += row_size(row)
+                if size > self.config.spool_threshold:
+                    break
+            else:
+                result = self._inline_result(key, query, head, size, result_format)
+                mode = "window" if plan else "stream"
+                if self._log_slow_query(query, mode, started, [], len(head), size, result_format):
+                    self._profile_slow_query(query)
+                return result
+
+            spooled = await asyncio.to_thread(self.result_spool.create, query, result_format)
+            for row in head:
+                if spooled.append(row):
+                    await asyncio.to_thread(spooled.write_page)
+            async for row in rows:
+                if spooled.append(row):
+                    await asyncio.to_thread(spooled.write_page)
+            result = self._spooled_result(await asyncio.to_thread(spooled.close))
+            if self._log_slow_query(query, "spool", started, [], spooled.records, spooled.bytes, result_format):
+                self._profile_slow_query(query)
+            return result
+
+        except ApiException as e:
+            if spooled:
+                spooled.abort()
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            if spooled:
+                spooled.abort()
+            logger.error(f"Query execution error: {e}")
+            raise
+        finally:
+            await rows.aclose()
+
+    async def estimate_query(self, query: str) -> Dict[str, Any]:
+        """Predict the rows and bytes a Flux query returns from its series cardinality and write rate, before it runs.
+
+        Both statistics are read with small queries whose results are cached,
+        so repeated estimates of queries over the same series are free.
+        """
+        scope, cardinality_flux, sample_flux, seconds = self._plan_estimate(query)
+        cardinality_key = self._statistics_key("cardinality", cardinality_flux)
+        sample_key = self._statistics_key("write_rate", sample_flux)
+
+        async def load_cardinality() -> Dict[str, Any]:
+            return (await self.flights.do(cardinality_key, lambda: self._query_cardinality(cardinality_flux)))[0]
+
+        async def load_sample() -> Dict[str, Any]:
+            return (await self.flights.do(sample_key, lambda: self._sample_write_rate(sample_flux, seconds)))[0]
+
+        (cardinality, cardinality_cache), (sample, sample_cache) = await asyncio.gather(
+            self.statistics.get_async(cardinality_key, load_cardinality),
+            self.statistics.get_async(sample_key, load_sample),
+        )
+        cache = {"cardinality": cardinality_cache["status"], "write_rate": sample_cache["status"]}
+        return self._estimate(scope, cardinality, sample, cache)
+
+    async def _query_cardinality(self, query: str) -> Dict[str, Any]:
+        """Count the series a query reads, None when the server cannot count them."""
+        await self._ensure_connected()
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+        try:
+            with upstream("estimate", query):
+                tables = await query_api.query(query, org=self.config.org)
+            return self._cardinality_statistics(tables)
+        except ApiException as e:
+            # influxdb.cardinality() is not available on older servers, the sampled series are used instead
+            logger.warning(f"Series cardinality query failed, estimating from the sampled series: {e}")
+            return {"series": None}
+
+    async def _sample_write_rate(self, query: str, seconds: float) -> Dict[str, Any]:
+        """Count the points written to the series of a query over the sample range."""
+        await self._ensure_connected()
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+        try:
+            with upstream("estimate", query):
+                tables = await query_api.query(query, org=self.config.org)
+            return self._sample_statistics(tables, seconds)
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+
+    async def export_query(self, query: str, compression: str = "zstd") -> Dict[str, Any]:
+        """Stream the result of a Flux query into Parquet files in the spool directory and return their manifest.
+
+        The annotated CSV response is converted in batches as it is read, so
+        memory use does not depend on the size of the result. Conversion and
+        writing run in a thread to keep the event loop responsive. Response
+        limits and the query cache do not apply.
+        """
+        client = await self._ensure_connected()
+        started = time.perf_counter()
+        export_id, export = await asyncio.to_thread(self._start_export, compression)
+        try:
+            logger.info(f"Exporting query: {query}")
+            with upstream("export", query):
+                response = await QueryService(client.api_client).post_query_async(
+                    org=self.config.org,
+                    query=Query(query=query, dialect=QueryApiAsync.default_dialect, type="flux"),
+                    async_req=False,
+                    _preload_content=False,
+                    _return_http_data_only=True,
+                )
+            try:
+                if not 200 <= response.status <= 299:
+                    error = ApiException(status=response.status, reason=response.reason)
+                    error.body = await response.text()
+                    raise error
+                buffer = bytearray()
+                async for chunk in response.content.iter_chunked(EXPORT_CHUNK_SIZE):
+                    buffer += chunk
+                    if len(buffer) >= EXPORT_CHUNK_SIZE:
+                        await asyncio.to_thread(export.feed, bytes(buffer))
+                        buffer.clear()
+                await asyncio.to_thread(export.feed, bytes(buffer))
+            finally:
+                response.release()
+            return await asyncio.to_thread(self._finish_export, export_id, export, query, compression, started)
+
+        except ApiException as e:
+            self._abort_export(export_id, export)
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            self._abort_export(export_id, export)
+            logger.error(f"Query export error: {e}")
+            raise
+
+    def _profile_slow_query(self, query: str) -> None:
+        """Re-run a slow query with the Flux profiler in a background task."""
+        task = asyncio.get_running_loop().create_task(self._profile_query(query))
+        self._profiles.add(task)
+        task.add_done_callback(self._profiles.discard)
+
+    async def _profile_query(self, query: str) -> None:
+        """Run a query with the query and operator profilers enabled and log their timings."""
+        records: List[Any] = []
+        started = time.perf_counter()
+        try:
+            client = await self._ensure_connected()
+            query_api = client.query_api(QueryOptions(profilers=PROFILERS, profiler_callback=records.append))
+            # Result rows are discarded as they are read, only the profiler records are kept
+            async for _ in await query_api.query_stream(query, org=self.config.org):
+                pass
+            self.slow_queries.log_profile(query, records, (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            self.slow_queries.log_profile(query, [], (time.perf_counter() - started) * 1000, error=str(e))
+
+    async def fetch_page(self, cursor_id: str) -> Dict[str, Any]:
+        """Return the next page of a streaming query."""
+        return await self._read_page(self.cursors.take(cursor_id))
+
+    async def _window_rows(self, plan: WindowPlan) -> List[Dict[str, Any]]:
+        """Run the sub-queries of a sliding window query and stitch them with the cached windows."""
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+
+        async def window_query(query: str) -> Any:
+            logger.info(f"Executing window query: {query}")
+            with upstream("window", query):
+                return await query_api.query(query, org=self.config.org)
+
+        try:
+            results = await asyncio.gather(*(window_query(query) for query in plan.queries))
+            return self.window_cache.complete(plan, results)
+        except ApiException as e:
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+
+    @staticmethod
+    async def _iterate_rows(rows: List[Dict[str, Any]]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Iterate over rows already in memory like over a result stream."""
+        for row in rows:
+            yield row
+
+    async def _stream_rows(self, query: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream converted result rows, closing the HTTP response when the stream is closed."""
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+        # Times the response headers; reading and converting rows overlaps with the transfer
+        with upstream("stream", query):
+            records = await query_api.query_stream(query, org=self.config.org)
+        try:
+            async for record in records:
+                yield record_to_row(record)
+        finally:
+            await records.aclose()
+
+    async def _read_page(self, cursor: QueryCursor) -> Dict[str, Any]:
+        """Read rows from a cursor until the page is full, reading one row ahead to detect the end."""
+        page: List[Dict[str, Any]] = []
+        size = 0
+        measure = self.config.max_bytes > 0
+        if cursor.lookahead is not NO_ROW:
+            page.append(cursor.lookahead)
+            size = row_size(cursor.lookahead) if measure else 0
+            cursor.lookahead = NO_ROW
+        try:
+            async for row in cursor.rows:
+                if self._page_full(cursor, len(page), size):
+                    cursor.lookahead = row
+                    break
+                page.append(row)
+                if measure:
+                    size += row_size(row)
+        except ApiException as e:
+            self.cursors.close(cursor)
+            logger.error(f"InfluxDB API error: {e}")
+            raise RuntimeError(f"Query failed: {e}")
+        except Exception as e:
+            self.cursors.close(cursor)
+            logger.error(f"Query execution error: {e}")
+            raise
+        return self._page_result(cursor, page, size)
+
+    async def list_measurements(self, bucket: str) -> List[Dict[str, Any]]:
+        """Get list of available measurements in the bucket along with their tags and fields."""
+        measurements: List[Dict[str, Any]] = (await self.discover_measurements(bucket))["measurements"]
+        return measurements
+
+    async def discover_measurements(self, bucket: str, refresh: bool = False) -> Dict[str, Any]:
+        """Discover measurements, tags and fields in the bucket, served from the schema cache when possible."""
+        key = self._schema_key("measurements", bucket)
+
+        async def load() -> Dict[str, Any]:
+            return (await self.flights.do(key, lambda: self._discover_measurements(bucket)))[0]
+
+        if refresh:
+            discovery, cache_info = await self.schema_cache.refresh_async(key, load)
+        else:
+            discovery, cache_info = await self.schema_cache.get_async(key, load)
+        return {**discovery, "cache": cache_info}
+
+    async def _discover_measurements(self, bucket: str) -> Dict[str, Any]:
+        """Discover measurements, tags and fields in the bucket and report discovery timing stats."""
+        await self._ensure_connected()
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+
+        started = time.perf_counter()
+        if self.config.schema_discovery != "per-measurement":
+            try:
+                query = bucket_schema_query(bucket)
+                with upstream("schema", query):
+                    tables = await query_api.query(query, org=self.config.org)
+                return self._single_query_discovery(tables, started)
+            except ApiException as e:
+                if self.config.schema_discovery == "single-query":
+                    logger.error(f"Failed to get measurements: {e}")
+                    raise RuntimeError(f"Failed to get measurements: {e}")
+                # Older servers may reject the combined query, fall back to per-measurement queries
+                logger.warning(f"Single-query schema discovery failed, falling back to per-measurement queries: {e}")
+
+        try:
+            return await self._discover_measurements_per_measurement(bucket, started)
+        except Exception as e:
+            logger.error(f"Failed to get measurements: {e}")
+            raise RuntimeError(f"Failed to get measurements: {e}")
+
+    async def _discover_measurements_per_measurement(self, bucket: str, started: float) -> Dict[str, Any]:
+        """Discover the bucket schema with per-measurement queries bounded by a semaphore."""
+        query_api: QueryApiAsync = self._query_api  # type: ignore
+        query = measurements_query(bucket)
+        with upstream("schema", query):
+            names = table_values(await query_api.query(query, org=self.config.org))
+        semaphore = asyncio.Semaphore(self.config.schema_concurrency)
+
+        async def query_keys(query: str) -> Tuple[List[Any], float]:
+            async with semaphore:
+                query_started = time.perf_counter()
+                with upstream("schema", query):
+                    values = table_values(await query_api.query(query, org=self.config.org))
+                return values, time.perf_counter() - query_started
+
+        results: List[KeysOutcome] = await asyncio.gather(
+            *(
+                query_keys(query)
+                for name in names
+                for query in (measurement_tag_keys_query(bucket, name), measurement_field_keys_query(bucket, name))
+            ),
+            return_exceptions=True,
+        )
+        outcomes = list(zip(results[0::2], results[1::2]))
+        return self._per_measurement_discovery(bucket, names, outcomes, started)
+
+    async def list_buckets(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Get list of buckets in the organization, served from the schema cache when possible."""
+        key = self._schema_key("buckets")
+
+        async def load() -> List[Dict[str, Any]]:
+            return (await self.flights.do(key, self._list_buckets))[0]
+
+        buckets: List[Dict[str, Any]]
+        if refresh:
+            buckets, _ = await self.schema_cache.refresh_async(key, load)
+        else:
+            buckets, _ = await self.schema_cache.get_async(key, load)
+        return buckets
+
+    async def _list_buckets(self) -> List[Dict[str, Any]]:
+        """Get list of buckets in the configured organization."""
+        try:
+            client = await self._ensure_connected()
+            service = BucketsService(client.api_client)
+            bucket_list: List[Dict[str, Any]] = []
+            after = None
+
+            while True:
+                kwargs: Dict[str, Any] = {"org": self.config.org, "limit": BUCKETS_PAGE_SIZE}
+                if after:
+                    kwargs["after"] = after
+                with upstream("buckets"):
+                    page = await service.get_buckets_async(**kwargs)
+                buckets = page.buckets or []
+                bucket_list.extend(self._bucket_info(bucket) for bucket in buckets)
+                if len(buckets) < BUCKETS_PAGE_SIZE:
+                    break
+                after = buckets[-1].id
+
+            logger.info(f"Found {len(bucket_list)} buckets in organization '{self.config.org}'")
+            return bucket_list
+
+        except ApiException as e:
+            logger.error(f"InfluxDB API error while getting buckets: {e}")
+            raise RuntimeError(f"Failed to get buckets: {e}")
+        except Exception as e:
+            logger.error(f"Error getting buckets: {e}")
+            raise
@@ -0,0 +1,253 @@
+"""
+Concurrent MCP load generator.
+
+Opens N concurrent MCP sessions against the streamable-http endpoint and
+calls `list_buckets`, `list_measurements` and `execute_flux_query` in a
+weighted random mix, then reports throughput and latency percentiles per tool.
+
+Usage: python -m influxdb_mcp.loadtest [--url http://127.0.0.1:5001/mcp/] [--sessions 10] [--duration 30]
+       [--mix list_buckets=1,list_measurements=2,execute_flux_query=5] [--bucket telegraf] [--query FLUX]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+TOOLS = ("list_buckets", "list_measurements", "execute_flux_query")
+DEFAULT_MIX = "list_buckets=1,list_measurements=2,execute_flux_query=5"
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Call:
+    """Outcome of one tool call."""
+
+    tool: str
+    started: float
+    latency: float
+    ok: bool
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadTest:
+    """Settings of a load test run."""
+
+    url: str
+    sessions: int
+    duration: float
+    weights: Dict[str, float]
+    bucket: Optional[str] = None
+    query: Optional[str] = None
+    page_size: Optional[int] = None
+    seed: Optional[int] = None
+    calls: List[Call] = field(default_factory=list)
+    # Errors of the sessions that failed to connect or broke off, besides the errors of their calls
+    session_errors: List[str] = field(default_factory=list)
+
+    def arguments(self, tool: str) -> Dict[str, Any]:
+        if tool == "list_measurements":
+            return {"bucket": self.bucket}
+        if tool == "execute_flux_query":
+            arguments: Dict[str, Any] = {"query": self.query}
+            if self.page_size:
+                arguments["page_size"] = self.page_size
+            return arguments
+        return {}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse `tool=weight,...` into tool weights, rejecting unknown tools and negative weights."""
+    weights: Dict[str, float] = {}
+    for part in text.split(","):
+        tool, sep, weight = part.strip().partition("=")
+        if tool not in TOOLS:
+            raise ValueError(f"Unknown tool '{tool}', expected one of {', '.join(TOOLS)}")
+        weights[tool] = float(weight) if sep else 1.0
+        if weights[tool] < 0:
+            raise ValueError(f"Negative weight for '{tool}'")
+    weights = {tool: weight for tool, weight in weights.items() if weight > 0}
+    if not weights:
+        raise ValueError("The mix needs at least one tool with a positive weight")
+    return weights
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def call_error(result: Any) -> Optional[str]:
+    """Error message of a tool result, either an MCP error or a `{"status": "error"}` response."""
+    text = " ".join(getattr(item, "text", "") for item in result.content)
+    if result.isError:
+        return text or "tool error"
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(body, dict) and body.get("status") == "error":
+        return str(body.get("message", "error"))
+    return None
+
+
+async def run_session(test: LoadTest, deadline: float, rng: random.Random) -> None:
+    """Call randomly picked tools over one MCP session until the deadline."""
+    tools = list(test.weights)
+    weights = [test.weights[tool] for tool in tools]
+    async with streamablehttp_client(test.url) as (read, write, _), ClientSession(read, write) as session:
+        await session.initialize()
+        while time.perf_counter() < deadline:
+            tool = rng.choices(tools, weights)[0]
+            started = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, test.arguments(tool))
+                error = call_error(result)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            test.calls.append(Call(tool, started, time.perf_counter() - started, error is None, error))
+
+
+async def pick_bucket(url: str) -> Optional[str]:
+    """Name of the first bucket that is not a system bucket."""
+    async with streamablehttp_client(url) as (read, write, _), ClientSession(read, write) as session:
+        await session.initialize()
+        result = await session.call_tool("list_buckets", {})
+    error = call_error(result)
+    if error:
+        raise RuntimeError(f"list_buckets failed: {error}")
+    body = json.loads(" ".join(getattr(item, "text", "") for item in result.content))
+    names = [bucket["name"] for bucket in body.get("buckets", []) if not bucket["name"].startswith("_")]
+    return names[0] if names else None
+
+
+async def run(test: LoadTest) -> float:
+    """Run all sessions concurrently and return the elapsed wall time."""
+    if test.bucket is None and set(test.weights) - {"list_buckets"}:
+        test.bucket = await pick_bucket(test.url)
+        if test.bucket is None:
+            raise RuntimeError("No bucket to query, pass --bucket")
+    if test.query is None:
+        test.query = f'from(bucket: "{test.bucket}") |> range(start: -5m) |> limit(n: 10)'
+
+    seed = random.Random(test.seed)
+    started = time.perf_counter()
+    deadline = started + test.duration
+    outcomes = await asyncio.gather(
+        *(run_session(test, deadline, random.Random(seed.random())) for _ in range(test.sessions)),
+        return_exceptions=True,
+    )
+    test.session_errors = [
+        f"{type(outcome).__name__}: {outcome}" for outcome in outcomes if isinstance(outcome, BaseException)
+    ]
+    return time.perf_counter() - started
+
+
+def summarize(calls: List[Call], elapsed: float) -> Dict[str, Any]:
+    """Throughput, error count and latency percentiles in milliseconds of a set of calls."""
+    latencies = sorted(call.latency * 1000 for call in calls)
+    summary: Dict[str, Any] = {
+        "calls": len(calls),
+        "errors": sum(not call.ok for call in calls),
+        "throughput": len(calls) / elapsed if elapsed else 0.0,
+    }
+    if latencies:
+        summary.update({f"p{p}": percentile(latencies, p) for p in PERCENTILES})
+        summary["max"] = latencies[-1]
+    return summary
+
+
+def report(test: LoadTest, elapsed: float) -> Dict[str, Any]:
+    """Summaries of all calls and of each tool, plus the most frequent errors."""
+    by_tool: Dict[str, List[Call]] = {}
+    errors: Dict[str, int] = {}
+    for call in test.calls:
+        by_tool.setdefault(call.tool, []).append(call)
+        if call.error:
+            errors[call.error] = errors.get(call.error, 0) + 1
+    for error in test.session_errors:
+        errors[error] = errors.get(error, 0) + 1
+    return {
+        "url": test.url,
+        "sessions": test.sessions,
+        "failed_sessions": len(test.session_errors),
+        "duration": elapsed,
+        "mix": test.weights,
+        "total": summarize(test.calls, elapsed),
+        "tools": {tool: summarize(calls, elapsed) for tool, calls in sorted(by_tool.items())},
+        "errors": dict(sorted(errors.items(), key=lambda item: -item[1])[:10]),
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"{result['sessions']} sessions for {result['duration']:.1f}s against {result['url']}")
+    if result["failed_sessions"]:
+        print(f"{result['failed_sessions']} sessions failed")
+    print(
+        f"{'tool':<20} {'calls':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    rows: List[Tuple[str, Dict[str, Any]]] = [*result["tools"].items(), ("total", result["total"])]
+    for name, summary in rows:
+        latencies = " ".join(f"{summary.get(key, 0.0):>9.1f}" for key in ("p50", "p95", "p99", "max"))
+        print(f"{name:<20} {summary['calls']:>8} {summary['errors']:>7} {summary['throughput']:>9.1f} {latencies}")
+    for error, count in result["errors"].items():
+        print(f"{count:>8} x {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent MCP load generator reporting throughput and latency")
+    parser.add_argument("--url", default="http://127.0.0.1:5001/mcp/", help="Streamable HTTP endpoint of the server")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent MCP sessions")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Tool weights as tool=weight,...")
+    parser.add_argument("--bucket", help="Bucket for list_measurements and the default query, the first by default")
+    parser.add_argument("--query", help="Flux query of execute_flux_query, the last 5 minutes of --bucket by default")
+    parser.add_argument("--page-size", type=int, help="page_size of execute_flux_query")
+    parser.add_argument("--seed", type=int, help="Seed of the random tool choice")
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.sessions < 1 or args.duration <= 0:
+        parser.error("--sessions and --duration must be positive")
+
+    test = LoadTest(
+        url=args.url,
+        sessions=args.sessions,
+        duration=args.duration,
+        weights=weights,
+        bucket=args.bucket,
+        query=args.query,
+        page_size=args.page_size,
+        seed=args.seed,
+    )
+    try:
+        elapsed = asyncio.run(run(test))
+    except Exception as e:
+        print(f"Load test failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    result = report(test, elapsed)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if result["total"]["errors"] or result["failed_sessions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Lightweight Prometheus metrics for the MCP server.
+
+Metric updates are a dict lookup and a few additions under a lock, so
+instrumenting a request costs a few microseconds; the text exposition is
+only rendered when `/metrics` is scraped.
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from .tracing import span
+
+LabelValues = Tuple[str, ...]
+
+# Default latency buckets in seconds, from 1 ms to 1 minute
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class of metrics with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Cumulative histogram of observed values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: bucket counts (the last one is +Inf), sum and count
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts), list(totals)) for labels, (counts, totals) in self._values.items()]
+        lines = self.header()
+        for labels, counts, (total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {int(count)}")
+        return lines
+
+
+class CollectedMetric(Metric):
+    """Metric whose samples are read from a callback at scrape time, e.g. cache statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.collect()
+        ]
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    """Ordered collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# Failed to collect {metric.name}: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(
+    Counter("mcp_requests_total", "MCP tool and resource calls by outcome", ("kind", "name", "status"))
+)
+REQUEST_ERRORS = REGISTRY.register(
+    Counter("mcp_request_errors_total", "Failed MCP calls by exception type", ("kind", "name", "exception"))
+)
+REQUEST_LATENCY = REGISTRY.register(
+    Histogram("mcp_request_duration_seconds", "MCP tool and resource call latency", ("kind", "name"))
+)
+IN_FLIGHT = REGISTRY.register(Gauge("mcp_requests_in_flight", "MCP calls currently being handled", ("kind", "name")))
+UPSTREAM_LATENCY = REGISTRY.register(
+    Histogram("influxdb_request_duration_seconds", "InfluxDB HTTP request latency", ("operation",))
+)
+CONVERSION_LATENCY = REGISTRY.register(
+    Histogram("influxdb_result_conversion_seconds", "Conversion of Flux tables into the response format", ("format",))
+)
+RESULT_ROWS = REGISTRY.register(
+    Counter("influxdb_result_rows_total", "Result rows returned to clients", ("operation",))
+)
+RESULT_BYTES = REGISTRY.register(
+    Counter("influxdb_result_bytes_total", "Estimated JSON size of result rows returned to clients", ("operation",))
+)
+
+# Exception type noted by the handler of the current MCP call, see `note_error`
+_current_error: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("mcp_call_error", default=None)
+
+
+def note_error(error: BaseException) -> None:
+    """Record the exception a tool or resource handled and turned into an error response."""
+    noted = _current_error.get()
+    if noted is not None:
+        noted.append(type(error).__name__)
+
+
+@contextmanager
+def upstream(operation: str, statement: Optional[str] = None) -> Iterator[None]:
+    """Time and trace an InfluxDB request, including failed ones; usable around `await` as well."""
+    attributes = {"db.system": "influxdb", "db.operation": operation}
+    if statement is not None:
+        attributes["db.statement"] = statement
+    started = time.perf_counter()
+    try:
+        with span(f"influxdb {operation}", attributes):
+            yield
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, operation)
+
+
+def instrumented(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a tool or resource function to record call counts, latency, errors and in-flight calls.
+
+    Each call also runs in a trace span, the parent of the spans of its InfluxDB
+    requests. The wrapper keeps the signature of the function, which FastMCP inspects to
+    build the tool schema and to match resource template parameters.
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        name = fn.__name__
+        span_name = f"{kind} {name}"
+        attributes = {"mcp.kind": kind, "mcp.name": name}
+
+        def finish(
+            current: Any, started: float, noted: List[str], result: Any = None, error: Optional[BaseException] = None
+        ):
+            REQUEST_LATENCY.observe(time.perf_counter() - started, kind, name)
+            IN_FLIGHT.dec(kind, name)
+            if error is not None:
+                noted.append(type(error).__name__)
+            failed = bool(noted) or (isinstance(result, dict) and result.get("status") == "error")
+            REQUESTS.inc(kind, name, "error" if failed else "success")
+            for exception in noted:
+                REQUEST_ERRORS.inc(kind, name, exception)
+            if current is not None:
+                current.set_attribute("mcp.status", "error" if failed else "success")
+                if noted:
+                    current.set_attribute("error.type", noted[0])
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                noted: List[str] = []
+                token = _current_error.set(noted)
+                IN_FLIGHT.inc(kind, name)
+                started = time.perf_counter()
+                with span(span_name, attributes) as current:
+                    try:
+                        result = await fn(*args, **kwargs)
+                    except BaseException as e:
+                        finish(current, started, noted, error=e)
+                        raise
+                    finally:
+                        _current_error.reset(token)
+                    finish(current, started, noted, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            noted: List[str] = []
+            token = _current_error.set(noted)
+            IN_FLIGHT.inc(kind, name)
+            started = time.perf_counter()
+            with span(span_name, attributes) as current:
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    finish(current, started, noted, error=e)
+                    raise
+                finally:
+                    _current_error.reset(token)
+                finish(current, started, noted, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,159 @@
+"""
+Conversion of Flux query results into JSON-compatible response structures.
+"""
+
+import base64
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Result formats accepted by execute_flux_query
+RESULT_FORMATS = ("records", "columnar")
+
+# Columns identifying the result and table of a record, reported in the table header
+TABLE_COLUMNS = ("result", "table")
+
+
+def json_value(value: Any) -> Any:
+    """Convert a single parsed Flux value into a JSON-compatible value."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _converted_columns(table: Any) -> Tuple[List[str], List[str]]:
+    """Labels of the group key and other columns whose parsed values are not JSON-compatible."""
+    group_columns: List[str] = []
+    columns: List[str] = []
+    for column in table.columns:
+        if column.data_type and (column.data_type.startswith("dateTime") or column.data_type == "base64Binary"):
+            (group_columns if column.group else columns).append(column.label)
+    return group_columns, columns
+
+
+def tables_to_records(tables: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Flatten Flux tables into one dict per record, in a single pass.
+
+    Produces the same structure as `json.loads(TableList.to_json())` without
+    building and re-parsing the intermediate JSON string. Only the timestamp
+    and binary columns, known from the table annotations, are converted, group
+    key columns once per table. The record value dicts are updated in place
+    rather than copied, so the tables must not be used afterwards.
+    """
+    rows: List[Dict[str, Any]] = []
+    for table in tables:
+        group_columns, columns = _converted_columns(table)
+        group_values: Dict[str, Any] = {}
+        if group_columns and table.records:
+            first = table.records[0].values
+            group_values = {label: json_value(first.get(label)) for label in group_columns}
+        for record in table.records:
+            values = record.values
+            if group_values:
+                values.update(group_values)
+            for label in columns:
+                value = values.get(label)
+                if value is not None:
+                    values[label] = json_value(value)
+            rows.append(values)
+    return rows
+
+
+def record_to_row(record: Any) -> Dict[str, Any]:
+    """Convert a streamed Flux record, which carries no column annotations, into a dict."""
+    return {key: json_value(value) for key, value in record.values.items()}
+
+
+def row_size(row: Dict[str, Any]) -> int:
+    """Cheaply estimate the serialized JSON size of a converted row."""
+    # Quotes, colon, comma and space around every key and value
+    return sum(len(key) + len(str(value)) + 6 for key, value in row.items())
+
+
+def tables_to_columnar(tables: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Convert Flux tables into one entry per table holding its group key and column arrays.
+
+    The group key, known from the table annotations, is emitted once per
+    table instead of being repeated in every record, and the remaining
+    columns are returned as arrays of values in record order.
+    """
+    result: List[Dict[str, Any]] = []
+    for table in tables:
+        if not table.records:
+            continue
+        _, converted = _converted_columns(table)
+        first = table.records[0].values
+        labels = [column.label for column in table.columns if not column.group and column.label not in TABLE_COLUMNS]
+        data: Dict[str, List[Any]] = {}
+        for label in labels:
+            values = [record.values.get(label) for record in table.records]
+            if label in converted:
+                values = [json_value(value) for value in values]
+            data[label] = values
+        result.append(
+            {
+                "result": first.get("result"),
+                "table": first.get("table"),
+                "group_key": {
+                    column.label: json_value(first.get(column.label)) for column in table.columns if column.group
+                },
+                "columns": data,
+                "record_count": len(table.records),
+            }
+        )
+    return result
+
+
+def rows_to_columnar(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert streamed rows into the columnar format of `tables_to_columnar`.
+
+    Streamed records carry no group annotations, so the header of each table
+    holds the columns whose value is the same in all of its rows of the page;
+    together with the column arrays it still restores every row exactly.
+    """
+    result: List[Dict[str, Any]] = []
+    start = 0
+    while start < len(rows):
+        first = rows[start]
+        end = start + 1
+        while end < len(rows) and all(rows[end].get(label) == first.get(label) for label in TABLE_COLUMNS):
+            end += 1
+        chunk = rows[start:end]
+        labels = [label for label in first if label not in TABLE_COLUMNS]
+        header: Dict[str, Any] = {}
+        if len(chunk) > 1:
+            header = {label: first[label] for label in labels if all(row.get(label) == first[label] for row in chunk)}
+        result.append(
+            {
+                "result": first.get("result"),
+                "table": first.get("table"),
+                "group_key": header,
+                "columns": {label: [row.get(label) for row in chunk] for label in labels if label not in header},
+                "record_count": len(chunk),
+            }
+        )
+        start = end
+    return result
+
+
+def columnar_size(tables: List[Dict[str, Any]]) -> int:
+    """Estimate the serialized JSON size of columnar tables as records, the sum of `row_size` of their rows."""
+    size = 0
+    for table in tables:
+        header = {"result": table["result"], "table": table["table"], **table["group_key"]}
+        size += table["record_count"] * row_size(header)
+        for label, values in table["columns"].items():
+            size += sum(len(label) + len(str(value)) + 6 for value in values)
+    return size
+
+
+def columnar_to_rows(tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Restore the rows of columnar tables, with the values of the table header in every row."""
+    rows: List[Dict[str, Any]] = []
+    for table in tables:
+        header = {"result": table["result"], "table": table["table"], **table["group_key"]}
+        columns = table["columns"]
+        for index in range(table["record_count"]):
+            rows.append({**header, **{label: values[index] for label, values in columns.items()}})
+    return rows
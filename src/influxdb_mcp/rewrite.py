@@ -0,0 +1,131 @@
+"""
+Rewriting of raw Flux queries to aggregate in InfluxDB when they exceed a point budget.
+
+A plain `from() |> range() |> filter()` pipeline returns every stored point.
+When the points per series estimated from the length of the range exceed the
+budget, an `aggregateWindow()` is appended so InfluxDB returns at most the
+budget of points per series and only those cross the network.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from .flux import TimeRange, normalize_query, split_pipeline, stage_call
+from .windows import ROW_STAGES
+
+# Downsampling functions: the mean of each window, or its minimum and maximum points
+DOWNSAMPLE_FUNCTIONS = ("mean", "minmax")
+
+# Window lengths rewritten queries are rounded up to, in seconds, beyond which whole days are used
+WINDOW_STEPS = (
+    (1, "1s"),
+    (2, "2s"),
+    (5, "5s"),
+    (10, "10s"),
+    (15, "15s"),
+    (30, "30s"),
+    (60, "1m"),
+    (120, "2m"),
+    (300, "5m"),
+    (600, "10m"),
+    (900, "15m"),
+    (1800, "30m"),
+    (3600, "1h"),
+    (7200, "2h"),
+    (10800, "3h"),
+    (21600, "6h"),
+    (43200, "12h"),
+    (86400, "1d"),
+)
+
+
+@dataclass
+class Rewrite:
+    """A query rewritten to aggregate windows of `every` in InfluxDB."""
+
+    query: str
+    every: str
+    fn: str
+    estimated_points: int
+    point_budget: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "query": self.query,
+            "every": self.every,
+            "fn": self.fn,
+            "estimated_points_per_series": self.estimated_points,
+            "point_budget": self.point_budget,
+        }
+
+
+def window_every(seconds: float) -> str:
+    """Round a window length up to a Flux duration literal of a common size."""
+    for step, literal in WINDOW_STEPS:
+        if seconds <= step:
+            return literal
+    return f"{math.ceil(seconds / 86400)}d"
+
+
+def _minmax(source: str, every: str) -> str:
+    """Keep the points with the minimum and maximum value of every window, at their own times."""
+    return (
+        f"data = {source}\n"
+        f"union(tables: [data |> window(every: {every}) |> min(), data |> window(every: {every}) |> max()])\n"
+        '  |> window(every: inf)\n  |> sort(columns: ["_time"])\n  |> unique(column: "_time")'
+    )
+
+
+def downsample_query(
+    query: str,
+    point_budget: int,
+    sample_interval: float,
+    fn: str = "mean",
+    now: Optional[datetime] = None,
+) -> Optional[Rewrite]:
+    """Rewrite a raw query to aggregate windows when its points per series are estimated to exceed the budget.
+
+    Only a single pipeline of `from()`, a `range()` with literal bounds, row
+    filters and an optional `yield()` is rewritten; for queries that already
+    transform or aggregate their rows None is returned. A series is assumed
+    to have one point every `sample_interval` seconds. The query is analysed
+    in its normalized form but the stages are appended to the text as written.
+    """
+    if point_budget < 1:
+        return None
+    stages = split_pipeline(normalize_query(query))
+    written = split_pipeline(query)
+    calls = [stage_call(stage) for stage in stages]
+    if len(stages) < 2 or len(written) != len(stages) or any(call is None for call in calls):
+        return None
+    names = [call[0] for call in calls]  # type: ignore[index]
+    end = len(names) - 1 if names[-1] == "yield" else len(names)
+    if names[0] != "from" or names[1] != "range" or any(name not in ROW_STAGES for name in names[2:end]):
+        return None
+
+    range_arguments = calls[1][1]  # type: ignore[index]
+    if "start" not in range_arguments:
+        return None
+    duration = TimeRange(range_arguments["start"], range_arguments.get("stop")).duration(
+        now or datetime.now(timezone.utc)
+    )
+    if not duration or duration <= 0:
+        return None
+    estimated = math.ceil(duration / sample_interval)
+    if estimated <= point_budget:
+        return None
+
+    # Min/max keeps two points per window
+    windows = point_budget // 2 if fn == "minmax" else point_budget
+    every = window_every(duration / max(windows, 1))
+    # Stages start on a new line so a trailing line comment of the query cannot swallow them
+    source = "|>".join(written[:end]).strip()
+    if fn == "minmax":
+        rewritten = _minmax(source, every)
+    else:
+        rewritten = f"{source}\n  |> aggregateWindow(every: {every}, fn: {fn}, createEmpty: false)"
+    if end < len(stages):
+        rewritten = f"{rewritten}\n  |> {written[-1].strip()}"
+    return Rewrite(query=rewritten, every=every, fn=fn, estimated_points=estimated, point_budget=point_budget)
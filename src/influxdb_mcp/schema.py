@@ -0,0 +1,101 @@
+"""
+Schema discovery queries for InfluxDB buckets.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+# Same default lookback as the Flux schema package functions
+SCHEMA_LOOKBACK = "-30d"
+
+TAG_KEYS_RESULT = "tag_keys"
+FIELD_KEYS_RESULT = "field_keys"
+
+# Group key columns listed among the tag keys that are not tags
+SYSTEM_COLUMNS = frozenset(["_start", "_stop", "_field", "_measurement"])
+
+
+def flux_string(value: str) -> str:
+    """Quote a Python string as a Flux string literal."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("${", "\\${")
+    return f'"{escaped}"'
+
+
+def bucket_schema_query(bucket: str, start: str = SCHEMA_LOOKBACK) -> str:
+    """Build a single Flux query returning tag and field keys of all measurements in a bucket.
+
+    The `first()` selector is pushed down to the storage engine and reduces the
+    scan to one row per series, so the cost depends on series cardinality rather
+    than on the number of stored points. Both key sets are grouped by
+    `_measurement` and returned as two named results.
+    """
+    return f"""
+data = from(bucket: {flux_string(bucket)})
+  |> range(start: {start})
+  |> first()
+
+data
+  |> keys()
+  |> keep(columns: ["_measurement", "_value"])
+  |> group(columns: ["_measurement"])
+  |> distinct()
+  |> yield(name: "{TAG_KEYS_RESULT}")
+
+data
+  |> keep(columns: ["_measurement", "_field"])
+  |> group(columns: ["_measurement"])
+  |> distinct(column: "_field")
+  |> yield(name: "{FIELD_KEYS_RESULT}")
+"""
+
+
+def measurements_query(bucket: str) -> str:
+    """Build a Flux query listing all measurements in a bucket."""
+    return f"""
+import "influxdata/influxdb/schema"
+schema.measurements(bucket: {flux_string(bucket)})
+"""
+
+
+def measurement_tag_keys_query(bucket: str, measurement: str) -> str:
+    """Build a Flux query listing tag keys of a single measurement."""
+    return f"""
+import "influxdata/influxdb/schema"
+schema.measurementTagKeys(bucket: {flux_string(bucket)}, measurement: {flux_string(measurement)})
+"""
+
+
+def measurement_field_keys_query(bucket: str, measurement: str) -> str:
+    """Build a Flux query listing field keys of a single measurement."""
+    return f"""
+import "influxdata/influxdb/schema"
+schema.measurementFieldKeys(bucket: {flux_string(bucket)}, measurement: {flux_string(measurement)})
+"""
+
+
+def table_values(tables: Iterable[Any]) -> List[Any]:
+    """Collect `_value` of every record in a list of Flux tables."""
+    return [record.get_value() for table in tables for record in table.records]
+
+
+def tag_keys(values: Iterable[Any]) -> List[Any]:
+    """Drop the system columns from a list of tag keys."""
+    return [value for value in values if value not in SYSTEM_COLUMNS]
+
+
+def assemble_bucket_schema(tables: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Assemble per-measurement tags and fields from the result of `bucket_schema_query`."""
+    schema: Dict[str, Dict[str, Any]] = {}
+    for table in tables:
+        for record in table.records:
+            name = record.values.get("_measurement")
+            if name is None:
+                continue
+            entry = schema.setdefault(name, {"measurement": name, "tags": [], "fields": []})
+            is_tag = record.values.get("result") == TAG_KEYS_RESULT
+            value = record.get_value()
+            if is_tag and value in SYSTEM_COLUMNS:
+                continue
+            keys = entry["tags"] if is_tag else entry["fields"]
+            if value not in keys:
+                keys.append(value)
+    return [schema[name] for name in sorted(schema)]
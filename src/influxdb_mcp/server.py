@@ -4,16 +4,23 @@ MCP server providing read-only access to InfluxDB v2 database.
 
 import os
 import json
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union, cast
 
+from influxdb_client.rest import ApiException
 from mcp.server.fastmcp import FastMCP
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 
 from .config import get_config
+from .health import HealthProber
 from .influxdb_client import InfluxDBManager
+from .influxdb_client_async import AsyncInfluxDBManager
+from .metrics import REGISTRY, CollectedMetric, instrumented, note_error
+from .tracing import TRACING_EXPORTERS, setup_tracing, span
+from .workers import WorkerPool
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -27,8 +34,9 @@ mcp = FastMCP(
 Available operations:
 - Test database connection and get status information
 - List available buckets in the InfluxDB instance
-- List available measurements within a specific bucket
+- List available measurements within a specific bucket (cached, use refresh_schema after schema changes)
 - Execute custom Flux queries for data analysis
+- Estimate the rows and bytes of a Flux query before running it
 - Get server configuration information
 - Access sample Flux query templates for common use cases
 
@@ -47,65 +55,223 @@ if MCP_TRANSPORT not in ["sse", "streamable-http", "stdio"]:
         f"Invalid MCP_TRANSPORT: {MCP_TRANSPORT}. Supported modes are 'sse' (deprecated), 'streamable-http' (default) and 'stdio'."
     )
 
+# "async" runs tools on the asyncio client, "threads" offloads the blocking client to a worker pool
+MCP_EXECUTION_MODE = os.getenv("MCP_EXECUTION_MODE", "async").lower()
+if MCP_EXECUTION_MODE not in ["async", "threads"]:
+    raise ValueError(f"Invalid MCP_EXECUTION_MODE: {MCP_EXECUTION_MODE}. Supported modes are 'async' and 'threads'.")
+MCP_WORKER_THREADS = int(os.getenv("MCP_WORKER_THREADS", "16"))
+MCP_MAX_QUEUE = int(os.getenv("MCP_MAX_QUEUE", "64"))
+MCP_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "15"))
+MCP_HEALTH_TIMEOUT = float(os.getenv("MCP_HEALTH_TIMEOUT", "5"))
+MCP_TRACING = os.getenv("MCP_TRACING", "none").lower()
+if MCP_TRACING not in TRACING_EXPORTERS:
+    raise ValueError(f"Invalid MCP_TRACING: {MCP_TRACING}. Supported exporters are {', '.join(TRACING_EXPORTERS)}.")
+MCP_TRACING_FILE = os.getenv("MCP_TRACING_FILE", "traces.jsonl")
+
 # Global InfluxDB manager instance
-influxdb_manager: Optional[InfluxDBManager] = None
+influxdb_manager: Optional[Union[AsyncInfluxDBManager, InfluxDBManager]] = None
+
+# Worker pool for blocking manager calls in "threads" execution mode
+worker_pool: Optional[WorkerPool] = (
+    WorkerPool(MCP_WORKER_THREADS, MCP_MAX_QUEUE) if MCP_EXECUTION_MODE == "threads" else None
+)
 
 
 @mcp.custom_route("/healthcheck", methods=["GET"])
 async def healthcheck(request: Request) -> JSONResponse:
-    """Simple healthcheck endpoint for Docker health monitoring."""
+    """Simple healthcheck endpoint for Docker health monitoring.
+
+    Reports the InfluxDB state cached by the background prober and never calls InfluxDB itself.
+    """
     try:
-        # Test basic server availability
-        server_status = {
+        health_prober.ensure_started()
+        server_status: Dict[str, Any] = {
             "status": "healthy",
             "service": "influxdb-mcp",
+            **health_prober.snapshot(),
         }
 
-        # Optionally test InfluxDB connection if available
+        # Don't fail healthcheck if the manager cannot be created, just report it
         try:
             manager = get_influxdb_manager()
-            connection_status = manager.test_connection()
-            server_status["influxdb_status"] = connection_status["status"]
+            server_status["query_cache"] = manager.query_cache.stats()
+            server_status["single_flight"] = manager.flights.stats()
+            server_status["window_cache"] = manager.window_cache.stats()
+            server_status["result_spool"] = manager.result_spool.stats()
         except Exception as e:
-            # Don't fail healthcheck if InfluxDB is down, just report it
             server_status["influxdb_status"] = "error"
             server_status["influxdb_error"] = str(e)
 
+        if worker_pool is not None:
+            server_status["workers"] = worker_pool.stats()
         return JSONResponse(server_status)
     except Exception as e:
         return JSONResponse({"status": "unhealthy", "error": str(e)}, status_code=503)
 
 
-def get_influxdb_manager() -> InfluxDBManager:
-    """Get or create InfluxDB manager instance."""
+@mcp.custom_route("/livez", methods=["GET"])
+async def livez(request: Request) -> JSONResponse:
+    """Liveness probe: the server process and event loop are responsive."""
+    return JSONResponse({"status": "alive", "service": "influxdb-mcp"})
+
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """Readiness probe: the last background probe reached InfluxDB recently."""
+    health_prober.ensure_started()
+    if health_prober.ready:
+        return JSONResponse({"status": "ready", **health_prober.snapshot()})
+    status = "starting" if health_prober.status is None else "not_ready"
+    return JSONResponse({"status": status, **health_prober.snapshot()}, status_code=503)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus metrics in the text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def get_influxdb_manager() -> Union[AsyncInfluxDBManager, InfluxDBManager]:
+    """Get or create InfluxDB manager instance for the configured execution mode.
+
+    The asyncio manager connects on first use inside the event loop.
+    """
     global influxdb_manager
     if influxdb_manager is None:
         config = get_config()
-        influxdb_manager = InfluxDBManager(config)
-        influxdb_manager.connect()
+        if MCP_EXECUTION_MODE == "threads":
+            influxdb_manager = InfluxDBManager(config)
+            influxdb_manager.connect()
+        else:
+            influxdb_manager = AsyncInfluxDBManager(config)
     return influxdb_manager
 
 
+async def call_manager(method: str, *args: Any, **kwargs: Any) -> Any:
+    """Call an InfluxDB manager method without blocking the event loop.
+
+    In "threads" execution mode the blocking manager call is dispatched to the
+    worker pool, which rejects it with a busy error when its queue is full.
+    Blocking methods of the asyncio manager, like reading spooled pages and
+    exports, run in a thread.
+    """
+    manager = get_influxdb_manager()
+    call = getattr(manager, method)
+    with span(f"{type(manager).__name__}.{method}"):
+        if worker_pool is not None:
+            return await worker_pool.run(call, *args, **kwargs)
+        if asyncio.iscoroutinefunction(call):
+            return await call(*args, **kwargs)
+        return await asyncio.to_thread(call, *args, **kwargs)
+
+
+# Refreshes the cached InfluxDB state reported by the health endpoints
+health_prober = HealthProber(
+    lambda: call_manager("check_health"), interval=MCP_HEALTH_INTERVAL, timeout=MCP_HEALTH_TIMEOUT
+)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics of the manager caches, by cache name."""
+    manager = get_influxdb_manager()
+    return {
+        "query": manager.query_cache.stats(),
+        "window": manager.window_cache.stats(),
+        "schema": manager.schema_cache.stats(),
+        "statistics": manager.statistics.stats(),
+    }
+
+
+def cache_samples(stat: str):
+    """Collect one statistic of every cache, labeled by cache name."""
+    return lambda: [((name,), stats[stat]) for name, stats in cache_stats().items()]
+
+
+def cache_hit_ratios():
+    """Collect the hit ratio of every cache."""
+    return [
+        ((name,), stats["hits"] / (stats["hits"] + stats["misses"]) if stats["hits"] + stats["misses"] else 0.0)
+        for name, stats in cache_stats().items()
+    ]
+
+
+def stat_samples(stats: Any, *names: str):
+    """Collect statistics of a component as samples labeled by statistic name."""
+    return lambda: [((name,), value) for name, value in stats().items() if name in names]
+
+
+# Cache, single-flight, cursor and worker pool state, read when /metrics is scraped
+for collected in (
+    CollectedMetric("mcp_cache_hits_total", "Cache hits", ("cache",), cache_samples("hits"), kind="counter"),
+    CollectedMetric("mcp_cache_misses_total", "Cache misses", ("cache",), cache_samples("misses"), kind="counter"),
+    CollectedMetric("mcp_cache_hit_ratio", "Cache hits over lookups since start", ("cache",), cache_hit_ratios),
+    CollectedMetric("mcp_cache_entries", "Entries held by a cache", ("cache",), cache_samples("entries")),
+    CollectedMetric(
+        "mcp_cache_bytes", "Estimated size of the entries held by a cache", ("cache",), cache_samples("bytes")
+    ),
+    CollectedMetric(
+        "mcp_single_flight_calls_total",
+        "Upstream executions and calls collapsed onto an execution in flight",
+        ("outcome",),
+        stat_samples(lambda: get_influxdb_manager().flights.stats(), "executions", "collapsed"),
+        kind="counter",
+    ),
+    CollectedMetric(
+        "mcp_open_cursors",
+        "Open query result cursors",
+        (),
+        lambda: [((), get_influxdb_manager().cursors.stats()["open"])],
+    ),
+    CollectedMetric(
+        "mcp_spooled_result_bytes",
+        "Disk space used by spooled query results as of the last collection",
+        (),
+        lambda: [((), get_influxdb_manager().result_spool.stats()["bytes"])],
+    ),
+):
+    REGISTRY.register(collected)
+if worker_pool is not None:
+    REGISTRY.register(
+        CollectedMetric(
+            "mcp_worker_pool_calls",
+            "Worker pool calls running and waiting in the queue",
+            ("state",),
+            stat_samples(worker_pool.stats, "active", "queued"),
+        )
+    )
+    REGISTRY.register(
+        CollectedMetric(
+            "mcp_worker_pool_calls_total",
+            "Worker pool calls by outcome",
+            ("outcome",),
+            stat_samples(worker_pool.stats, "completed", "failed", "rejected"),
+            kind="counter",
+        )
+    )
+
+
 @mcp.tool()
-def test_connection() -> Dict[str, Any]:
+@instrumented("tool")
+async def test_connection() -> Dict[str, Any]:
     """Test the connection to InfluxDB and return detailed status information including server version and health."""
     try:
-        manager = get_influxdb_manager()
-        return manager.test_connection()
+        return cast(Dict[str, Any], await call_manager("test_connection"))
     except Exception as e:
+        note_error(e)
         logger.error(f"Connection test failed: {e}")
         return {"status": "error", "message": str(e)}
 
 
 @mcp.tool()
-def list_buckets() -> Dict[str, Any]:
+@instrumented("tool")
+async def list_buckets() -> Dict[str, Any]:
     """List all available buckets in the InfluxDB instance with their retention policies and organization details."""
     try:
-        manager = get_influxdb_manager()
-        buckets = manager.list_buckets()
+        buckets = await call_manager("list_buckets")
 
         return {"status": "success", "buckets": buckets, "count": len(buckets)}
     except Exception as e:
+        note_error(e)
         logger.error(f"Failed to list buckets: {e}")
         return {
             "status": "error",
@@ -114,39 +280,212 @@ def list_buckets() -> Dict[str, Any]:
 
 
 @mcp.tool()
-def list_measurements(bucket: str) -> Dict[str, Any]:
+@instrumented("tool")
+async def list_measurements(bucket: str) -> Dict[str, Any]:
     """List all available measurements (time series) in the specified InfluxDB bucket along with their fields and tags."""
     try:
-        manager = get_influxdb_manager()
-        measurements = manager.list_measurements(bucket)
+        discovery = await call_manager("discover_measurements", bucket)
+        measurements = discovery["measurements"]
         return {
             "status": "success",
             "measurements": measurements,
             "count": len(measurements),
+            "stats": discovery["stats"],
+            "cache": discovery["cache"],
         }
     except Exception as e:
+        note_error(e)
         logger.error(f"Failed to list measurements: {e}")
         return {"status": "error", "message": str(e)}
 
 
 @mcp.tool()
-def execute_flux_query(query: str) -> Dict[str, Any]:
-    """Execute a custom Flux query against the InfluxDB database. Supports aggregations, filtering, transformations, and analytics operations. Returns structured time-series data."""
+@instrumented("tool")
+async def refresh_schema(bucket: str) -> Dict[str, Any]:
+    """Re-discover the measurements, tags and fields of a bucket, bypassing and updating the schema cache. Use after the
+    bucket schema has changed."""
     try:
-        manager = get_influxdb_manager()
-        data = manager.execute_query(query)
-
+        discovery = await call_manager("discover_measurements", bucket, refresh=True)
         return {
             "status": "success",
-            "query": query,
-            "data": data,
-            "record_count": len(data),
+            "bucket": bucket,
+            "count": len(discovery["measurements"]),
+            "stats": discovery["stats"],
+            "cache": discovery["cache"],
         }
     except Exception as e:
+        note_error(e)
+        logger.error(f"Failed to refresh schema: {e}")
+        return {"status": "error", "message": str(e), "bucket": bucket}
+
+
+@mcp.tool()
+@instrumented("tool")
+async def execute_flux_query(
+    query: str, page_size: Optional[int] = None, format: str = "records", max_points_per_series: Optional[int] = None
+) -> Dict[str, Any]:
+    """Execute a custom Flux query against the InfluxDB database. Supports aggregations, filtering, transformations, and analytics operations. Returns structured time-series data.
+
+    The records are returned in data. When the server spools large results, a result above its spool threshold is not
+    returned inline: spooled is true and the response holds a summary (record_count, pages, columns) without data and
+    the influxdb://results/{result_id}/{page} resource URIs to read the records page by page, starting with first_page.
+    Each page links to its next_page. When the server limits response rows or bytes, a larger result is truncated with
+    a next_cursor. Set page_size to stream the result in pages of at most that many records fetched with
+    fetch_query_page and the returned next_cursor, without re-running the query.
+
+    Set format to "columnar" to receive one entry per table with its group_key values once and the other columns as
+    arrays, which is much smaller than the default "records" format (one object per record).
+
+    Set max_points_per_series to reduce every table (series) to at most that many points, e.g. 500 for a chart or a
+    summary. A raw from/range/filter query estimated to exceed it is rewritten to aggregateWindow() so InfluxDB does the
+    reduction, reported in rewrite; the result is then reduced with the Largest-Triangle-Three-Buckets algorithm, which
+    keeps peaks and the visual shape, and returned inline, or spooled when large, with downsampling reporting the points
+    before and after and the reduction_ratio. Cannot be combined with page_size.
+
+    When the server limits estimated rows, queries are estimated first (see estimate_flux_query, reported in estimate)
+    and those above the limit are rewritten to aggregateWindow() or rejected with an error."""
+    try:
+        if max_points_per_series and page_size:
+            raise ValueError("page_size and max_points_per_series cannot be combined")
+        manager = get_influxdb_manager()
+        rewrite = manager.rewrite_query(query, max_points_per_series)
+        estimate = await estimate_before_execution(rewrite["query"] if rewrite else query)
+        # Raises when the query is estimated above the row limit and cannot be aggregated
+        fitted = manager.enforce_estimate(query, estimate) if estimate else None
+        rewrite = fitted or rewrite
+        if rewrite is None:
+            result = await run_flux_query(query, page_size, format, max_points_per_series)
+        else:
+            try:
+                result = await run_flux_query(rewrite["query"], page_size, format, max_points_per_series)
+                # The result may be a cache entry or shared with concurrent callers
+                result = {**result, "rewrite": rewrite}
+            except Exception as e:
+                # The original query is estimated above the row limit when the rewrite fitted it
+                if fitted or not is_query_error(e):
+                    raise
+                # e.g. a mean over string fields, the original query may still succeed
+                logger.warning(f"Rewritten query failed, running the original query: {e}")
+                result = await run_flux_query(query, page_size, format, max_points_per_series)
+        if estimate:
+            result = {**result, "estimate": estimate}
+        return {"status": "success", "query": query, "format": format, **result}
+    except Exception as e:
+        note_error(e)
         logger.error(f"Failed to execute Flux query: {e}")
         return {"status": "error", "message": str(e), "query": query}
 
 
+def is_query_error(error: Optional[BaseException]) -> bool:
+    """Whether InfluxDB rejected a query with a client error, e.g. a Flux compile or runtime error."""
+    while error is not None:
+        if isinstance(error, ApiException):
+            return error.status is not None and 400 <= error.status < 500 and error.status != 429
+        # Managers raise RuntimeError while handling the ApiException
+        error = error.__cause__ or error.__context__
+    return False
+
+
+async def estimate_before_execution(query: str) -> Optional[Dict[str, Any]]:
+    """Estimate a query when estimated rows are limited; None when they are not or the query cannot be estimated."""
+    if not get_influxdb_manager().config.max_estimated_rows:
+        return None
+    try:
+        return cast(Dict[str, Any], await call_manager("estimate_query", query))
+    except Exception as e:
+        logger.info(f"Running query without a cost estimate: {e}")
+        return None
+
+
+async def run_flux_query(
+    query: str, page_size: Optional[int], format: str, max_points_per_series: Optional[int]
+) -> Dict[str, Any]:
+    """Run a Flux query downsampled, spooled, paged or in full, depending on the arguments and settings."""
+    manager = get_influxdb_manager()
+    if max_points_per_series:
+        result = await call_manager("execute_query_downsampled", query, max_points_per_series, format)
+        result = {"truncated": False, **result}
+        if format == "columnar" and not result["spooled"]:
+            result["table_count"] = len(result["data"])
+        return result
+
+    if not page_size and manager.spool_enabled:
+        return cast(Dict[str, Any], await call_manager("execute_query_spooled", query, format))
+
+    if page_size or manager.response_limited:
+        return cast(Dict[str, Any], await call_manager("execute_query_paged", query, page_size, format))
+
+    data = await call_manager("execute_query", query, format)
+    result = {"data": data, "record_count": len(data), "truncated": False}
+    if format == "columnar":
+        result["record_count"] = sum(table["record_count"] for table in data)
+        result["table_count"] = len(data)
+    return result
+
+
+@mcp.tool()
+@instrumented("tool")
+async def estimate_flux_query(query: str) -> Dict[str, Any]:
+    """Estimate the rows and bytes a Flux query would return, without running it. Use before a query over a long range
+    or many series.
+
+    Reads the bucket, range() and filters of a single from() |> range() pipeline and predicts, from the cached series
+    cardinality and sampled write rate of the queried series, the scanned_points, rows and bytes of the result. action
+    tells what execute_flux_query would do: "run" it, "aggregate" it in InfluxDB with the query in rewrite, or "reject"
+    it because it exceeds max_estimated_rows. Stages listed in unmodeled_stages are not accounted for, the estimate is
+    then the rows read by the first of them."""
+    try:
+        estimate = await call_manager("estimate_query", query)
+        result = {"status": "success", "query": query, **estimate}
+        try:
+            rewrite = get_influxdb_manager().enforce_estimate(query, estimate)
+            result["action"] = "aggregate" if rewrite else "run"
+            if rewrite:
+                result["rewrite"] = rewrite
+        except ValueError as e:
+            result["action"] = "reject"
+            result["message"] = str(e)
+        return result
+    except Exception as e:
+        note_error(e)
+        logger.error(f"Failed to estimate Flux query: {e}")
+        return {"status": "error", "message": str(e), "query": query}
+
+
+@mcp.tool()
+@instrumented("tool")
+async def fetch_query_page(cursor: str) -> Dict[str, Any]:
+    """Fetch the next page of a paged or truncated Flux query result using the next_cursor returned by
+    execute_flux_query or a previous fetch_query_page call. next_cursor is null on the last page."""
+    try:
+        page = await call_manager("fetch_page", cursor)
+        return {"status": "success", **page}
+    except Exception as e:
+        note_error(e)
+        logger.error(f"Failed to fetch query page: {e}")
+        return {"status": "error", "message": str(e), "cursor": cursor}
+
+
+@mcp.tool()
+@instrumented("tool")
+async def export_flux_query(query: str, compression: str = "zstd") -> Dict[str, Any]:
+    """Run a Flux query and write its complete result to Parquet files on the server instead of returning the rows. Use
+    for large extractions that exceed the response limits of execute_flux_query.
+
+    Returns the export's influxdb://exports/{export_id} resource URI, the local directory and, per Parquet file, its
+    resource URI, row count, size and column types. Columns are typed, tags are dictionary encoded. compression is one
+    of "zstd", "snappy", "gzip" or "none"."""
+    try:
+        export = await call_manager("export_query", query, compression)
+        uri = f"influxdb://exports/{export['export_id']}"
+        files = [{**file, "uri": f"{uri}/{file['name']}"} for file in export["files"]]
+        return {"status": "success", **export, "uri": uri, "files": files}
+    except Exception as e:
+        note_error(e)
+        logger.error(f"Failed to export Flux query: {e}")
+        return {"status": "error", "message": str(e), "query": query}
+
+
 # MCP Resources - Live Data Access and Dynamic Queries
 @mcp.resource(
     uri="influxdb://buckets",
@@ -154,15 +493,16 @@ def execute_flux_query(query: str) -> Dict[str, Any]:
     description="Live list of all available buckets in the InfluxDB instance with metadata",
     mime_type="application/json",
 )
-def get_buckets_resource() -> str:
+@instrumented("resource")
+async def get_buckets_resource() -> str:
     """Returns current list of available buckets as JSON."""
     try:
-        manager = get_influxdb_manager()
-        buckets = manager.list_buckets()
+        buckets = await call_manager("list_buckets")
         return json.dumps(
             {"buckets": buckets, "count": len(buckets), "timestamp": datetime.now().isoformat()}, indent=2
         )
     except Exception as e:
+        note_error(e)
         return json.dumps({"error": str(e), "timestamp": datetime.now().isoformat()})
 
 
@@ -172,11 +512,11 @@ def get_buckets_resource() -> str:
     description="Live list of measurements available in the specified bucket",
     mime_type="application/json",
 )
-def get_measurements_resource(bucket: str) -> str:
+@instrumented("resource")
+async def get_measurements_resource(bucket: str) -> str:
     """Returns current measurements in the specified bucket."""
     try:
-        manager = get_influxdb_manager()
-        measurements = manager.list_measurements(bucket)
+        measurements = await call_manager("list_measurements", bucket)
         return json.dumps(
             {
                 "bucket": bucket,
@@ -187,6 +527,7 @@ def get_measurements_resource(bucket: str) -> str:
             indent=2,
         )
     except Exception as e:
+        note_error(e)
         return json.dumps({"error": str(e), "bucket": bucket, "timestamp": datetime.now().isoformat()})
 
 
@@ -196,11 +537,11 @@ def get_measurements_resource(bucket: str) -> str:
     description="Current connection status and server information",
     mime_type="application/json",
 )
-def get_status_resource() -> str:
+@instrumented("resource")
+async def get_status_resource() -> str:
     """Returns current InfluxDB connection status and server info."""
     try:
-        manager = get_influxdb_manager()
-        status = manager.test_connection()
+        status = await call_manager("test_connection")
         config = get_config()
         return json.dumps(
             {
@@ -211,15 +552,62 @@ def get_status_resource() -> str:
             indent=2,
         )
     except Exception as e:
+        note_error(e)
         return json.dumps({"error": str(e), "timestamp": datetime.now().isoformat()})
 
 
+@mcp.resource(
+    uri="influxdb://results/{result_id}/{page}",
+    name="Spooled Query Result Page",
+    description="Page of a large query result spooled by execute_flux_query, with a link to the next page",
+    mime_type="application/json",
+)
+@instrumented("resource")
+async def get_result_page_resource(result_id: str, page: str) -> str:
+    """Returns a page of a spooled query result."""
+    try:
+        return cast(str, await call_manager("spooled_page", result_id, int(page)))
+    except Exception as e:
+        note_error(e)
+        return json.dumps({"error": str(e), "result_id": result_id, "page": page})
+
+
+@mcp.resource(
+    uri="influxdb://exports/{export_id}",
+    name="Query Export",
+    description="Manifest of a query result exported by export_flux_query: its Parquet files, rows and columns",
+    mime_type="application/json",
+)
+@instrumented("resource")
+async def get_export_resource(export_id: str) -> str:
+    """Returns the manifest of an export."""
+    try:
+        manifest = await call_manager("export_manifest", export_id)
+        return json.dumps(manifest, indent=2)
+    except Exception as e:
+        note_error(e)
+        return json.dumps({"error": str(e), "export_id": export_id})
+
+
+@mcp.resource(
+    uri="influxdb://exports/{export_id}/{name}",
+    name="Query Export File",
+    description="Parquet file of a query result exported by export_flux_query",
+    mime_type="application/vnd.apache.parquet",
+)
+@instrumented("resource")
+async def get_export_file_resource(export_id: str, name: str) -> bytes:
+    """Returns the content of a Parquet file of an export."""
+    return cast(bytes, await call_manager("export_file", export_id, name))
+
+
 @mcp.resource(
     uri="flux://templates/daily-hourly-average/{bucket}/{measurement}/{field}",
     name="Daily Hourly Average Query Template",
     description="Flux query template for hourly averages over the last day",
     mime_type="text/plain",
 )
+@instrumented("resource")
 def get_daily_hourly_average_query(bucket: str, measurement: str, field: str) -> str:
     """Returns a ready-to-execute Flux query for daily hourly averages."""
     return f"""// Query: Last 1 day of data with hourly averages
@@ -240,6 +628,7 @@ from(bucket: "{bucket}")
     description="Flux query template for weekly data with daily summaries (min, max, mean)",
     mime_type="text/plain",
 )
+@instrumented("resource")
 def get_weekly_daily_summary_query(bucket: str, measurement: str, field: str) -> str:
     """Returns a ready-to-execute Flux query for weekly summaries."""
     return f"""// Query: Last 7 days with daily min/max/mean summaries
@@ -268,6 +657,7 @@ union(tables: [
     description="Flux query template for retrieving recent data with configurable time range",
     mime_type="text/plain",
 )
+@instrumented("resource")
 def get_recent_data_query(bucket: str, measurement: str, field: str, duration: str = "1h") -> str:
     """Returns a ready-to-execute Flux query for recent data."""
     return f"""// Query: Recent data for the last {duration}
@@ -288,6 +678,7 @@ from(bucket: "{bucket}")
     description="Flux query template for monitoring values that exceed a specific threshold",
     mime_type="text/plain",
 )
+@instrumented("resource")
 def get_threshold_alert_query(bucket: str, measurement: str, field: str, threshold: str) -> str:
     """Returns a ready-to-execute Flux query for threshold monitoring."""
     try:
@@ -320,6 +711,7 @@ from(bucket: "{bucket}")
     description="Flux query template to detect statistical anomalies using standard deviation",
     mime_type="text/plain",
 )
+@instrumented("resource")
 def get_anomaly_detection_query(
     bucket: str = "YOUR_BUCKET", measurement: str = "YOUR_MEASUREMENT", field: str = "YOUR_FIELD"
 ) -> str:
@@ -381,6 +773,7 @@ data
     description="Flux query template to analyze correlation between two measurements",
     mime_type="text/plain",
 )
+@instrumented("resource")
 def get_correlation_analysis_query(bucket: str, measurement1: str, field1: str, measurement2: str, field2: str) -> str:
     """Returns a ready-to-execute Flux query for correlation analysis."""
     return f"""// Query: Analyze correlation between two measurements
@@ -415,19 +808,52 @@ join.time(left: measurement1, right: measurement2)
   |> yield(name: "correlation")"""
 
 
+async def serve() -> None:
+    """Run the MCP server on the configured transport, probing InfluxDB health in the background from the start.
+
+    The prober is started before the first request, so the health endpoints never call InfluxDB themselves.
+    """
+    if MCP_TRANSPORT != "stdio":
+        health_prober.ensure_started()
+    try:
+        if MCP_TRANSPORT == "stdio":
+            await mcp.run_stdio_async()
+        elif MCP_TRANSPORT == "sse":
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_streamable_http_async()
+    finally:
+        await health_prober.stop()
+
+
+async def check_connection(manager: AsyncInfluxDBManager) -> Dict[str, Any]:
+    """Test the connection outside of the server event loop, closing the client afterwards."""
+    try:
+        return await manager.test_connection()
+    finally:
+        await manager.disconnect()
+
+
 def main():
     """Main entry point for the MCP server."""
     try:
         logger.info("Starting InfluxDB MCP server...")
+        setup_tracing(MCP_TRACING, MCP_TRACING_FILE)
 
         # Test configuration and connection on startup
         try:
             config = get_config()
             logger.info(f"Connecting to InfluxDB at {config.url}")
 
-            # Test connection
+            # Serve schema discovered before the restart while it is revalidated
             manager = get_influxdb_manager()
-            connection_status = manager.test_connection()
+            manager.load_schema_catalog()
+
+            # Test connection
+            if isinstance(manager, AsyncInfluxDBManager):
+                connection_status = asyncio.run(check_connection(manager))
+            else:
+                connection_status = manager.test_connection()
 
             if connection_status["status"] == "connected":
                 logger.info("InfluxDB connection successful")
@@ -439,7 +865,7 @@ def main():
             logger.warning("Server will start but InfluxDB operations may fail")
 
         # Start the FastMCP server
-        mcp.run(transport=MCP_TRANSPORT)  # type: ignore
+        asyncio.run(serve())
 
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
@@ -449,8 +875,17 @@ def main():
     finally:
         # Clean up
         global influxdb_manager
-        if influxdb_manager:
-            influxdb_manager.disconnect()
+        if isinstance(influxdb_manager, AsyncInfluxDBManager):
+            try:
+                asyncio.run(influxdb_manager.disconnect())
+            except Exception as e:
+                # The client may be bound to the server event loop that has already stopped
+                logger.debug(f"Failed to close InfluxDB client: {e}")
+            influxdb_manager.schema_cache.close()
+        elif influxdb_manager:
+            influxdb_manager.close()
+        if worker_pool is not None:
+            worker_pool.shutdown()
 
 
 if __name__ == "__main__":
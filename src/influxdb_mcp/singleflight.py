@@ -0,0 +1,83 @@
+"""
+Single-flight execution: concurrent identical calls share one upstream execution.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution, for blocking callers.
+
+    The first caller of a key runs the function; callers arriving while it is
+    running wait for it and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.collapsed = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run `fn` unless a call with `key` is in flight; return its result and whether it was shared."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+                self.executions += 1
+            else:
+                self.collapsed += 1
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of calls in flight, upstream executions and collapsed calls."""
+        with self._lock:
+            return {"in_flight": len(self._calls), "executions": self.executions, "collapsed": self.collapsed}
+
+
+class AsyncSingleFlight:
+    """Asyncio variant of `SingleFlight`.
+
+    The shared execution runs as its own task, so a caller being cancelled does
+    not cancel the execution the other callers are waiting for.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.executions = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Await `fn` unless a call with `key` is in flight; return its result and whether it was shared."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.executions += 1
+        else:
+            self.collapsed += 1
+        result: T = await asyncio.shield(task)
+        return result, shared
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of calls in flight, upstream executions and collapsed calls."""
+        return {"in_flight": len(self._calls), "executions": self.executions, "collapsed": self.collapsed}
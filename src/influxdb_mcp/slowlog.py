@@ -0,0 +1,100 @@
+"""
+Slow query log with optional Flux profiler capture.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .flux import normalize_query
+from .results import json_value
+
+# Slow queries are logged as one JSON document per line to this logger
+logger = logging.getLogger("influxdb_mcp.slow_queries")
+
+# Flux profilers enabled when a slow query is re-run
+PROFILERS = ["query", "operator"]
+
+# Seconds before the same slow query is profiled again
+PROFILE_COOLDOWN = 600
+
+# Profiler record columns that only describe the profiler table itself
+PROFILER_META_COLUMNS = ("result", "table", "_measurement")
+
+
+class SlowQueryLog:
+    """Logs queries slower than a threshold and decides which ones to profile.
+
+    Profiling re-runs the query with the Flux `profiler` package enabled, which
+    executes it a second time, so each distinct query is profiled at most once
+    per `PROFILE_COOLDOWN` seconds.
+    """
+
+    def __init__(self, threshold_ms: int, profile: bool):
+        self.threshold_ms = threshold_ms
+        self.profile = profile
+        self._profiled: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return self.enabled and duration_ms >= self.threshold_ms
+
+    def record(self, query: str, mode: str, duration_ms: float, rows: int, size: int, result_format: str) -> bool:
+        """Log a slow query; return whether it should be profiled."""
+        entry = {
+            "event": "slow_query",
+            "query": query,
+            "mode": mode,
+            "format": result_format,
+            "duration_ms": round(duration_ms, 3),
+            "threshold_ms": self.threshold_ms,
+            "rows": rows,
+            "bytes": size,
+        }
+        logger.warning(json.dumps(entry))
+        return self.profile and self._claim(query)
+
+    def log_profile(self, query: str, records: List[Any], duration_ms: float, error: Optional[str] = None) -> None:
+        """Log the `profiler/query` and `profiler/operator` records of a profiled re-run."""
+        entry: Dict[str, Any] = {
+            "event": "slow_query_profile",
+            "query": query,
+            "duration_ms": round(duration_ms, 3),
+        }
+        if error is not None:
+            entry["error"] = error
+        else:
+            entry.update(profile_summary(records))
+        logger.warning(json.dumps(entry))
+
+    def _claim(self, query: str) -> bool:
+        """Whether the query has not been profiled within the cooldown, claiming it if so."""
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            self._profiled = {k: at for k, at in self._profiled.items() if now - at < PROFILE_COOLDOWN}
+            if key in self._profiled:
+                return False
+            self._profiled[key] = now
+            return True
+
+
+def profile_summary(records: List[Any]) -> Dict[str, Any]:
+    """Split profiler records into the query profile and operators sorted by total duration."""
+    query_profile: Dict[str, Any] = {}
+    operators: List[Dict[str, Any]] = []
+    for record in records:
+        values = {name: json_value(value) for name, value in record.values.items() if name not in PROFILER_META_COLUMNS}
+        measurement = record.values.get("_measurement")
+        if measurement == "profiler/query":
+            query_profile = values
+        elif measurement == "profiler/operator":
+            operators.append(values)
+    operators.sort(key=lambda operator: operator.get("DurationSum") or 0, reverse=True)
+    return {"profile": query_profile, "operators": operators}
@@ -0,0 +1,271 @@
+"""
+Spool of large query results, written to disk as compressed JSON pages.
+
+Results larger than the spool threshold are not inlined in the response of
+`execute_flux_query`. Their rows are written in pages of a fixed number of
+records, each a gzip compressed JSON document served as is by the
+`influxdb://results/{result_id}/{page}` resource. Results are removed once
+their TTL has passed, and the oldest ones first when the spool exceeds its
+disk quota. Parquet exports share the TTL and quota of the results.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from .results import rows_to_columnar
+
+logger = logging.getLogger(__name__)
+
+RESULT_URI = "influxdb://results/{result_id}/{page}"
+
+MANIFEST = "manifest.json"
+
+RESULT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Fast gzip level, JSON pages of repetitive rows still compress about 10 to 1
+COMPRESS_LEVEL = 1
+
+
+def result_uri(result_id: str, page: int) -> str:
+    return RESULT_URI.format(result_id=result_id, page=page)
+
+
+class SpooledResult:
+    """A query result being written to the spool, one compressed page at a time."""
+
+    def __init__(self, spool: "ResultSpool", result_id: str, query: str, result_format: str):
+        self.spool = spool
+        self.id = result_id
+        self.query = query
+        self.result_format = result_format
+        self.directory = os.path.join(spool.directory, result_id)
+        self.pages = 0
+        self.records = 0
+        self.bytes = 0
+        self.stored_bytes = 0
+        self.columns: Dict[str, None] = {}
+        self._rows: List[Dict[str, Any]] = []
+        os.makedirs(self.directory)
+
+    def append(self, row: Dict[str, Any]) -> bool:
+        """Add a row, returning whether a full page is ready to be written with `write_page`."""
+        self._rows.append(row)
+        return len(self._rows) > self.spool.page_rows
+
+    def write_page(self) -> None:
+        """Compress and write the next page of buffered rows."""
+        rows = self._rows[: self.spool.page_rows]
+        self._rows = self._rows[self.spool.page_rows :]
+        page = self.pages + 1
+        self.columns.update(dict.fromkeys(rows[0]))
+        document = {
+            "result_id": self.id,
+            "page": page,
+            "first_record": self.records + 1,
+            "record_count": len(rows),
+            "data": rows_to_columnar(rows) if self.result_format == "columnar" else rows,
+            "next_page": result_uri(self.id, page + 1) if self._rows else None,
+        }
+        encoded = json.dumps(document, separators=(",", ":")).encode()
+        compressed = gzip.compress(encoded, compresslevel=COMPRESS_LEVEL)
+        self.spool.reserve(len(compressed))
+        with open(os.path.join(self.directory, f"{page:06d}.json.gz"), "wb") as f:
+            f.write(compressed)
+        self.pages = page
+        self.records += len(rows)
+        self.bytes += len(encoded)
+        self.stored_bytes += len(compressed)
+
+    def close(self) -> Dict[str, Any]:
+        """Write the remaining rows and the manifest, returning the manifest."""
+        while self._rows:
+            self.write_page()
+        created = time.time()
+        manifest = {
+            "result_id": self.id,
+            "query": self.query,
+            "format": self.result_format,
+            "pages": self.pages,
+            "page_rows": self.spool.page_rows,
+            "record_count": self.records,
+            "columns": list(self.columns),
+            "bytes": self.bytes,
+            "stored_bytes": self.stored_bytes,
+            "created": datetime.fromtimestamp(created, timezone.utc).isoformat(),
+            "expires": created + self.spool.ttl,
+        }
+        with open(os.path.join(self.directory, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        self.spool.finish(self.id)
+        logger.info(
+            f"Spooled {self.records} rows in {self.pages} pages ({self.stored_bytes} bytes) to {self.directory}"
+        )
+        return manifest
+
+    def abort(self) -> None:
+        """Remove the incomplete result."""
+        self.spool.finish(self.id)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ResultSpool:
+    """Directory of spooled query results, removed after `ttl` seconds or when over `max_bytes`.
+
+    The exports in `exports_directory` are collected with the results and
+    count against the same disk quota.
+    """
+
+    def __init__(
+        self, directory: str, ttl: float, max_bytes: int, page_rows: int, exports_directory: Optional[str] = None
+    ):
+        self.directory = directory
+        self.exports_directory = exports_directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.page_rows = page_rows
+        # Ids of the results and exports being written, which are not collected
+        self._writing: Set[str] = set()
+        self._used: Optional[int] = None
+        self._results = 0
+        self._removed = 0
+        self._lock = threading.Lock()
+
+    def create(self, query: str, result_format: str) -> SpooledResult:
+        """Start writing a new spooled result, first removing expired ones."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.collect()
+        result = SpooledResult(self, secrets.token_hex(16), query, result_format)
+        with self._lock:
+            self._writing.add(result.id)
+        return result
+
+    def begin_export(self, export_id: str) -> None:
+        """Protect an export being written from collection, first removing expired results and exports."""
+        self.collect()
+        with self._lock:
+            self._writing.add(export_id)
+
+    def commit_export(self, export_id: str) -> None:
+        """Evict the oldest results and exports until a written export fits the disk quota, or raise RuntimeError."""
+        try:
+            used = self.collect()
+            if self.max_bytes and used > self.max_bytes:
+                raise RuntimeError(f"Export exceeds the spool disk quota of {self.max_bytes} bytes, narrow the query")
+        finally:
+            self.finish(export_id)
+
+    def finish(self, entry_id: str) -> None:
+        """Stop protecting a result or export from collection, once written or removed."""
+        with self._lock:
+            self._writing.discard(entry_id)
+
+    def reserve(self, size: int) -> None:
+        """Account for `size` more bytes, evicting the oldest results to stay within the disk quota."""
+        with self._lock:
+            if self._used is not None:
+                self._used += size
+                if not self.max_bytes or self._used <= self.max_bytes:
+                    return
+        if self.collect(size) + size > self.max_bytes > 0:
+            raise RuntimeError(
+                f"Result exceeds the spool disk quota of {self.max_bytes} bytes, "
+                "narrow the query or use export_flux_query"
+            )
+        with self._lock:
+            self._used = (self._used or 0) + size
+
+    def collect(self, reserve: int = 0) -> int:
+        """Remove expired results and exports, then the oldest ones until `reserve` more bytes fit.
+
+        Returns the bytes in use.
+        """
+        now = time.time()
+        removable = []
+        used = 0
+        results = 0
+        with self._lock:
+            entries: List[os.DirEntry[str]] = []
+            for directory in filter(None, (self.directory, self.exports_directory)):
+                try:
+                    entries.extend(os.scandir(directory))
+                except FileNotFoundError:
+                    continue
+            for entry in entries:
+                if not RESULT_ID_RE.match(entry.name):
+                    continue
+                try:
+                    size = sum(file.stat().st_size for file in os.scandir(entry.path))
+                    modified = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if entry.name in self._writing:
+                    used += size
+                elif now - modified > self.ttl:
+                    self._remove(entry.path)
+                else:
+                    removable.append((modified, entry.path, size))
+                    used += size
+                    results += 1
+            removable.sort()
+            while removable and self.max_bytes and used + reserve > self.max_bytes:
+                _, path, size = removable.pop(0)
+                self._remove(path)
+                used -= size
+                results -= 1
+            self._used = used
+            self._results = results
+        return used
+
+    def _remove(self, path: str) -> None:
+        logger.debug(f"Removing spooled result or export {path}")
+        shutil.rmtree(path, ignore_errors=True)
+        self._removed += 1
+
+    def _result_directory(self, result_id: str) -> str:
+        if not RESULT_ID_RE.match(result_id):
+            raise ValueError(f"Invalid result id '{result_id}'")
+        return os.path.join(self.directory, result_id)
+
+    def manifest(self, result_id: str) -> Dict[str, Any]:
+        """Manifest of a complete spooled result that has not expired."""
+        try:
+            with open(os.path.join(self._result_directory(result_id), MANIFEST), encoding="utf-8") as f:
+                manifest: Optional[Dict[str, Any]] = json.load(f)
+        except FileNotFoundError:
+            manifest = None
+        if manifest is None or manifest["expires"] < time.time():
+            raise ValueError(f"Spooled result '{result_id}' not found or expired, re-run the query")
+        return manifest
+
+    def read_page(self, result_id: str, page: int) -> str:
+        """JSON document of a page of a spooled result."""
+        manifest = self.manifest(result_id)
+        if not 1 <= page <= manifest["pages"]:
+            raise ValueError(f"Spooled result '{result_id}' has pages 1 to {manifest['pages']}")
+        path = os.path.join(self._result_directory(result_id), f"{page:06d}.json.gz")
+        try:
+            with gzip.open(path, "rb") as f:
+                return f.read().decode()
+        except FileNotFoundError:
+            raise ValueError(f"Spooled result '{result_id}' not found or expired, re-run the query")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the spooled results and bytes as of the last collection, and settings."""
+        with self._lock:
+            return {
+                "results": self._results,
+                "writing": len(self._writing),
+                "bytes": self._used or 0,
+                "removed": self._removed,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl,
+            }
@@ -0,0 +1,81 @@
+"""
+Optional OpenTelemetry tracing.
+
+Spans are only recorded after `setup_tracing` installed an exporter, which
+requires the `tracing` extra; otherwise `span` returns a shared no-op context
+manager and tracing costs nothing.
+"""
+
+import contextlib
+import logging
+from typing import Any, ContextManager, Dict, Optional, Sequence, cast
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+except ImportError:  # pragma: no cover - tracing extra not installed
+    trace = None  # type: ignore[assignment]
+    SpanExporter = object  # type: ignore[assignment,misc]
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTERS = ("none", "otlp", "file")
+
+_NO_SPAN: ContextManager[Any] = contextlib.nullcontext()
+_tracer: Optional[Any] = None
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> ContextManager[Any]:
+    """Start a span as a child of the current one, usable around `await` as well."""
+    if _tracer is None:
+        return _NO_SPAN
+    return cast(ContextManager[Any], _tracer.start_as_current_span(name, attributes=attributes))
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends finished spans to a file as JSON lines, opened only while a batch is written."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def export(self, spans: Sequence[Any]) -> "SpanExportResult":
+        try:
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.writelines(finished.to_json(indent=None) + "\n" for finished in spans)
+        except OSError as e:
+            logger.warning(f"Failed to write spans to {self.file_path}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+
+def setup_tracing(exporter: str, file_path: str, service_name: str = "influxdb-mcp") -> bool:
+    """Install a tracer provider exporting spans over OTLP or to a JSON lines file; return whether tracing is on.
+
+    The OTLP exporter is configured by the standard `OTEL_EXPORTER_OTLP_*`
+    environment variables and defaults to a collector on localhost:4318.
+    """
+    global _tracer
+    if exporter == "none":
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        span_exporter: SpanExporter
+        if exporter == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            span_exporter = OTLPSpanExporter()
+        else:
+            span_exporter = FileSpanExporter(file_path)
+    except ImportError as e:
+        logger.warning(f"Tracing disabled, install the 'tracing' extra to export spans: {e}")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("influxdb_mcp")
+    logger.info(f"Exporting traces to {'OTLP collector' if exporter == 'otlp' else file_path}")
+    return True
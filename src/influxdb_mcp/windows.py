@@ -0,0 +1,249 @@
+"""
+Incremental cache of aggregated windows for sliding relative-range queries.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import LRUCache
+from .flux import format_time, normalize_query, parse_duration, split_pipeline, stage_call
+from .results import json_value, row_size, tables_to_records
+
+logger = logging.getLogger(__name__)
+
+# Stages that only filter or reshape rows and may appear between range() and aggregateWindow()
+ROW_STAGES = ("filter", "keep", "drop")
+
+# aggregateWindow() arguments that do not change how windows are aligned and labeled
+WINDOW_ARGUMENTS = ("every", "fn", "createEmpty", "column")
+
+# Group key of a series as (label, value) pairs, without the _start and _stop bounds
+SeriesKey = Tuple[Tuple[str, Any], ...]
+
+
+@dataclass
+class WindowQuery:
+    """A sliding `from |> range(start: -L) |> ... |> aggregateWindow(every: E)` query."""
+
+    stages: List[str]
+    range_index: int
+    lookback: float
+    every: float
+
+    def with_range(self, start: datetime, stop: datetime) -> str:
+        """The query with its relative range replaced by fixed bounds."""
+        stages = list(self.stages)
+        stages[self.range_index] = f"range(start:{format_time(start)},stop:{format_time(stop)})"
+        return "|>".join(stages)
+
+
+@dataclass
+class WindowedSeries:
+    """Aggregated windows of a query, per series, keyed by window time."""
+
+    every: float
+    covered_from: datetime
+    covered_until: datetime
+    series: Dict[SeriesKey, Dict[datetime, Dict[str, Any]]] = field(default_factory=dict)
+
+
+@dataclass
+class WindowPlan:
+    """The sub-queries needed to answer a sliding query at `now`, given the cached windows."""
+
+    key: Tuple[str, str]
+    window: WindowQuery
+    now: datetime
+    start: datetime
+    aligned_start: datetime
+    aligned_stop: datetime
+    cached: Optional[WindowedSeries]
+    cached_at: Optional[float]
+    queries: List[str]
+
+
+def parse_window_query(query: str) -> Optional[WindowQuery]:
+    """Recognize a sliding aggregateWindow query whose complete windows can be cached.
+
+    Only a single pipeline of `from()`, a `range()` relative to now, row
+    filters, one `aggregateWindow(createEmpty: false)` with a fixed `every`
+    and an optional `yield()` qualifies; anything else may depend on rows
+    outside a window and is executed as is.
+    """
+    stages = split_pipeline(normalize_query(query))
+    calls = [stage_call(stage) for stage in stages]
+    if len(stages) < 3 or any(call is None for call in calls):
+        return None
+    names = [call[0] for call in calls]  # type: ignore[index]
+    if names[0] != "from" or names[1] != "range":
+        return None
+    if names[-1] == "yield":
+        names = names[:-1]
+    if names[-1] != "aggregateWindow" or any(name not in ROW_STAGES for name in names[2:-1]):
+        return None
+
+    range_arguments = calls[1][1]  # type: ignore[index]
+    lookback = parse_duration(range_arguments.get("start", ""))
+    if lookback is None or lookback >= 0 or range_arguments.get("stop", "now()") != "now()":
+        return None
+
+    window_arguments = calls[len(names) - 1][1]  # type: ignore[index]
+    every_text = window_arguments.get("every", "")
+    every = parse_duration(every_text)
+    if (
+        every is None
+        or every <= 0
+        or "mo" in every_text
+        or "y" in every_text
+        or window_arguments.get("createEmpty") != "false"
+        or any(name not in WINDOW_ARGUMENTS for name in window_arguments)
+    ):
+        return None
+    return WindowQuery(stages=stages, range_index=1, lookback=-lookback, every=every)
+
+
+def _align(value: datetime, every: float, up: bool) -> datetime:
+    """Align a time to a multiple of `every` seconds since the epoch, like aggregateWindow does."""
+    seconds = value.timestamp() / every
+    return datetime.fromtimestamp((math.ceil(seconds) if up else math.floor(seconds)) * every, tz=timezone.utc)
+
+
+class WindowCache:
+    """Caches complete aggregateWindow windows of sliding relative-range queries.
+
+    A query like `range(start: -1d) |> aggregateWindow(every: 1h)` re-run a few
+    minutes later shares all complete windows with the previous run. Only the
+    partial window at the head of the range and the windows after the last
+    cached one are queried; the last, still open window is never cached. The
+    windows are stitched per series and `_start`/`_stop` are rewritten to the
+    bounds of the current range. Windows are cached for at most `ttl` seconds,
+    which bounds how long late-arriving points in a cached window go unseen.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self._cache = LRUCache(max_bytes)
+        self.incremental = 0
+        self.full = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self._cache.max_bytes > 0
+
+    def plan(self, org: str, query: str, now: Optional[datetime] = None) -> Optional[WindowPlan]:
+        """Plan the sub-queries of a cacheable sliding query run at `now`, or return None for other queries."""
+        if not self.enabled:
+            return None
+        window = parse_window_query(query)
+        if window is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        start = now - timedelta(seconds=window.lookback)
+        aligned_start = _align(start, window.every, up=True)
+        aligned_stop = _align(now, window.every, up=False)
+        if aligned_stop <= aligned_start:
+            # No complete window in the range
+            return None
+
+        key = (org, "|>".join(window.stages))
+        entry = self._cache.get(key)
+        cached: Optional[WindowedSeries] = None
+        cached_at: Optional[float] = None
+        if entry is not None and not entry.expired:
+            candidate: WindowedSeries = entry.value
+            if candidate.covered_from <= aligned_start <= candidate.covered_until:
+                cached, cached_at = candidate, entry.stored_at
+
+        if cached is None:
+            queries = [window.with_range(start, now)]
+        else:
+            queries = []
+            if start < aligned_start:
+                queries.append(window.with_range(start, aligned_start))
+            if cached.covered_until < now:
+                queries.append(window.with_range(cached.covered_until, now))
+        return WindowPlan(key, window, now, start, aligned_start, aligned_stop, cached, cached_at, queries)
+
+    def complete(self, plan: WindowPlan, results: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Stitch the sub-query results with the cached windows into records and update the cache."""
+        fetched: Dict[SeriesKey, Dict[datetime, Dict[str, Any]]] = {}
+        for tables in results:
+            for key, windows in _series_windows(tables).items():
+                fetched.setdefault(key, {}).update(windows)
+
+        stitched: Dict[SeriesKey, Dict[datetime, Dict[str, Any]]] = {}
+        if plan.cached is not None:
+            self.incremental += 1
+            for key, windows in plan.cached.series.items():
+                kept = {
+                    time: row for time, row in windows.items() if plan.aligned_start < time <= plan.cached.covered_until
+                }
+                if kept:
+                    stitched[key] = kept
+        else:
+            self.full += 1
+        for key, windows in fetched.items():
+            stitched.setdefault(key, {}).update(windows)
+
+        self._store(plan, stitched)
+
+        bounds = {"_start": json_value(plan.start), "_stop": json_value(plan.now)}
+        records: List[Dict[str, Any]] = []
+        for table, windows in enumerate(stitched.values()):
+            for time in sorted(windows):
+                records.append({**windows[time], **bounds, "table": table})
+        logger.debug(
+            f"Window cache {'hit' if plan.cached else 'miss'}: {len(plan.queries)} sub-queries, {len(records)} rows"
+        )
+        return records
+
+    def clear(self) -> None:
+        """Drop all cached windows."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and incremental/full execution counters."""
+        return {
+            **self._cache.stats(),
+            "incremental": self.incremental,
+            "full": self.full,
+            "ttl_s": self.ttl,
+        }
+
+    def _store(self, plan: WindowPlan, stitched: Dict[SeriesKey, Dict[datetime, Dict[str, Any]]]) -> None:
+        """Cache the complete windows of the current range, keeping the age of reused windows."""
+        complete: Dict[SeriesKey, Dict[datetime, Dict[str, Any]]] = {}
+        size = 0
+        for key, windows in stitched.items():
+            kept = {time: row for time, row in windows.items() if plan.aligned_start < time <= plan.aligned_stop}
+            if kept:
+                complete[key] = kept
+                size += sum(row_size(row) for row in kept.values())
+        entry = WindowedSeries(
+            every=plan.window.every,
+            covered_from=plan.aligned_start,
+            covered_until=plan.aligned_stop,
+            series=complete,
+        )
+        # Windows reused from the cache keep their original expiry
+        self._cache.put(plan.key, entry, self.ttl, size=size, stored_at=plan.cached_at)
+
+
+def _series_windows(tables: Any) -> Dict[SeriesKey, Dict[datetime, Dict[str, Any]]]:
+    """Convert the tables of a sub-query into records keyed by series and window time."""
+    series: Dict[SeriesKey, Dict[datetime, Dict[str, Any]]] = {}
+    for table in tables or []:
+        if not table.records:
+            continue
+        labels = [column.label for column in table.columns if column.group and column.label not in ("_start", "_stop")]
+        first = table.records[0].values
+        key = tuple((label, json_value(first.get(label))) for label in labels)
+        times = [record.values.get("_time") for record in table.records]
+        windows = series.setdefault(key, {})
+        for time, row in zip(times, tables_to_records([table])):
+            if isinstance(time, datetime):
+                windows[time] = row
+    return series
@@ -0,0 +1,96 @@
+"""
+Worker thread pool for running blocking InfluxDB calls off the event loop.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class ServerBusyError(RuntimeError):
+    """Raised when the worker pool queue is full and a call is rejected."""
+
+
+class WorkerPool:
+    """Bounded thread pool with queue-depth accounting and admission control.
+
+    At most `max_workers` calls run at the same time and at most `max_queue`
+    further calls wait for a free worker; calls beyond that are rejected
+    immediately with `ServerBusyError` instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-worker")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking callable in the pool and await its result."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ServerBusyError(
+                    f"Server busy: {self._pending} requests in progress or queued, please retry later"
+                )
+            self._pending += 1
+
+        def call() -> T:
+            with self._lock:
+                self._active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        # Run in a copy of the caller's context, like asyncio.to_thread, so trace spans and metrics follow the call
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, call)
+        except RuntimeError:
+            # The pool was shut down
+            with self._lock:
+                self._pending -= 1
+            raise
+        # Accounted when the thread finishes rather than when the caller stops waiting, which may be earlier on
+        # cancellation while the call still occupies a worker
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future: Future) -> None:
+        """Release the queue slot of a call that finished, failed or was cancelled before it started."""
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool size, queue depth and call counters."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,75 @@
+"""Fixtures running the InfluxDB managers against the fake InfluxDB server."""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from influxdb_mcp import server
+from influxdb_mcp.config import InfluxDBConfig
+from influxdb_mcp.fake_influxdb import Dataset, FakeInfluxDB, FakeInfluxDBServer
+from influxdb_mcp.influxdb_client import InfluxDBManager
+from influxdb_mcp.influxdb_client_async import AsyncInfluxDBManager
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Two measurements of 4 series with 2 fields, one point per minute
+DATASET = Dataset(buckets=["telegraf"], measurements=2, series=4, fields=2, interval=60)
+
+# One field of 4 series over a day: 4 tables of 1440 points
+QUERY = """
+from(bucket: "telegraf")
+  |> range(start: -1d)
+  |> filter(fn: (r) => r._measurement == "measurement_0000" and r._field == "field_0")
+"""
+QUERY_ROWS = 4 * 1440
+
+
+@pytest.fixture(scope="session")
+def fake_influxdb():
+    with FakeInfluxDBServer(FakeInfluxDB(DATASET, now=NOW)) as server:
+        yield server
+
+
+@pytest.fixture
+def make_config(fake_influxdb, tmp_path):
+    """Build a configuration of the fake server with the given settings."""
+
+    def make(**settings) -> InfluxDBConfig:
+        host, port = fake_influxdb.server_address[:2]
+        settings.setdefault("spool_dir", str(tmp_path / "spool"))
+        return InfluxDBConfig(host=host, port=port, token="token", org="org", **settings)
+
+    return make
+
+
+@pytest.fixture
+def make_manager(make_config):
+    """Build connected synchronous managers with the given settings, disconnected after the test."""
+    managers = []
+
+    def make(**settings) -> InfluxDBManager:
+        manager = InfluxDBManager(make_config(**settings))
+        manager.connect()
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.disconnect()
+
+
+@pytest.fixture
+def call_tools(make_config, monkeypatch):
+    """Run a coroutine calling the server tools, served by an asyncio manager with the given settings."""
+
+    def run(calls: Callable[[], Awaitable[Any]], **settings) -> Any:
+        async def serve() -> Any:
+            async with AsyncInfluxDBManager(make_config(**settings)) as manager:
+                monkeypatch.setattr(server, "influxdb_manager", manager)
+                return await calls()
+
+        return asyncio.run(serve())
+
+    return run
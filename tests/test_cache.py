@@ -0,0 +1,59 @@
+"""Tests of the schema cache and its persistent catalog."""
+
+import sqlite3
+import time
+
+import pytest
+
+from influxdb_mcp.cache import SchemaCache
+from influxdb_mcp.catalog import SchemaCatalog
+from influxdb_mcp.influxdb_client import InfluxDBManager
+
+
+def test_persisted_entries_are_loaded_stale_until_too_old(tmp_path):
+    catalog = SchemaCatalog(str(tmp_path / "catalog.db"))
+    catalog.save(("measurements", "org", "fresh"), ["cpu"])
+    catalog.save(("measurements", "org", "old"), ["mem"])
+    with catalog._lock, catalog._conn:
+        catalog._conn.execute("UPDATE schema_catalog SET saved_at = ? WHERE bucket = 'old'", (time.time() - 7200,))
+
+    cache = SchemaCache(ttl=60, stale_ttl=3600, max_bytes=1024 * 1024, store=catalog)
+    assert cache.load_persisted() == 1
+    assert [key for key, _, _ in catalog.load()] == [("measurements", "org", "fresh")]
+    value, info = cache.get(("measurements", "org", "fresh"), lambda: ["disk"])
+    assert (value, info["status"]) == (["cpu"], "stale")
+    value, info = cache.get(("measurements", "org", "old"), lambda: ["disk"])
+    assert (value, info["status"]) == (["disk"], "miss")
+
+
+def test_incomplete_values_are_not_cached():
+    cache = SchemaCache(ttl=60, stale_ttl=3600, max_bytes=1024 * 1024, cacheable=lambda value: "error" not in value)
+    assert cache.get("bucket", lambda: {"measurements": ["cpu"]})[1]["status"] == "miss"
+    # A failed refresh keeps serving the complete value
+    assert cache.refresh("bucket", lambda: {"error": "timeout"})[0] == {"error": "timeout"}
+    value, info = cache.get("bucket", lambda: {"error": "timeout"})
+    assert (value, info["status"]) == ({"measurements": ["cpu"]}, "hit")
+    cache.invalidate("bucket")
+    assert cache.get("bucket", lambda: {"error": "timeout"})[1]["status"] == "miss"
+    assert cache.get("bucket", lambda: {"error": "timeout"})[1]["status"] == "miss"
+
+
+def test_persisted_entries_of_other_orgs_are_kept(tmp_path):
+    catalog = SchemaCatalog(str(tmp_path / "catalog.db"))
+    catalog.save(("measurements", "org", "old"), ["cpu"])
+    catalog.save(("measurements", "other", "old"), ["mem"])
+    with catalog._lock, catalog._conn:
+        catalog._conn.execute("UPDATE schema_catalog SET saved_at = ?", (time.time() - 7200,))
+
+    cache = SchemaCache(ttl=60, stale_ttl=3600, max_bytes=1024 * 1024, store=catalog)
+    assert cache.load_persisted("org") == 0
+    assert [key for key, _, _ in catalog.load()] == [("measurements", "other", "old")]
+
+
+def test_closing_the_manager_closes_the_catalog(make_config, tmp_path):
+    with InfluxDBManager(make_config(schema_catalog_path=str(tmp_path / "catalog.db"))) as manager:
+        catalog = manager.schema_cache.store
+        assert catalog is not None
+        catalog.save(("buckets", "org", ""), [])
+    with pytest.raises(sqlite3.ProgrammingError):
+        catalog.load()
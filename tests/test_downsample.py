@@ -0,0 +1,52 @@
+"""Tests of the LTTB downsampling of query results."""
+
+import math
+
+import pytest
+from conftest import QUERY
+
+from influxdb_mcp import server
+from influxdb_mcp.downsample import _lttb_python, check_max_points, downsample_rows, lttb_indices, series_indices
+
+# A sine wave with a single spike
+X = list(range(1000))
+Y = [math.sin(x / 50) + (10 if x == 567 else 0) for x in X]
+
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    indices = lttb_indices(X, Y, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert indices == sorted(indices)
+    assert 567 in indices
+    assert lttb_indices(X[:10], Y[:10], 50) == list(range(10))
+
+
+def test_lttb_implementations_agree():
+    pytest.importorskip("numpy")
+    from influxdb_mcp.downsample import _lttb_numpy
+
+    assert _lttb_numpy(X, Y, 50) == _lttb_python(X, Y, 50)
+
+
+def test_values_that_are_not_numbers_are_sampled_evenly():
+    assert series_indices(X, [str(y) for y in Y], 5) == [0, 250, 500, 749, 999]
+    with pytest.raises(ValueError, match="at least 3"):
+        check_max_points(2)
+
+
+def test_every_table_is_downsampled_on_its_own():
+    rows = [{"result": "_result", "table": table, "_time": x, "_value": Y[x]} for table in range(3) for x in X[:100]]
+    kept, reduction = downsample_rows(rows[:-90], 20)
+    assert [sum(row["table"] == table for row in kept) for table in range(3)] == [20, 20, 10]
+    assert (reduction["series"], reduction["downsampled_series"]) == (3, 2)
+    assert (reduction["points_before"], reduction["points_after"]) == (210, 50)
+    assert reduction["reduction_ratio"] == 4.2
+
+
+def test_queries_that_cannot_be_rewritten_are_downsampled(call_tools):
+    query = QUERY + "  |> map(fn: (r) => ({r with _value: r._value * 2.0}))\n"
+    result = call_tools(lambda: server.execute_flux_query(query, max_points_per_series=100, format="columnar"))
+    assert "rewrite" not in result
+    assert result["downsampling"]["points_after"] == 4 * 100
+    assert [table["record_count"] for table in result["data"]] == [100] * 4
@@ -0,0 +1,63 @@
+"""Tests of the query cost estimates and their enforcement against the fake InfluxDB server."""
+
+import pytest
+from conftest import QUERY, QUERY_ROWS
+
+from influxdb_mcp import server
+
+# Not a raw query, so it cannot be rewritten to aggregate windows
+MAPPED_QUERY = QUERY + "  |> map(fn: (r) => ({r with _value: r._value * 2.0}))\n"
+
+
+def test_estimates_are_read_from_cached_statistics(make_manager):
+    manager = make_manager()
+    estimate = manager.estimate_query(QUERY)
+    assert (estimate["series"], estimate["rows"]) == (4, QUERY_ROWS)
+    assert estimate["cache"] == {"cardinality": "miss", "write_rate": "miss"}
+    assert manager.estimate_query(QUERY)["cache"] == {"cardinality": "hit", "write_rate": "hit"}
+    assert not estimate["exceeds_limit"]
+
+
+def test_raw_queries_over_the_limit_are_aggregated_to_fit(make_manager):
+    manager = make_manager(max_estimated_rows=1000)
+    estimate = manager.estimate_query(QUERY)
+    assert estimate["exceeds_limit"]
+    rewrite = manager.enforce_estimate(QUERY, estimate)
+    assert rewrite["every"] == "10m"
+    assert not manager.estimate_query(rewrite["query"])["exceeds_limit"]
+    assert len(manager.execute_query(rewrite["query"])) <= 1000
+
+
+@pytest.mark.parametrize(("query", "action"), [(MAPPED_QUERY, "aggregate"), (QUERY, "reject")], ids=["map", "reject"])
+def test_queries_that_cannot_be_aggregated_are_rejected(make_manager, query, action):
+    manager = make_manager(max_estimated_rows=1000, estimate_action=action)
+    with pytest.raises(ValueError, match="above the limit of 1000 rows"):
+        manager.enforce_estimate(query, manager.estimate_query(query))
+
+
+def test_executed_queries_are_estimated_after_the_rewrite(call_tools):
+    result = call_tools(lambda: server.execute_flux_query(QUERY, max_points_per_series=100), max_estimated_rows=1000)
+    assert result["status"] == "success"
+    assert result["rewrite"]["every"] == "15m"
+    assert not result["estimate"]["exceeds_limit"]
+    assert result["estimate"]["rows"] == 4 * 96
+
+
+def test_executed_queries_over_the_limit_are_aggregated_or_rejected(call_tools):
+    async def execute():
+        return [await server.execute_flux_query(QUERY), await server.execute_flux_query(MAPPED_QUERY)]
+
+    aggregated, rejected = call_tools(execute, max_estimated_rows=1000)
+    assert aggregated["rewrite"]["every"] == "10m"
+    assert aggregated["record_count"] <= 1000
+    assert rejected["status"] == "error"
+    assert "above the limit of 1000 rows" in rejected["message"]
+
+
+def test_estimate_tool_reports_the_action(call_tools):
+    async def estimate():
+        return [await server.estimate_flux_query(query) for query in (QUERY, MAPPED_QUERY)]
+
+    aggregated, rejected = call_tools(estimate, max_estimated_rows=1000)
+    assert (aggregated["action"], aggregated["rewrite"]["every"]) == ("aggregate", "10m")
+    assert rejected["action"] == "reject"
@@ -0,0 +1,54 @@
+"""Tests of the Flux query text analysis."""
+
+from influxdb_mcp.cache import QueryCache
+from influxdb_mcp.flux import call_arguments, normalize_query, split_pipeline, stage_call
+
+QUERY = """
+from(bucket: "telegraf")
+  |> range(start: -1h)  // last hour
+  |> filter(fn: (r) => r._measurement == "cpu")
+"""
+
+
+def test_normalize_query_drops_layout_and_comments():
+    assert normalize_query(QUERY) == 'from(bucket:"telegraf")|>range(start:-1h)|>filter(fn:(r)=>r._measurement=="cpu")'
+    assert normalize_query(QUERY) == normalize_query(QUERY.replace("\n ", "\n\t"))
+
+
+def test_normalize_query_keeps_strings_verbatim():
+    assert normalize_query('r.host == "a  b // c"') == 'r.host=="a  b // c"'
+
+
+def test_normalize_query_keeps_regex_whitespace():
+    query = "filter(fn: (r) => r.message =~ /disk  full/ and r.path !~ /a \\/ b/)"
+    assert normalize_query(query) == "filter(fn:(r)=>r.message=~/disk  full/ and r.path!~/a \\/ b/)"
+    assert normalize_query(query) != normalize_query(query.replace("disk  full", "disk full"))
+
+
+def test_normalize_query_does_not_read_comments_in_regexes():
+    query = 'from(bucket: "b") |> range(start: -1h) |> filter(fn: (r) => r.path =~ /api\\//) |> limit(n: 10)'
+    assert normalize_query(query).endswith("|>limit(n:10)")
+    assert normalize_query(query) != normalize_query(query.replace("n: 10", "n: 99"))
+
+
+def test_normalize_query_keeps_divisions():
+    assert normalize_query("map(fn: (r) => ({r with v: r._value / 2.0}))") == "map(fn:(r)=>({r with v:r._value/2.0}))"
+
+
+def test_pipeline_stages_skip_brackets_in_regexes():
+    stages = split_pipeline(normalize_query('from(bucket: "b") |> filter(fn: (r) => r.a =~ /(|>\\)/) |> limit(n: 1)'))
+    assert stages == ['from(bucket:"b")', "filter(fn:(r)=>r.a=~/(|>\\)/)", "limit(n:1)"]
+    assert stage_call(stages[1]) == ("filter", {"fn": "(r)=>r.a=~/(|>\\)/"})
+
+
+def test_call_arguments():
+    assert call_arguments(normalize_query(QUERY), "range") == [{"start": "-1h"}]
+
+
+def test_cache_key_ignores_layout_but_not_regexes():
+    key = QueryCache.key("org", QUERY, "records")
+    assert key == QueryCache.key("org", QUERY.replace("  ", " "), "records")
+    assert key != QueryCache.key("org", QUERY, "columnar")
+    assert QueryCache.key("org", "filter(fn: (r) => r.a =~ /x  y/)") != QueryCache.key(
+        "org", "filter(fn: (r) => r.a =~ /x y/)"
+    )
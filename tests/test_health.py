@@ -0,0 +1,107 @@
+"""Tests of the background health prober and the health endpoints."""
+
+import asyncio
+import json
+
+from influxdb_mcp import server
+from influxdb_mcp.health import HealthProber
+
+
+def test_prober_caches_the_last_outcome():
+    outcomes = [{"status": "connected"}, {"status": "error", "message": "refused"}]
+
+    async def probe():
+        return outcomes.pop(0)
+
+    async def run():
+        prober = HealthProber(probe, interval=60, timeout=1)
+        assert prober.snapshot() == {"influxdb_status": "unknown"}
+        await prober.probe_once()
+        assert prober.ready
+        await prober.probe_once()
+        return prober
+
+    prober = asyncio.run(run())
+    assert not prober.ready
+    assert prober.failures == 1
+    assert prober.snapshot()["influxdb_error"] == "refused"
+
+
+def test_slow_probes_time_out():
+    async def probe():
+        await asyncio.sleep(1)
+
+    prober = HealthProber(probe, interval=60, timeout=0.01)
+    assert asyncio.run(prober.probe_once())["message"] == "Health probe timed out after 0.01s"
+
+
+def test_healthcheck_reports_manager_errors(monkeypatch):
+    def broken_manager():
+        raise ValueError("INFLUXDB_TOKEN is required")
+
+    monkeypatch.setattr(server, "get_influxdb_manager", broken_manager)
+
+    async def run():
+        try:
+            return await server.healthcheck(None)
+        finally:
+            await server.health_prober.stop()
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    status = json.loads(response.body)
+    assert (status["status"], status["influxdb_status"]) == ("healthy", "error")
+    assert status["influxdb_error"] == "INFLUXDB_TOKEN is required"
+
+
+def test_readiness_follows_the_last_probe(monkeypatch):
+    prober = HealthProber(lambda: None, interval=60, timeout=1)
+    monkeypatch.setattr(server, "health_prober", prober)
+    monkeypatch.setattr(prober, "ensure_started", lambda: None)
+
+    async def probe(status):
+        async def outcome():
+            return {"status": status}
+
+        prober.probe = outcome
+        await prober.probe_once()
+        return await server.readyz(None)
+
+    assert asyncio.run(server.readyz(None)).status_code == 503
+    assert asyncio.run(probe("connected")).status_code == 200
+    response = asyncio.run(probe("error"))
+    assert (response.status_code, json.loads(response.body)["status"]) == (503, "not_ready")
+    assert json.loads(asyncio.run(server.livez(None)).body)["status"] == "alive"
+
+
+def test_health_checks_read_the_server_version_once(make_manager, monkeypatch):
+    manager = make_manager()
+    versions = []
+    version = manager._client.version
+    monkeypatch.setattr(manager._client, "version", lambda: versions.append(version()) or versions[-1])
+
+    first, second = manager.check_health(), manager.check_health()
+    assert first["status"] == "connected" and first == second
+    assert first["version"] == versions[0] and len(versions) == 1
+    # An explicit connection test reads them again
+    assert manager.test_connection()["version"] == versions[0] and len(versions) == 2
+
+
+def test_prober_starts_with_the_server(monkeypatch):
+    async def probe():
+        return {"status": "connected"}
+
+    prober = HealthProber(probe, interval=60, timeout=1)
+    statuses = []
+
+    async def run_server():
+        await asyncio.sleep(0.05)
+        statuses.append(prober.status)
+
+    monkeypatch.setattr(server, "health_prober", prober)
+    monkeypatch.setattr(server, "MCP_TRANSPORT", "streamable-http")
+    monkeypatch.setattr(server.mcp, "run_streamable_http_async", run_server)
+    asyncio.run(server.serve())
+    # Probed before any health request, and stopped with the server
+    assert statuses == [{"status": "connected"}]
+    assert prober._task is None
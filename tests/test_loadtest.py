@@ -0,0 +1,72 @@
+"""Tests of the MCP load generator against the server and the fake InfluxDB server."""
+
+import json
+import sys
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from influxdb_mcp import loadtest, server
+from influxdb_mcp.influxdb_client_async import AsyncInfluxDBManager
+
+
+@pytest.fixture
+def mcp_url(make_config, monkeypatch):
+    """URL of the MCP server run by uvicorn in a background thread."""
+    monkeypatch.setattr(server, "influxdb_manager", AsyncInfluxDBManager(make_config()))
+    http = uvicorn.Server(uvicorn.Config(server.mcp.streamable_http_app(), port=0, log_level="warning"))
+    thread = threading.Thread(target=http.run, daemon=True)
+    thread.start()
+    while not http.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{http.servers[0].sockets[0].getsockname()[1]}/mcp/"
+    http.should_exit = True
+    thread.join()
+
+
+def run_main(monkeypatch, *args):
+    """Run the load generator command, returning its exit status."""
+    monkeypatch.setattr(sys, "argv", ["loadtest", *args])
+    try:
+        loadtest.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def test_mix_and_percentiles():
+    assert loadtest.parse_mix("list_buckets=1, execute_flux_query=0.5,list_measurements") == {
+        "list_buckets": 1.0,
+        "execute_flux_query": 0.5,
+        "list_measurements": 1.0,
+    }
+    for mix in ("drop_bucket=1", "list_buckets=-1", "list_buckets=0"):
+        with pytest.raises(ValueError):
+            loadtest.parse_mix(mix)
+    assert [loadtest.percentile(list(range(1, 101)), p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+
+
+def test_load_is_reported_per_tool(mcp_url, monkeypatch, tmp_path, capsys):
+    report = tmp_path / "report.json"
+    # With this seed and mix, the first two calls of the sessions cover every tool
+    mix = "list_buckets=1,list_measurements=1,execute_flux_query=1"
+    args = ["--url", mcp_url, "--sessions", "2", "--duration", "0.5", "--mix", mix, "--seed", "4"]
+    status = run_main(monkeypatch, *args, "--json", str(report))
+    result = json.loads(report.read_text())
+    assert status == 0, result["errors"]
+    assert result["failed_sessions"] == 0
+    assert set(result["tools"]) == set(loadtest.TOOLS)
+    assert result["total"]["calls"] == sum(tool["calls"] for tool in result["tools"].values())
+    assert result["total"]["p50"] <= result["total"]["p99"] <= result["total"]["max"]
+    assert "2 sessions for" in capsys.readouterr().out
+
+
+def test_failed_sessions_fail_the_run(monkeypatch, tmp_path, capsys):
+    report = tmp_path / "report.json"
+    url = "http://127.0.0.1:9/mcp/"
+    status = run_main(monkeypatch, "--url", url, "--mix", "list_buckets", "--duration", "0.1", "--json", str(report))
+    assert status == 1
+    assert json.loads(report.read_text())["failed_sessions"] == 10
+    assert "10 sessions failed" in capsys.readouterr().out
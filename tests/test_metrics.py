@@ -0,0 +1,63 @@
+"""Tests of the Prometheus metrics and their exposition."""
+
+import asyncio
+
+import pytest
+
+from influxdb_mcp import server
+from influxdb_mcp.metrics import CollectedMetric, Counter, Gauge, Histogram, Registry, instrumented, note_error
+
+
+def test_metrics_are_rendered_in_the_text_format():
+    registry = Registry()
+    counter = registry.register(Counter("calls_total", "Calls", ("name",)))
+    gauge = registry.register(Gauge("open", "Open"))
+    histogram = registry.register(Histogram("latency_seconds", "Latency", ("name",), buckets=(0.1, 1.0)))
+    registry.register(CollectedMetric("broken", "Broken", (), lambda: 1 / 0))
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    gauge.inc()
+    gauge.dec(amount=3)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "x")
+
+    lines = registry.render().splitlines()
+    assert lines[:3] == ["# HELP calls_total Calls", "# TYPE calls_total counter", 'calls_total{name="a\\"b"} 3']
+    assert "open -2" in lines
+    assert 'latency_seconds_bucket{name="x",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{name="x",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{name="x"} 3' in lines
+    assert lines[-1] == "# Failed to collect broken: division by zero"
+
+
+def test_instrumented_calls_count_errors():
+    @instrumented("tool")
+    def handled():
+        note_error(KeyError("bucket"))
+        return {"status": "error"}
+
+    @instrumented("tool")
+    async def raised():
+        raise TimeoutError("slow")
+
+    handled()
+    with pytest.raises(TimeoutError):
+        asyncio.run(raised())
+    text = server.REGISTRY.render()
+    assert 'mcp_requests_total{kind="tool",name="handled",status="error"} 1' in text
+    assert 'mcp_request_errors_total{kind="tool",name="handled",exception="KeyError"} 1' in text
+    assert 'mcp_request_errors_total{kind="tool",name="raised",exception="TimeoutError"} 1' in text
+    assert 'mcp_requests_in_flight{kind="tool",name="raised"} 0' in text
+
+
+def test_metrics_endpoint_reports_tool_calls_and_caches(call_tools):
+    async def call():
+        await server.list_buckets()
+        await server.list_buckets()
+        return await server.metrics(None)
+
+    text = call_tools(call).body.decode()
+    assert 'mcp_requests_total{kind="tool",name="list_buckets",status="success"}' in text
+    assert 'mcp_request_duration_seconds_count{kind="tool",name="list_buckets"}' in text
+    assert 'influxdb_request_duration_seconds_count{operation="buckets"}' in text
+    assert 'mcp_cache_hits_total{cache="schema"} 1' in text
@@ -0,0 +1,236 @@
+"""Tests of the query paths of the managers against the fake InfluxDB server."""
+
+import asyncio
+import json
+import math
+import threading
+
+import pytest
+from conftest import QUERY, QUERY_ROWS
+
+from influxdb_mcp.cursors import CursorRegistry
+from influxdb_mcp.influxdb_client_async import AsyncInfluxDBManager
+from influxdb_mcp.results import columnar_size, columnar_to_rows, row_size
+
+
+def test_execute_query_is_cached(make_manager):
+    manager = make_manager()
+    rows = manager.execute_query(QUERY)
+    assert len(rows) == QUERY_ROWS
+    # Layout differences share the cache entry
+    assert manager.execute_query(" ".join(QUERY.split())) is rows
+
+
+def test_rewrite_aggregates_in_influxdb(make_manager):
+    manager = make_manager(point_budget=100, sample_interval="60s")
+    rewrite = manager.rewrite_query(QUERY)
+    assert rewrite["every"] == "15m"
+    assert rewrite["query"].startswith(QUERY.strip())
+    assert len(manager.execute_query(rewrite["query"])) <= 4 * 100
+    assert manager.rewrite_query(QUERY.replace("-1d", "-1h")) is None
+
+
+def test_small_results_are_returned_inline(make_manager):
+    result = make_manager(spool_threshold=1024 * 1024).execute_query_spooled(QUERY.replace("-1d", "-1h"))
+    assert not result["spooled"]
+    assert result["record_count"] == 4 * 60
+
+
+def test_large_results_are_spooled_in_pages(make_manager):
+    manager = make_manager(spool_threshold=10000, spool_page_rows=1000)
+    result = manager.execute_query_spooled(QUERY)
+    assert result["spooled"]
+    assert result["record_count"] == QUERY_ROWS
+    assert result["pages"] == math.ceil(QUERY_ROWS / 1000)
+
+    records = 0
+    for page in range(1, result["pages"] + 1):
+        document = json.loads(manager.spooled_page(result["result_id"], page))
+        assert document["first_record"] == records + 1
+        records += len(document["data"])
+        assert (document["next_page"] is None) == (page == result["pages"])
+    assert records == QUERY_ROWS
+
+
+def test_paged_query_reads_the_whole_result(make_manager):
+    manager = make_manager()
+    rows = []
+    page = manager.execute_query_paged(QUERY, 1000)
+    rows.extend(page["data"])
+    while page["next_cursor"]:
+        page = manager.fetch_page(page["next_cursor"])
+        assert page["record_count"] <= 1000
+        rows.extend(page["data"])
+    assert page["page"] == math.ceil(QUERY_ROWS / 1000)
+    assert rows == manager.execute_query(QUERY)
+
+
+def test_responses_are_truncated_at_the_row_limit(make_manager):
+    page = make_manager(max_rows=500).execute_query_paged(QUERY)
+    assert page["truncated"]
+    assert page["record_count"] == 500
+
+
+def test_expired_cursors_are_closed(make_manager):
+    manager = make_manager(cursor_ttl=0)
+    page = manager.execute_query_paged(QUERY, 100)
+    with pytest.raises(RuntimeError, match="expired cursor"):
+        manager.fetch_page(page["next_cursor"])
+    assert manager.cursors.stats()["open"] == 0
+
+
+def test_async_cursors_are_closed_in_referenced_tasks(caplog):
+    async def rows():
+        try:
+            yield {"_value": 1}
+            yield {"_value": 2}
+        finally:
+            raise RuntimeError("connection reset")
+
+    async def close_cursor():
+        registry = CursorRegistry(ttl=60, max_open=4)
+        stream = rows()
+        await stream.__anext__()
+        registry.close(registry.open(QUERY, stream, 1))
+        assert len(registry._closing) == 1
+        while registry._closing:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(close_cursor())
+    assert "connection reset" in caplog.text
+
+
+def test_downsampling_reduces_every_series(make_manager):
+    result = make_manager().execute_query_downsampled(QUERY, 100)
+    assert result["record_count"] == 4 * 100
+    assert result["downsampling"]["points_before"] == QUERY_ROWS
+    assert result["downsampling"]["points_after"] == 4 * 100
+
+
+def test_large_downsampled_results_are_spooled(make_manager):
+    result = make_manager(spool_threshold=10000).execute_query_downsampled(QUERY, 500)
+    assert result["spooled"]
+    assert result["record_count"] == 4 * 500
+    assert result["downsampling"]["points_after"] == 4 * 500
+
+
+def test_columnar_downsampled_results_are_converted_once(make_manager):
+    manager = make_manager(spool_threshold=10000, spool_page_rows=1000)
+    records = make_manager().execute_query_downsampled(QUERY, 100)["data"]
+    tables = make_manager().execute_query_downsampled(QUERY, 100, "columnar")["data"]
+    assert all("host" in table["group_key"] and "host" not in table["columns"] for table in tables)
+    assert columnar_to_rows(tables) == records
+    assert columnar_size(tables) == sum(row_size(row) for row in records)
+
+    spooled = manager.execute_query_downsampled(QUERY, 500, "columnar")
+    assert spooled["spooled"] and spooled["record_count"] == 4 * 500
+    page = json.loads(manager.spooled_page(spooled["result_id"], 1))
+    assert sum(table["record_count"] for table in page["data"]) == 1000
+
+
+def test_downsampled_results_above_the_limits_are_rejected(make_manager):
+    manager = make_manager(spool_threshold=0, max_rows=1000)
+    with pytest.raises(ValueError, match="lower max_points_per_series"):
+        manager.execute_query_downsampled(QUERY, 500)
+    assert manager.execute_query_downsampled(QUERY, 250)["record_count"] == 1000
+
+
+def test_async_manager_pages_like_the_sync_manager(make_config, make_manager):
+    async def read_pages():
+        manager = AsyncInfluxDBManager(make_config())
+        await manager.connect()
+        try:
+            pages = [await manager.execute_query_paged(QUERY, 2000)]
+            while pages[-1]["next_cursor"]:
+                pages.append(await manager.fetch_page(pages[-1]["next_cursor"]))
+            return pages
+        finally:
+            await manager.disconnect()
+
+    pages = asyncio.run(read_pages())
+    assert [page["record_count"] for page in pages] == [2000, 2000, QUERY_ROWS - 4000]
+    assert [row for page in pages for row in page["data"]] == make_manager().execute_query(QUERY)
+
+
+def test_open_async_cursors_leave_connections_for_other_queries(make_config):
+    async def open_cursors():
+        async with AsyncInfluxDBManager(make_config(connection_pool_size=2, schema_concurrency=1)) as manager:
+            pages = [
+                await manager.execute_query_paged(QUERY.replace("-1d", f"-{days}d"), 10)
+                for days in range(1, manager.connection_pool_size + 1)
+            ]
+            health = await asyncio.wait_for(manager.check_health(), timeout=5)
+            rows = await asyncio.wait_for(manager.execute_query(QUERY), timeout=5)
+            return pages, health, rows, manager.cursors.stats()
+
+    pages, health, rows, cursors = asyncio.run(open_cursors())
+    assert all(page["next_cursor"] for page in pages)
+    assert health["status"] == "connected"
+    assert len(rows) == QUERY_ROWS
+    assert cursors["open"] == cursors["max_open"] == 1
+
+
+def restore_rows(tables):
+    """Rows of a columnar result, with the group key values restored in every row."""
+    return [
+        {"result": table["result"], "table": table["table"], **table["group_key"], **dict(zip(table["columns"], row))}
+        for table in tables
+        for row in zip(*table["columns"].values())
+    ]
+
+
+def test_columnar_results_hold_the_same_rows(make_manager):
+    manager = make_manager()
+    rows = manager.execute_query(QUERY)
+    tables = manager.execute_query(QUERY, "columnar")
+    assert [table["record_count"] for table in tables] == [1440] * 4
+    assert all("host" in table["group_key"] and "host" not in table["columns"] for table in tables)
+    assert restore_rows(tables) == rows
+
+    page = manager.execute_query_paged(QUERY, 1000, "columnar")
+    assert sum(table["record_count"] for table in page["data"]) == 1000
+    assert restore_rows(page["data"]) == rows[:1000]
+    with pytest.raises(ValueError, match="Invalid result format 'csv'"):
+        manager.execute_query(QUERY, "csv")
+
+
+def test_concurrent_identical_queries_share_one_execution(make_config, fake_influxdb):
+    async def run_queries():
+        async with AsyncInfluxDBManager(make_config()) as manager:
+            shared = await asyncio.gather(*(manager.execute_query(QUERY) for _ in range(4)))
+            return shared, await manager.execute_query(QUERY), manager.flights.stats()
+
+    executed = fake_influxdb.influxdb.queries
+    shared, cached, flights = asyncio.run(run_queries())
+    assert fake_influxdb.influxdb.queries == executed + 1
+    assert all(rows is shared[0] for rows in shared) and cached is shared[0]
+    assert len(cached) == QUERY_ROWS
+    assert (flights["executions"], flights["collapsed"]) == (1, 3)
+
+
+def test_async_conversion_does_not_block_other_sessions(make_config, monkeypatch):
+    converting = threading.Event()
+    answered = threading.Event()
+    answered_during_conversion = []
+    convert = AsyncInfluxDBManager._tables_to_json
+
+    def slow_convert(result, result_format="records"):
+        converting.set()
+        # Only set in time when another session is served while this result is converted
+        answered_during_conversion.append(answered.wait(timeout=5))
+        return convert(result, result_format)
+
+    async def run_sessions():
+        async with AsyncInfluxDBManager(make_config()) as manager:
+            monkeypatch.setattr(manager, "_tables_to_json", slow_convert)
+            large = asyncio.create_task(manager.execute_query(QUERY))
+            while not converting.is_set():
+                await asyncio.sleep(0.01)
+            buckets = await manager.list_buckets()
+            answered.set()
+            return buckets, await large
+
+    buckets, rows = asyncio.run(run_sessions())
+    assert answered_during_conversion == [True]
+    assert [bucket["name"] for bucket in buckets] == ["telegraf"]
+    assert len(rows) == QUERY_ROWS
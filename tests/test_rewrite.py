@@ -0,0 +1,42 @@
+"""Tests of the rewriting of raw queries to aggregate in InfluxDB."""
+
+from datetime import datetime, timezone
+
+from influxdb_mcp.rewrite import downsample_query, window_every
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+QUERY = """from(bucket: "logs")
+  |> range(start: -1d)  // last day
+  |> filter(fn: (r) => r.message =~ /disk  full/ and r.path !~ /a \\/ b/)"""
+
+
+def test_window_every_rounds_up_to_common_durations():
+    assert window_every(0.5) == "1s"
+    assert window_every(864) == "15m"
+    assert window_every(86401) == "2d"
+
+
+def test_rewrite_appends_to_the_query_as_written():
+    rewrite = downsample_query(QUERY, 100, 60, now=NOW)
+    assert rewrite.query == QUERY + "\n  |> aggregateWindow(every: 15m, fn: mean, createEmpty: false)"
+    assert rewrite.estimated_points == 1440
+
+
+def test_rewrite_keeps_the_yield_last():
+    rewrite = downsample_query(QUERY + '\n  |> yield(name: "raw")', 100, 60, now=NOW)
+    assert rewrite.query == (
+        QUERY + '\n  |> aggregateWindow(every: 15m, fn: mean, createEmpty: false)\n  |> yield(name: "raw")'
+    )
+
+
+def test_minmax_rewrite_keeps_two_points_per_window():
+    rewrite = downsample_query(QUERY, 100, 60, fn="minmax", now=NOW)
+    assert rewrite.every == "30m"
+    assert rewrite.query.startswith("data = " + QUERY + "\nunion(")
+
+
+def test_queries_within_the_budget_or_not_raw_are_not_rewritten():
+    assert downsample_query(QUERY, 2000, 60, now=NOW) is None
+    assert downsample_query(QUERY + "\n  |> mean()", 100, 60, now=NOW) is None
+    assert downsample_query(QUERY.replace("-1d", "2024-01-01T00:00:00Z"), 100, 60, now=NOW) is None
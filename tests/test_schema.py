@@ -0,0 +1,56 @@
+"""Tests of the schema discovery of the managers against the fake InfluxDB server."""
+
+import asyncio
+
+import pytest
+
+from influxdb_mcp.influxdb_client_async import AsyncInfluxDBManager
+from influxdb_mcp.schema import bucket_schema_query, flux_string
+
+SCHEMA = [
+    {"measurement": f"measurement_000{index}", "tags": ["host", "region"], "fields": ["field_0", "field_1"]}
+    for index in range(2)
+]
+
+
+def test_bucket_names_are_quoted():
+    assert flux_string('a"b\\c${d}') == '"a\\"b\\\\c\\${d}"'
+    assert 'from(bucket: "tele\\"graf")' in bucket_schema_query('tele"graf')
+
+
+@pytest.mark.parametrize("mode", ["single-query", "per-measurement"])
+def test_discovery_modes_return_the_same_schema(make_manager, mode):
+    discovery = make_manager(schema_discovery=mode).discover_measurements("telegraf")
+    assert discovery["measurements"] == SCHEMA
+    assert discovery["stats"]["mode"] == mode
+    assert discovery["stats"]["queries"] == (1 if mode == "single-query" else 5)
+    assert discovery["stats"]["failed_queries"] == 0
+
+
+@pytest.mark.parametrize("mode", ["single-query", "per-measurement"])
+def test_async_discovery_returns_the_same_schema(make_config, mode):
+    async def discover():
+        manager = AsyncInfluxDBManager(make_config(schema_discovery=mode))
+        await manager.connect()
+        try:
+            return await manager.discover_measurements("telegraf")
+        finally:
+            await manager.disconnect()
+
+    discovery = asyncio.run(discover())
+    assert discovery["measurements"] == SCHEMA
+    assert discovery["stats"]["mode"] == mode
+
+
+@pytest.mark.parametrize("mode", ["auto", "single-query", "per-measurement"])
+def test_missing_buckets_are_an_error(make_manager, mode):
+    with pytest.raises(RuntimeError, match=r"Failed to get measurements: \(404\)"):
+        make_manager(schema_discovery=mode).discover_measurements("missing")
+
+
+def test_discovery_is_cached_until_refreshed(make_manager):
+    manager = make_manager()
+    assert manager.discover_measurements("telegraf")["cache"]["status"] == "miss"
+    assert manager.list_measurements("telegraf") == SCHEMA
+    assert manager.discover_measurements("telegraf")["cache"]["status"] == "hit"
+    assert manager.discover_measurements("telegraf", refresh=True)["cache"]["status"] == "refreshed"
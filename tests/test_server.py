@@ -0,0 +1,78 @@
+"""Tests of the server tools and resources against the fake InfluxDB server."""
+
+import json
+
+from conftest import QUERY, QUERY_ROWS
+
+from influxdb_mcp import server
+
+
+def test_tools_are_served_by_the_asyncio_manager(call_tools, monkeypatch):
+    async def call():
+        monkeypatch.setattr(server, "get_config", lambda: server.influxdb_manager.config)
+        return {
+            "connection": await server.test_connection(),
+            "buckets": await server.list_buckets(),
+            "measurements": await server.list_measurements("telegraf"),
+            "refreshed": await server.refresh_schema("telegraf"),
+            "query": await server.execute_flux_query(QUERY),
+            "buckets_resource": json.loads(await server.get_buckets_resource()),
+            "measurements_resource": json.loads(await server.get_measurements_resource("telegraf")),
+            "status_resource": json.loads(await server.get_status_resource()),
+        }
+
+    results = call_tools(call)
+    assert results["connection"]["status"] == "connected"
+    assert [bucket["name"] for bucket in results["buckets"]["buckets"]] == ["telegraf"]
+    assert results["measurements"]["count"] == 2
+    assert results["measurements"]["cache"]["status"] == "miss"
+    assert results["refreshed"]["cache"]["status"] == "refreshed"
+    # Neither spooled nor truncated by default, the whole result is returned in data
+    assert results["query"]["record_count"] == len(results["query"]["data"]) == QUERY_ROWS
+    assert not results["query"]["truncated"] and "spooled" not in results["query"]
+    assert results["buckets_resource"]["buckets"] == results["buckets"]["buckets"]
+    assert results["measurements_resource"]["measurements"] == results["measurements"]["measurements"]
+    assert results["status_resource"]["connection_status"]["status"] == "connected"
+
+
+def test_tool_errors_are_returned(call_tools):
+    async def call():
+        return [
+            await server.list_measurements("missing"),
+            await server.execute_flux_query('from(bucket: "missing") |> range(start: -1h)'),
+            json.loads(await server.get_measurements_resource("missing")),
+        ]
+
+    measurements, query, resource = call_tools(call)
+    assert measurements["status"] == "error"
+    assert query["status"] == "error" and "could not find bucket" in query["message"]
+    assert "could not find bucket" in resource["error"]
+
+
+def test_large_results_are_read_from_the_spool_resource(call_tools):
+    async def call():
+        result = await server.execute_flux_query(QUERY, format="columnar")
+        pages = [json.loads(await server.get_result_page_resource(result["result_id"], "1"))]
+        while pages[-1]["next_page"]:
+            pages.append(json.loads(await server.get_result_page_resource(result["result_id"], str(len(pages) + 1))))
+        return result, pages, json.loads(await server.get_result_page_resource("0" * 32, "1"))
+
+    result, pages, missing = call_tools(call, spool_threshold=10000, spool_page_rows=2000)
+    assert result["spooled"] and result["first_page"] == f"influxdb://results/{result['result_id']}/1"
+    assert [page["record_count"] for page in pages] == [2000, 2000, QUERY_ROWS - 4000]
+    assert sum(table["record_count"] for page in pages for table in page["data"]) == QUERY_ROWS
+    assert "error" in missing
+
+
+def test_truncated_results_continue_with_fetch_query_page(call_tools):
+    async def call():
+        pages = [await server.execute_flux_query(QUERY)]
+        while pages[-1]["next_cursor"]:
+            pages.append(await server.fetch_query_page(pages[-1]["next_cursor"]))
+        return pages, await server.fetch_query_page(pages[0]["next_cursor"])
+
+    pages, expired = call_tools(call, spool_threshold=0, max_rows=2500)
+    assert [page["record_count"] for page in pages] == [2500, 2500, QUERY_ROWS - 5000]
+    assert [page["truncated"] for page in pages] == [True, True, False]
+    assert pages[-1]["total_records"] == QUERY_ROWS
+    assert expired["status"] == "error"
@@ -0,0 +1,46 @@
+"""Tests of the slow query log."""
+
+import json
+import logging
+
+from conftest import QUERY, QUERY_ROWS
+from influxdb_client.client.flux_table import FluxRecord
+
+from influxdb_mcp.slowlog import SlowQueryLog, profile_summary
+
+
+def test_slow_queries_are_profiled_once_per_cooldown():
+    log = SlowQueryLog(threshold_ms=100, profile=True)
+    assert not log.is_slow(99) and log.is_slow(100)
+    assert log.record(QUERY, "query", 150, 10, 1000, "records")
+    assert not log.record(" ".join(QUERY.split()), "query", 150, 10, 1000, "records")
+    assert not SlowQueryLog(threshold_ms=0, profile=True).is_slow(10**6)
+
+
+def test_profiles_list_the_slowest_operators_first():
+    records = [
+        FluxRecord(0, {"_measurement": "profiler/operator", "Type": "filter", "DurationSum": 10}),
+        FluxRecord(0, {"_measurement": "profiler/query", "TotalDuration": 50, "result": "_profiler"}),
+        FluxRecord(0, {"_measurement": "profiler/operator", "Type": "range", "DurationSum": 30}),
+    ]
+    summary = profile_summary(records)
+    assert summary["profile"] == {"TotalDuration": 50}
+    assert [operator["Type"] for operator in summary["operators"]] == ["range", "filter"]
+
+
+def test_slow_queries_are_logged_as_json(make_manager, caplog):
+    with caplog.at_level(logging.WARNING, logger="influxdb_mcp.slow_queries"):
+        make_manager(slow_query_ms=1).execute_query(QUERY)
+    entries = [json.loads(record.getMessage()) for record in caplog.records if record.name.endswith("slow_queries")]
+    assert len(entries) == 1
+    assert (entries[0]["event"], entries[0]["mode"], entries[0]["rows"]) == ("slow_query", "query", QUERY_ROWS)
+    assert entries[0]["duration_ms"] >= 1
+
+
+def test_profiled_reruns_are_logged(make_manager, caplog):
+    manager = make_manager(slow_query_ms=1, slow_query_profile=True)
+    with caplog.at_level(logging.WARNING, logger="influxdb_mcp.slow_queries"):
+        manager._profile_query(QUERY)
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["event"] == "slow_query_profile"
+    assert "error" not in entry
@@ -0,0 +1,84 @@
+"""Tests of the collection of spooled results and exports."""
+
+import os
+import time
+
+import pytest
+from conftest import QUERY
+
+from influxdb_mcp import server
+from influxdb_mcp.export import new_export_id, read_export_file, read_manifest, write_manifest
+from influxdb_mcp.spool import ResultSpool
+
+
+def make_spool(tmp_path, ttl: int, max_bytes: int) -> ResultSpool:
+    return ResultSpool(
+        str(tmp_path / "results"), ttl, max_bytes, page_rows=10, exports_directory=str(tmp_path / "exports")
+    )
+
+
+def make_export(directory, size: int, age: float) -> str:
+    """Write an export of the given size and age in seconds, returning its directory."""
+    path = os.path.join(directory, new_export_id())
+    os.makedirs(path)
+    with open(os.path.join(path, "part-0000.parquet"), "wb") as f:
+        f.write(b"x" * size)
+    written = time.time() - age
+    os.utime(path, (written, written))
+    return path
+
+
+def test_expired_exports_are_removed(tmp_path):
+    spool = make_spool(tmp_path, ttl=60, max_bytes=0)
+    expired = make_export(tmp_path / "exports", 100, age=120)
+    fresh = make_export(tmp_path / "exports", 100, age=0)
+    assert spool.collect() == 100
+    assert not os.path.exists(expired)
+    assert os.path.exists(fresh)
+
+
+def test_exports_share_the_disk_quota(tmp_path):
+    spool = make_spool(tmp_path, ttl=3600, max_bytes=250)
+    oldest = make_export(tmp_path / "exports", 100, age=20)
+    older = make_export(tmp_path / "exports", 100, age=10)
+
+    export_id = new_export_id()
+    spool.begin_export(export_id)
+    written = make_export(tmp_path / "exports", 100, age=30)
+    os.rename(written, tmp_path / "exports" / export_id)
+    # The export being written is not collected, however old
+    assert spool.collect() == 200
+    assert not os.path.exists(oldest)
+    assert os.path.exists(older) and os.path.exists(tmp_path / "exports" / export_id)
+    spool.commit_export(export_id)
+
+    too_large = new_export_id()
+    spool.begin_export(too_large)
+    os.rename(make_export(tmp_path / "exports", 300, age=0), tmp_path / "exports" / too_large)
+    with pytest.raises(RuntimeError, match="disk quota"):
+        spool.commit_export(too_large)
+    assert not os.path.exists(older) and not os.path.exists(tmp_path / "exports" / export_id)
+
+
+def test_expired_export_manifests_are_not_served(tmp_path):
+    directory = make_export(tmp_path / "exports", 100, age=0)
+    export_id = os.path.basename(directory)
+    write_manifest(directory, {"expires": time.time() + 60, "files": [{"name": "part-0000.parquet"}]})
+    assert read_export_file(str(tmp_path), export_id, "part-0000.parquet") == b"x" * 100
+    with pytest.raises(ValueError, match="has no file 'manifest.json'"):
+        read_export_file(str(tmp_path), export_id, "manifest.json")
+    with pytest.raises(ValueError, match="Invalid export id"):
+        read_manifest(str(tmp_path), "../results")
+
+    write_manifest(directory, {"expires": time.time() - 1, "files": []})
+    with pytest.raises(ValueError, match="not found or expired"):
+        read_manifest(str(tmp_path), export_id)
+
+
+def test_failed_exports_are_not_protected_from_collection(call_tools):
+    async def call():
+        return await server.export_flux_query(QUERY, compression="lz4"), server.influxdb_manager.result_spool
+
+    result, spool = call_tools(call)
+    assert result["status"] == "error"
+    assert not spool._writing
@@ -0,0 +1,87 @@
+"""Tests of the incremental window cache against the fake InfluxDB server."""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from conftest import NOW
+
+from influxdb_mcp.influxdb_client_async import AsyncInfluxDBManager
+from influxdb_mcp.windows import WindowCache, parse_window_query
+
+WINDOW_QUERY = """
+from(bucket: "telegraf")
+  |> range(start: -1h)
+  |> filter(fn: (r) => r._measurement == "measurement_0000" and r._field == "field_0")
+  |> aggregateWindow(every: 5m, fn: {fn}, createEmpty: false)
+"""
+
+
+@pytest.fixture
+def run_at(fake_influxdb, make_manager, monkeypatch):
+    """Run a query at a pinned time, through a window cache or uncached."""
+    manager = make_manager()
+
+    def run(now, query, cache=None):
+        monkeypatch.setattr(fake_influxdb.influxdb, "now", now)
+        if cache is None:
+            return manager._tables_to_json(manager._query_api.query(query, org="org"))
+        plan = cache.plan("org", query, now=now)
+        return cache.complete(plan, [manager._query_api.query(sub, org="org") for sub in plan.queries])
+
+    return run
+
+
+def test_only_sliding_aggregate_queries_are_cached():
+    assert parse_window_query(WINDOW_QUERY.format(fn="mean")).every == 300
+    assert parse_window_query(WINDOW_QUERY.format(fn="mean").replace("-1h", "2024-01-01T00:00:00Z")) is None
+    assert parse_window_query(WINDOW_QUERY.format(fn="mean").replace("false", "true")) is None
+    assert parse_window_query(WINDOW_QUERY.format(fn="mean") + "  |> sort()") is None
+
+
+@pytest.mark.parametrize("fn", ["mean", "max", "sum"])
+def test_incremental_runs_match_uncached_results(run_at, fn):
+    query = WINDOW_QUERY.format(fn=fn)
+    cache = WindowCache(ttl=3600, max_bytes=1024 * 1024)
+    for minutes in (0, 2, 7, 31):
+        now = NOW + timedelta(minutes=minutes, seconds=13)
+        rows = run_at(now, query, cache)
+        assert len(rows) in (4 * 12, 4 * 13)
+        assert rows == run_at(now, query)
+    assert (cache.full, cache.incremental) == (1, 3)
+
+
+def test_ranges_past_the_cached_windows_are_queried_in_full(run_at):
+    query = WINDOW_QUERY.format(fn="mean")
+    cache = WindowCache(ttl=3600, max_bytes=1024 * 1024)
+    run_at(NOW, query, cache)
+    # The range starts after the last cached window
+    now = NOW + timedelta(hours=2)
+    plan = cache.plan("org", query, now=now)
+    assert plan.cached is None
+    assert plan.queries == [plan.window.with_range(now - timedelta(hours=1), now)]
+    assert run_at(now, query, cache) == run_at(now, query)
+    assert (cache.full, cache.incremental) == (2, 0)
+
+
+def test_expired_windows_are_queried_again(run_at):
+    query = WINDOW_QUERY.format(fn="mean")
+    cache = WindowCache(ttl=0.5, max_bytes=1024 * 1024)
+    run_at(NOW, query, cache)
+    assert cache.plan("org", query, now=NOW + timedelta(minutes=5)).cached is not None
+    time.sleep(0.6)
+    assert cache.plan("org", query, now=NOW + timedelta(minutes=5)).cached is None
+
+
+def test_async_manager_reuses_cached_windows(make_config):
+    query = WINDOW_QUERY.format(fn="max")
+
+    async def run_twice():
+        async with AsyncInfluxDBManager(make_config(query_cache_ttl=0)) as manager:
+            rows = [await manager.execute_query(query), await manager.execute_query(query)]
+            return rows, manager.window_cache.stats()
+
+    (first, second), stats = asyncio.run(run_twice())
+    assert (stats["full"], stats["incremental"]) == (1, 1)
+    assert first and second
@@ -0,0 +1,96 @@
+"""Tests of the admission control of the worker pool."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from conftest import QUERY
+
+from influxdb_mcp import server
+from influxdb_mcp.workers import ServerBusyError, WorkerPool
+
+
+def test_calls_beyond_the_queue_are_rejected():
+    async def run():
+        pool = WorkerPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["active"] == 1 and pool.stats()["queued"] == 1
+        with pytest.raises(ServerBusyError):
+            await pool.run(lambda: None)
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert await pool.run(lambda: 42) == 42
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(lambda: 1 / 0)
+        pool.shutdown()
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["completed"], stats["failed"], stats["rejected"], stats["queued"]) == (3, 1, 1, 0)
+
+
+def test_cancelled_calls_hold_their_slot_until_the_thread_finishes():
+    async def run():
+        pool = WorkerPool(max_workers=1, max_queue=0)
+        release = threading.Event()
+        call = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        # The worker is still busy with the cancelled call
+        with pytest.raises(ServerBusyError):
+            await pool.run(lambda: None)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert await pool.run(lambda: 42) == 42
+        pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_threads_mode_runs_tools_on_the_blocking_manager(make_manager, monkeypatch):
+    pool = WorkerPool(max_workers=2, max_queue=4)
+    monkeypatch.setattr(server, "worker_pool", pool)
+    monkeypatch.setattr(server, "influxdb_manager", make_manager())
+
+    async def call():
+        return await server.list_buckets(), await server.execute_flux_query(QUERY, page_size=1000)
+
+    try:
+        buckets, page = asyncio.run(call())
+    finally:
+        pool.shutdown()
+    assert buckets["count"] == 1
+    assert (page["record_count"], page["truncated"]) == (1000, True)
+    assert pool.stats()["completed"] == 2
+
+
+def test_threads_mode_rejects_resources_when_the_pool_is_full(make_manager, monkeypatch):
+    pool = WorkerPool(max_workers=1, max_queue=0)
+    monkeypatch.setattr(server, "worker_pool", pool)
+    monkeypatch.setattr(server, "influxdb_manager", make_manager())
+
+    async def call():
+        release = threading.Event()
+        running = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        try:
+            page = json.loads(await server.get_result_page_resource("0" * 32, "1"))
+            export = json.loads(await server.get_export_resource("0" * 32))
+            with pytest.raises(ServerBusyError):
+                await server.get_export_file_resource("0" * 32, "part-00000.parquet")
+            return page, export
+        finally:
+            release.set()
+            await running
+
+    try:
+        page, export = asyncio.run(call())
+    finally:
+        pool.shutdown()
+    assert page["error"].startswith("Server busy") and export["error"].startswith("Server busy")
+    assert pool.stats()["rejected"] == 3